@@ -5,7 +5,10 @@
 
 import time
 import os
-import random
+from cat import chooseAutonomousActivity
+from fast_forward import fastForwardCats
+from persistence import BackgroundWriter
+from constants import ACTIVITY_FILE
 
 # "time" information from: https://docs.python.org/3/library/time.html
 # idea for using a text file and rewriting over it was suggested by Elwin Li (incoming F25 TA) [all further implementation was my own]
@@ -14,9 +17,11 @@ import random
 # they serve no real in-game purpose and are not displayed other than in the console 
 
 class AbsenceTracker:
-    def __init__(self, app):
+    def __init__(self, app, saveFile=ACTIVITY_FILE):
         self.app = app
         self.lastActiveTime = time.time()
+        self.sessionStartTime = self.lastActiveTime  # cats are simulated live from here on
+        self.offlineTimeApplied = False  # the time the game was closed is only caught up once
         self.isActive = True
         self.absenceThresholds = {
             'short': 300,      # 5 minutes
@@ -25,7 +30,9 @@ class AbsenceTracker:
             'extended': 14400, # 4 hours
             'overnight': 28800 # 8 hours
         }
-        self.saveFile = "last_active.txt"  # simple text file
+        self.saveFile = saveFile  # simple text file
+        # activity updates are written in the background (coalesced, atomic, flushed on exit)
+        self.writer = BackgroundWriter(self.saveFile)
         self.loadActivityData()
         
     def loadActivityData(self):
@@ -52,27 +59,22 @@ class AbsenceTracker:
             self.saveActivityData()
     
     def saveActivityData(self):
-        # save current activity time to text file
-        try:
-            with open(self.saveFile, 'w') as f:
-                f.write(str(self.lastActiveTime))
+        # save current activity time to text file right away (only used outside of input handling)
+        self.writer.submit(str(self.lastActiveTime))
+        success = self.writer.flush()
+        if success:
             print(f"Saved activity time: {self.lastActiveTime}")
-            return True
-        except Exception as e:
-            print(f"Error saving activity data: {e}")
-            return False
+        return success
     
     def updateActivity(self):
         # need to call this when there's actual user activity
         was_absent = not self.isActive
-        old_time = self.lastActiveTime
         
         self.lastActiveTime = time.time()
         self.isActive = True
         
-        # save immediately
-        success = self.saveActivityData()
-        print(f"Activity updated: {old_time:.1f} -> {self.lastActiveTime:.1f} (saved: {success})")
+        # queue the save, the background writer puts it on disk every few seconds
+        self.writer.submit(str(self.lastActiveTime))
         
         if was_absent:
             self.onUserReturn()
@@ -109,89 +111,45 @@ class AbsenceTracker:
         # handle what happens when user goes absent
         level = self.getAbsenceLevel()
         print(f"User absent for {absenceTime:.0f} seconds (level: {level})")
-        # apply effects based on absence level
-        if level == 'short':
-            self.applyShortAbsenceEffects()
-        elif level == 'medium':
-            self.applyMediumAbsenceEffects()
-        elif level == 'long':
-            self.applyLongAbsenceEffects()
-        elif level == 'extended':
-            self.applyExtendedAbsenceEffects()
-        elif level == 'overnight':
-            self.applyOvernightAbsenceEffects()
+        self.applyAbsenceEffects(absenceTime)
     
     def onUserReturn(self):
         absenceTime = self.getAbsenceTime()
         level = self.getAbsenceLevel()
         print(f"Welcome back! You were away for {self.formatTime(absenceTime)}")
     
-    def applyShortAbsenceEffects(self):
-        # effects for 5-30 minute absence
-        print("Applying short absence effects...")
-        for cat in self.app.cats:
-            cat.happiness = max(0, cat.happiness - 5)
-            cat.energy = max(0, cat.energy - 3)
-    
-    def applyMediumAbsenceEffects(self):
-        # effects for 30 minute - 1 hour absence
-        print("Applying medium absence effects...")
-        for cat in self.app.cats:
-            cat.happiness = max(0, cat.happiness - 10)
-            cat.hunger = max(0, cat.hunger - 15)
-            cat.energy = max(0, cat.energy - 8)
-            cat.cleanliness = max(0, cat.cleanliness - 5)
-            # cats start autonomous behaviors
-            if cat.activity == "idle" and not cat.isRunning:
-                if random.random() < 0.3:  # 30% chance
-                    cat.startAutonomousActivity("wandering")
+    def getOfflineTime(self):
+        # how long the game was closed for: from when the restored cafe was saved (its snapshot or last
+        # journaled tick) to this session's start. the cats were simulated live before and after that,
+        # so last_active.txt is only for how long the player was away (the absence level and message)
+        if self.offlineTimeApplied:
+            return 0
+        savedAt = self.app.savedAt or self.lastActiveTime
+        return max(0, self.sessionStartTime - savedAt)
     
-    def applyLongAbsenceEffects(self):
-        # effects for 1-4 hour absence
-        print("Applying long absence effects...")
+    def applyOfflineTime(self):
+        # replay the time the game was closed exactly (see fast_forward.py) instead of fixed buckets
+        # called once at startup right after the saved cafe is restored, so it doesn't depend on
+        # the player staying idle long enough for an absence to be detected
+        offlineTime = self.getOfflineTime()
+        self.offlineTimeApplied = True
+        if offlineTime > 0:
+            # rooms off screen catch up on the ticks they're owed first, then every cat gets the offline time
+            self.app.catchUpRooms()
+            cats = self.app.getAllCats()
+            ticks = fastForwardCats(cats, offlineTime)
+            for cat in cats:
+                cat.notifyTrackers()
+            print(f"Caught up {self.formatTime(offlineTime)} of offline time ({ticks} stat ticks)")
+        return offlineTime
+
+    def applyAbsenceEffects(self, absenceTime):
         for cat in self.app.cats:
-            cat.happiness = max(0, cat.happiness - 20)
-            cat.hunger = max(0, cat.hunger - 30)
-            cat.energy = max(0, cat.energy - 15)
-            cat.cleanliness = max(0, cat.cleanliness - 15)
-            # more autonomous behaviors
+            # cats pick something to do based on what they need most (only in the room on screen)
             if cat.activity == "idle" and not cat.isRunning:
-                activities = ["wandering", "playing", "self-grooming"]
-                cat.startAutonomousActivity(random.choice(activities))
-    
-    def applyExtendedAbsenceEffects(self):
-        # effects for 4-8 hour absence
-        print("Applying extended absence effects...")
-        for cat in self.app.cats:
-            cat.happiness = max(0, cat.happiness - 35)
-            cat.hunger = max(0, cat.hunger - 50)
-            cat.energy = max(0, cat.energy - 25)
-            cat.cleanliness = max(0, cat.cleanliness - 30)
-            # survival behaviors based on needs
-            if cat.hunger < 30:
-                cat.startAutonomousActivity("foraging")
-            elif cat.energy < 20:
-                cat.startAutonomousActivity("sleeping")
-            elif cat.cleanliness < 25:
-                cat.startAutonomousActivity("self-grooming")
-    
-    def applyOvernightAbsenceEffects(self):
-        # effects for 8+ hour absence (overnight)
-        print("Applying overnight absence effects...")
-        for cat in self.app.cats:
-            # simulate full day/night cycle
-            cat.energy = min(100, cat.energy + 30)  # rested from sleeping
-            cat.hunger = max(0, cat.hunger - 60)  # got hungry overnight
-            cat.cleanliness = max(0, cat.cleanliness - 40)  # got messy
-            cat.happiness = max(0, cat.happiness - 25)  #missed user but adapted
-            
-            # set appropriate activity for their current state
-            if cat.hunger < 20:
-                cat.startAutonomousActivity("foraging")
-            elif cat.cleanliness < 30:
-                cat.startAutonomousActivity("self-grooming")
-            else:
-                cat.startAutonomousActivity("wandering")
+                activity = chooseAutonomousActivity(cat.hunger, cat.cleanliness)
+                if activity:
+                    cat.startAutonomousActivity(activity)
     
     def formatTime(self, seconds):
         # convert seconds to readable time format
@@ -0,0 +1,68 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import sys
+import types
+from profiler import DRAW_FUNCTIONS
+
+# stand-in for cmu_graphics so the game can be benchmarked without a window
+# every draw function just counts that it was called (nothing is rasterized), so the numbers
+# the benchmarks report are the game's own cost plus how many draw calls it would have made
+# install() has to run before main_game (or anything else that imports cmu_graphics) is imported
+
+class DrawRecorder:
+    def __init__(self):
+        self.counts = {name: 0 for name in DRAW_FUNCTIONS}
+
+    def reset(self):
+        for name in self.counts:
+            self.counts[name] = 0
+
+    def getTotal(self):
+        return sum(self.counts.values())
+
+recorder = DrawRecorder()
+
+def makeDrawFunction(name):
+    counts = recorder.counts
+    def draw(*args, **kwargs):
+        counts[name] += 1
+    draw.__name__ = name
+    return draw
+
+def rgb(red, green, blue):
+    return (red, green, blue)
+
+class Sound:
+    def __init__(self, path):
+        self.path = path
+
+    def play(self, loop=False, restart=False):
+        pass
+
+    def pause(self):
+        pass
+
+class CMUImage:
+    def __init__(self, image):
+        self.image = image
+
+def runApp(*args, **kwargs):
+    raise RuntimeError("the fake cmu_graphics can't open a window, drive the callbacks directly")
+
+def install():
+    if "cmu_graphics" in sys.modules and not getattr(sys.modules["cmu_graphics"], "isFake", False):
+        raise RuntimeError("the real cmu_graphics is already imported, install the fake one first")
+    module = types.ModuleType("cmu_graphics")
+    module.isFake = True
+    module.recorder = recorder
+    for name in DRAW_FUNCTIONS:
+        setattr(module, name, makeDrawFunction(name))
+    module.rgb = rgb
+    module.Sound = Sound
+    module.CMUImage = CMUImage
+    module.runApp = runApp
+    sys.modules["cmu_graphics"] = module
+    return module
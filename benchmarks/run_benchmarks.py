@@ -0,0 +1,385 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# benchmark harness: runs main_game's callbacks (onAppStart, onStep, redrawAll and the mouse
+# handlers) through scripted scenarios with a fake cmu_graphics that only counts draw calls
+#   python benchmarks/run_benchmarks.py                  compare every scenario to baseline.json
+#   python benchmarks/run_benchmarks.py drag_storm       just one (or a few) scenarios
+#   python benchmarks/run_benchmarks.py --save-baseline  store the numbers as the new baseline
+# each scenario is timed a few times (keeping the fastest run) and then run once more under
+# tracemalloc for the memory numbers (tracemalloc slows everything down so it can't share a run)
+# the headless_ scenarios skip the game and time CafeSimulation.step on its own, restore_ times loading a save
+# saves go to a temporary folder, the real cafe_state.bin / journal / last_active.txt aren't touched
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import fake_cmu_graphics
+fake_cmu_graphics.install()
+
+import main_game as game
+from cat import Cat, createCats
+from floor import getFloorMask
+from room import Room
+from simulation import CafeSimulation
+from constants import STEP_SECONDS, ROOMS
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_FRAMES = 300
+WARMUP_FRAMES = 30
+ALLOCATION_FRAMES = 60
+DEFAULT_REPEATS = 5  # timed runs per scenario, the fastest one counts (like timeit)
+# how much worse than the baseline a metric can get before it counts as a regression
+# (timings are noisy, draw calls and memory should barely move between runs)
+TIME_TOLERANCE = 0.30
+TOLERANCES = {"drawsPerFrame": 0.01, "allocKiBPerFrame": 0.20}
+TIME_METRICS = ["nsPerTick", "nsWorstTick", "nsPerFrame", "msPerRestore"]
+METRICS = [("nsPerTick", "ns/tick"), ("ticksPerSecond", "ticks/s"), ("nsWorstTick", "ns/worst tick"),
+           ("nsPerFrame", "ns/frame"),
+           ("drawsPerFrame", "draws/frame"), ("allocKiBPerFrame", "alloc KiB/frame"), ("msPerRestore", "ms/restore")]
+HEADLESS_CHUNK = 30  # ticks stepped at a time by the headless scenarios (stopped cats are sent running between)
+
+class BenchClock:
+    # stands in for the time module inside main_game so every frame is exactly one step long
+    # (perf_counter only moves when the harness says so, wall-clock time is left alone)
+    def __init__(self):
+        self.now = 0.0
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def perf_counter(self):
+        return self.now
+
+    def time(self):
+        return time.time()
+
+    def ctime(self, seconds=None):
+        return time.ctime(seconds)
+
+class BenchApp:
+    # the bits of cmu_graphics' app object the callbacks use (onAppStart fills in the rest)
+    pass
+
+class Scenario:
+    def __init__(self, name, description, catCount=None, setup=None, script=None, seed=112, measure=None, ticks=None):
+        self.name = name
+        self.description = description
+        self.catCount = catCount  # None keeps the four starting cats
+        self.setup = setup        # setup(app, rng), after onAppStart
+        self.script = script      # script(app, frame, rng), the input for each frame
+        self.seed = seed
+        self.measure = measure    # measure(scenario, saveDir) -> results, instead of running the game
+        self.ticks = ticks        # how many ticks a headless scenario steps
+
+def makeCats(count, rng):
+    # copies of the starting cats scattered over the floor (crowded rooms are allowed to overlap)
+    templates = createCats()
+    floorMask = getFloorMask()
+    cats = []
+    for i in range(count):
+        template = templates[i % len(templates)]
+        x, y = floorMask.samplePoint(rng=rng)
+        cats.append(Cat(template.name, x, y, template.personality))
+    return cats
+
+def clickAt(app, x, y):
+    game.onMousePress(app, x, y)
+    game.onMouseRelease(app, x, y)
+
+def selectCat(app, rng):
+    # a quick click (shorter than a drag) leaves the popup open on the cat
+    cat = app.cats[0]
+    clickAt(app, cat.x, cat.y)
+
+def pressPopupButtons(app, frame, rng):
+    # hit feed, play and clean in turn every 20 frames
+    if frame % 20 == 0:
+        name = ["feed", "play", "clean"][(frame // 20) % 3]
+        x, y, width, height = game.getAppPopupLayout(app).buttons[name]
+        clickAt(app, x + width / 2, y + height / 2)
+
+def dragStorm(app, frame, rng):
+    # a new drag every 15 frames: pick up a random cat, swing it around for 12 frames, drop it
+    phase = frame % 15
+    if phase == 0:
+        cat = rng.choice(app.cats)
+        app.benchDrag = (cat.x, cat.y)
+        game.onMousePress(app, cat.x, cat.y)
+    elif phase <= 12:
+        startX, startY = app.benchDrag
+        game.onMouseDrag(app, startX + 8 * phase, startY + 4 * phase * (-1) ** phase)
+    elif phase == 13:
+        game.onMouseRelease(app, app.mouseX, app.mouseY)
+
+def addRooms(app, rng):
+    # 24 more rooms of 100 cats each behind the one on screen
+    for i in range(24):
+        room = app.sim.addRoom(Room(f"room {i + 3}", ROOMS[-1][1], makeCats(100, rng)))
+        for cat in room.cats:
+            cat.attachSprites(app.spriteAtlas)
+
+def walkRooms(app, frame, rng):
+    # go to the next room every 60 frames (it catches up on everything it missed)
+    if frame % 60 == 59:
+        game.onKeyPress(app, 'right')
+
+def timeHeadless(scenario, saveDir):
+    # CafeSimulation.step on its own with every cat running (the most work a tick can be)
+    rng = random.Random(scenario.seed)
+    random.seed(scenario.seed)
+    cats = makeCats(scenario.catCount, rng) if scenario.catCount is not None else None
+    sim = CafeSimulation(cats, trackAbsence=False)
+    gc.collect()
+    stepNs = 0
+    for chunk in range(scenario.ticks // HEADLESS_CHUNK):
+        for cat in sim.cats:
+            if not cat.isRunning:
+                cat.startRunning()
+        stepStart = time.perf_counter_ns()
+        sim.step(HEADLESS_CHUNK)
+        stepNs += time.perf_counter_ns() - stepStart
+    return {"nsPerTick": stepNs / (scenario.ticks // HEADLESS_CHUNK * HEADLESS_CHUNK)}
+
+def timeRestore(scenario, saveDir):
+    # what a launch pays to get a saved cafe back: a new simulation plus loading the snapshot
+    rng = random.Random(scenario.seed)
+    random.seed(scenario.seed)
+    path = os.path.join(saveDir, "cafe_state.bin")
+    CafeSimulation(makeCats(scenario.catCount, rng), trackAbsence=False).saveSnapshot(path)
+    gc.collect()
+    restoreStart = time.perf_counter_ns()
+    sim = CafeSimulation(trackAbsence=False)
+    sim.loadSnapshot(path)
+    return {"msPerRestore": (time.perf_counter_ns() - restoreStart) / 1e6}
+
+def timeCatchUp(scenario, saveDir):
+    # the background rooms catching up while nobody's looking, one tick at a time so the
+    # ticks a catch-up lands on show up in the worst tick
+    rng = random.Random(scenario.seed)
+    random.seed(scenario.seed)
+    sim = CafeSimulation(makeCats(scenario.catCount, rng), trackAbsence=False)
+    for i in range(24):
+        sim.addRoom(Room(f"room {i + 3}", ROOMS[-1][1], makeCats(scenario.catCount, rng)))
+    gc.collect()
+    stepNs = worstNs = 0
+    for tick in range(scenario.ticks):
+        stepStart = time.perf_counter_ns()
+        sim.step()
+        tickNs = time.perf_counter_ns() - stepStart
+        stepNs += tickNs
+        worstNs = max(worstNs, tickNs)
+    return {"nsPerTick": stepNs / scenario.ticks, "nsWorstTick": worstNs}
+
+SCENARIOS = [
+    Scenario("idle_room", "the four starting cats, nobody touching anything"),
+    Scenario("cats_100", "100 cats, no input", catCount=100),
+    Scenario("cats_1000", "1,000 cats, no input", catCount=1000),
+    Scenario("drag_storm", "100 cats, a cat dragged and dropped every half second", catCount=100, script=dragStorm),
+    Scenario("popup_open", "popup open on a cat, feed/play/clean clicked every 20 frames",
+             setup=selectCat, script=pressPopupButtons),
+    Scenario("rooms_26", "25 rooms of 100 cats and the empty lounge, going to the next room every 60 frames",
+             catCount=100, setup=addRooms, script=walkRooms),
+    Scenario("headless_4", "no game, just the simulation: the four starting cats, always running",
+             measure=timeHeadless, ticks=30000),
+    Scenario("headless_1000", "no game, just the simulation: 1,000 cats, always running",
+             catCount=1000, measure=timeHeadless, ticks=600),
+    Scenario("restore_10000", "no game: a new simulation loading a saved cafe of 10,000 cats",
+             catCount=10000, measure=timeRestore),
+    Scenario("catch_up_26", "no game: 25 rooms of 100 cats and the empty lounge, the background ones catching up",
+             catCount=100, measure=timeCatchUp, ticks=1800),
+]
+
+def startGame(scenario, saveDir):
+    # fresh game with its saves in saveDir and the scenario's cats
+    # (the last run's saves are cleared first, otherwise the game would pick up where that one stopped)
+    for name in os.listdir(saveDir):
+        os.remove(os.path.join(saveDir, name))
+    game.SNAPSHOT_FILE = os.path.join(saveDir, "cafe_state.bin")
+    game.JOURNAL_FILE = os.path.join(saveDir, "cafe_journal")
+    game.ACTIVITY_FILE = os.path.join(saveDir, "last_active.txt")
+    game.time = BenchClock()
+    rng = random.Random(scenario.seed)
+    random.seed(scenario.seed)
+    app = BenchApp()
+    game.onAppStart(app)
+    if scenario.catCount is not None:
+        app.sim.replaceCats(makeCats(scenario.catCount, rng))
+        for cat in app.cats:
+            cat.attachSprites(app.spriteAtlas)
+    if scenario.setup:
+        scenario.setup(app, rng)
+    return app, rng
+
+def stopGame(app):
+    app.sim.journal.close()
+    app.absenceTracker.writer.close()
+
+def runFrame(app, scenario, frame, rng):
+    if scenario.script:
+        scenario.script(app, frame, rng)
+    game.time.advance(STEP_SECONDS)
+    game.onStep(app)
+    game.redrawAll(app)
+
+def timeScenario(scenario, frames, saveDir):
+    recorder = fake_cmu_graphics.recorder
+    app, rng = startGame(scenario, saveDir)
+    for frame in range(WARMUP_FRAMES):
+        runFrame(app, scenario, frame, rng)
+    gc.collect()
+    stepNs = 0
+    frameTimes = []
+    recorder.reset()
+    startTick = app.sim.stepCounter
+    for frame in range(WARMUP_FRAMES, WARMUP_FRAMES + frames):
+        frameStart = time.perf_counter_ns()
+        if scenario.script:
+            scenario.script(app, frame, rng)
+        game.time.advance(STEP_SECONDS)
+        stepStart = time.perf_counter_ns()
+        game.onStep(app)
+        stepNs += time.perf_counter_ns() - stepStart
+        game.redrawAll(app)
+        frameTimes.append(time.perf_counter_ns() - frameStart)
+    ticks = app.sim.stepCounter - startTick
+    draws = dict(recorder.counts)
+    stopGame(app)
+    return {
+        "nsPerTick": stepNs / max(1, ticks),
+        "nsPerFrame": statistics.median(frameTimes),  # the odd slow frame (gc, the os) doesn't count
+        "drawsPerFrame": sum(draws.values()) / frames,
+        "drawCalls": {name: count / frames for name, count in draws.items() if count},
+    }
+
+def measureAllocations(scenario, frames, saveDir):
+    # peak memory allocated during a frame on top of what was live when it started
+    app, rng = startGame(scenario, saveDir)
+    for frame in range(WARMUP_FRAMES):
+        runFrame(app, scenario, frame, rng)
+    gc.collect()
+    tracemalloc.start()
+    peakBytes = 0
+    blocksBefore = sys.getallocatedblocks()
+    for frame in range(WARMUP_FRAMES, WARMUP_FRAMES + frames):
+        tracemalloc.reset_peak()
+        frameStart = tracemalloc.get_traced_memory()[0]
+        runFrame(app, scenario, frame, rng)
+        peakBytes += tracemalloc.get_traced_memory()[1] - frameStart
+    tracemalloc.stop()
+    blocksAfter = sys.getallocatedblocks()
+    stopGame(app)
+    return {
+        "allocKiBPerFrame": peakBytes / frames / 1024,
+        "blocksKeptPerFrame": (blocksAfter - blocksBefore) / frames,
+    }
+
+def runScenario(scenario, frames, repeats=DEFAULT_REPEATS):
+    with tempfile.TemporaryDirectory(prefix="cafe_bench_") as saveDir:
+        # the game prints a lot (collisions, absence checks), keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if scenario.measure:
+                runs = [scenario.measure(scenario, saveDir) for i in range(max(1, repeats))]
+            else:
+                runs = [timeScenario(scenario, frames, saveDir) for i in range(max(1, repeats))]
+            results = runs[0]
+            for metric in TIME_METRICS:
+                if metric in results:
+                    results[metric] = min(run[metric] for run in runs)
+            if scenario.measure:
+                if "nsPerTick" in results:
+                    results["ticksPerSecond"] = 1e9 / results["nsPerTick"]
+            else:
+                results.update(measureAllocations(scenario, min(frames, ALLOCATION_FRAMES), saveDir))
+    return results
+
+def loadBaseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def compareToBaseline(results, baseline, tolerances):
+    # {metric: (change as a fraction, is it a regression)} for the metrics the baseline has
+    comparison = {}
+    for metric, tolerance in tolerances.items():
+        if metric not in baseline or not baseline[metric] or metric not in results:
+            continue
+        change = (results[metric] - baseline[metric]) / baseline[metric]
+        comparison[metric] = (change, change > tolerance)
+    return comparison
+
+def formatValue(metric, value):
+    if metric.startswith("ns") or metric == "ticksPerSecond":
+        return f"{value:,.0f}"
+    return f"{value:,.1f}"
+
+def printReport(name, results, comparison):
+    print(name)
+    for metric, label in METRICS:
+        if metric not in results:
+            continue
+        line = f"  {label:<16} {formatValue(metric, results[metric]):>14}"
+        if metric in comparison:
+            change, regressed = comparison[metric]
+            line += f"  {change:+7.1%} vs baseline" + ("  REGRESSION" if regressed else "")
+        print(line)
+    if "drawCalls" in results:
+        calls = ", ".join(f"{name} {count:.1f}" for name, count in sorted(results["drawCalls"].items()))
+        print(f"  {'draw calls':<16} {calls}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cafe's frame loop with a fake cmu_graphics.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help="scenarios to run (default: all of " + ", ".join(s.name for s in SCENARIOS) + ")")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="measured frames per scenario")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEATS, help="timed runs per scenario (fastest wins)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help="how much slower than the baseline (as a fraction) counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args(argv)
+    scenarios = {scenario.name: scenario for scenario in SCENARIOS}
+    for name in args.scenarios:
+        if name not in scenarios:
+            parser.error(f"unknown scenario {name!r}")
+    # the game loads its images with paths relative to the project folder
+    os.chdir(REPO_DIR)
+    baseline = loadBaseline(args.baseline)
+    tolerances = dict(TOLERANCES)
+    tolerances.update({metric: args.time_tolerance for metric in TIME_METRICS})
+    allResults = {}
+    regressions = []
+    for name in args.scenarios or list(scenarios):
+        results = runScenario(scenarios[name], args.frames, args.repeat)
+        allResults[name] = results
+        comparison = {} if args.save_baseline else compareToBaseline(results, baseline.get(name, {}), tolerances)
+        printReport(name, results, comparison)
+        regressions += [f"{name} {metric}" for metric, (change, regressed) in comparison.items() if regressed]
+    if args.save_baseline:
+        baseline.update(allResults)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+    elif regressions:
+        print("Slower than the baseline: " + ", ".join(regressions))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+# packs images/cats/ into images/atlas/ (needs Pillow)
+# rerun this whenever sprites are added or changed
+
+import os
+from sprites import buildAtlas, ATLAS_DIR, ATLAS_MANIFEST
+
+def main():
+    manifest = buildAtlas()
+    for catName, entry in manifest["cats"].items():
+        frameCount = sum(len(rects) for rects in entry["states"].values())
+        print(f"{catName}: {frameCount} frames -> {os.path.join(ATLAS_DIR, entry['image'])}")
+    print(f"Wrote {ATLAS_MANIFEST}")
+
+if __name__ == "__main__":
+    main()
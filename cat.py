@@ -3,27 +3,119 @@
 ##   fundamentals of purr-ogramming cafe   ##
 #############################################
 
-from cmu_graphics import *
+import math
 import random
+from functools import partial
+from constants import (PERSONALITY_TYPES, CAT_EVENT_PRIORITY, ANIMATION_SPEEDS, DEFAULT_ANIMATION_SPEED,
+                       BUBBLE_SWAP_STEPS, PLACEHOLDER_COLORS)
+from sprites import getFrameCounts
+from floor import isValidPosition, getFloorMask
+from scheduler import geometricWait
 
-# define allowed placement area for isometric room floor
-# again this took a lot of trial and error to create 
-def isValidPosition(x, y):
-    # isometric room boundaries based on the floor area
-    centerX = 600  
-    centerY = 700      
-    width = 580   
-    height = 580      
-    dx = x - centerX
-    dy = y - centerY
-    # diamond shape condition for the floor area
-    return abs(dx) / (width / 2) + abs(dy) / (height / 2) <= 1
+# frame table entry for a state without sprites: no frames and no fallback, so the placeholder is drawn
+NO_SPRITES = (0, 0, None)
+
+# the cat rules written as plain functions of numbers, so loops that keep cats in arrays instead
+# of Cat objects (see sharded_sim.py) run the exact same float operations in the same order
+
+def advanceStats(hunger, happiness, energy, cleanliness, isSleeping, isRunning,
+                 hungerRate, energyRate, messyRate, socialNeed, timeMultiplier=1):
+    # one updateStats tick, returns (hunger, happiness, energy, cleanliness, isSleeping, activity, mood)
+    # activity is "sleeping"/"idle" if the cat fell asleep/woke up this tick, otherwise None
+    activity = None
+    # check if cat should start sleeping
+    if energy < 30 and not isSleeping and not isRunning:
+        isSleeping = True
+        activity = "sleeping"
+    # check if cat should wake up (well rested or very hungry)
+    elif isSleeping and (energy >= 80 or hunger <= 15):
+        isSleeping = False
+        activity = "idle"
+    # update stats based on sleep state
+    if isSleeping:
+        # while sleeping: restore energy, slow hunger drain
+        energy = min(100, energy + (0.9 * timeMultiplier))  # restore energy
+        hunger = max(0, hunger - (0.05 * hungerRate * timeMultiplier))  # slower hunger
+        cleanliness = max(0, cleanliness - (0.01 * messyRate * timeMultiplier))  # very slow mess
+    else:
+        # while awake: normal stat drain
+        hunger = max(0, hunger - (0.1 * hungerRate * timeMultiplier))
+        energy = max(0, energy - (0.05 * energyRate * timeMultiplier))
+        cleanliness = max(0, cleanliness - (0.03 * messyRate * timeMultiplier))
+    # happiness changes based on overall care
+    if hunger < 20 or energy < 20 or cleanliness < 20:
+        happiness = max(0, happiness - (0.15 * socialNeed * timeMultiplier))
+    elif hunger > 80 and energy > 80 and cleanliness > 80:
+        happiness = min(100, happiness + (0.05 * timeMultiplier))
+    # update mood based on average stats
+    avgStat = (hunger + happiness + energy + cleanliness) / 4
+    if avgStat > 70:
+        mood = "happy"
+    elif avgStat > 40:
+        mood = "neutral"
+    else:
+        mood = "sad"
+    return hunger, happiness, energy, cleanliness, isSleeping, activity, mood
+
+def stepTowards(x, y, targetX, targetY, speed):
+    # one tick of a run: the next position, or None once the cat is at the target
+    dx = targetX - x
+    dy = targetY - y
+    distance = (dx**2 + dy**2)**0.5
+    if distance <= 2:
+        return None
+    # an attempt tp make a smooth movement towards the target
+    moveX = (dx / distance) * speed
+    moveY = (dy / distance) * speed
+    # stronger easing when close to target for smoother approach
+    if distance < 80:
+        easeFactor = distance / 80
+        moveX *= easeFactor * 0.7  # extra smoothing factor
+        moveY *= easeFactor * 0.7
+    return x + moveX, y + moveY
+
+def getRunChance(playfulness):
+    # chance per tick of a random run: the old `randint(1, 1000) < playfulness` roll
+    # (which can only succeed for playfulness above 1)
+    return max(0, min(999, math.ceil(playfulness) - 1)) / 1000
+
+def pickRunTarget(x, rng=random):
+    # a random spot on the floor to the RIGHT of x (or anywhere on the floor if there's no room to the right)
+    floor = getFloorMask()
+    return floor.samplePoint(minX=x + 50, rng=rng) or floor.samplePoint(rng=rng)
+
+def chooseAutonomousActivity(hunger, cleanliness, rng=random):
+    # what an idle cat does on its own, based on what it needs most (None = nothing)
+    if hunger < 30:
+        return "foraging"
+    elif cleanliness < 30:
+        return "self-grooming"
+    elif rng.random() < 0.3:  # 30% chance
+        return "wandering"
+    return None
+
+def applyActivityStats(activity, hunger, happiness, energy, cleanliness):
+    # stat changes from starting an autonomous activity, returns (hunger, happiness, energy, cleanliness)
+    if activity == "foraging":
+        # slowly recover hunger
+        hunger = min(100, hunger + 10)
+    elif activity == "self-grooming":
+        # Iiprove cleanliness
+        cleanliness = min(100, cleanliness + 15)
+    elif activity == "playing":
+        # boost happiness but use energy
+        happiness = min(100, happiness + 8)
+        energy = max(0, energy - 5)
+    return hunger, happiness, energy, cleanliness
 
 class Cat:
     def __init__(self, name, x, y, personality=None):
         self.name = name
         self.x = x
         self.y = y
+        # position at the previous tick, drawing blends between the two (see getDrawPosition)
+        self.prevX = x
+        self.prevY = y
         
         # store last valid position for placement restrictions
         self.lastValidX = x
@@ -37,7 +129,6 @@ class Cat:
         
         # animation and behavior
         self.mood = "neutral"
-        self.animationFrame = 0
         self.lastActionTime = 0
         self.isSleeping = False
         self.activity = "idle"
@@ -51,19 +142,15 @@ class Cat:
         self.dragOffsetX = 0
         self.dragOffsetY = 0
         
-        self.currentFrame = 0
-        self.animationSpeed = 12 
-        self.frameTimer = 0
-        
+        # animation state and the step the cat was first seen in it (frames are counted from there)
+        self.animationState = None
+        self.stateEnterTick = 0
+
         # all cat sprites/room sprites from itch.io (artist: ToffeeCraft)
-        self.spriteFrames = {
-            "idle_neutral": 6,    # all cats have ~6 frames for idle neutral
-            "idle_happy": 8,      # all cats have ~8 frames for idle happy
-            "sad": 14,        # all cats have ~6 frames for idle sad
-            "sleeping": 2,        # all cats have ~2 frames for sleeping
-            "dangling": 1,        # 2 frames for dangling (frames of jumping of happy)
-            "running": 7,         # 7 frames for running animation
-        }
+        # frame counts come from the files in images/cats (shared by every cat, see sprites.py)
+        # and are only looked up when the cat gets its sprites for drawing (see attachSprites)
+        # dangling isn't in there so it stays a single frame
+        self.spriteFrames = {}
         
         # personality 
         self.personality = personality or {
@@ -79,7 +166,7 @@ class Cat:
         
         # running behavior
         self.isRunning = False
-        self.runTimer = 0
+        self.runEndTick = 0  # tick the current run stops at
         self.runDuration = 0
         self.runTargetX = 0
         self.runTargetY = 0
@@ -87,117 +174,156 @@ class Cat:
         self.facingLeft = False
 
         # absence tracker support
-        self.autonomousTimer = 0
+        self.autonomousEndTick = 0  # tick the current autonomous activity ends at (0 = none)
+
+        # {state: (first index, frame count)} from the sprite atlas (see attachSprites)
+        self.spriteTable = {}
+        self.impostorSprites = {}
+
+        # anything that needs to know when this cat moves (e.g. the simulation's spatial grid)
+        self.trackers = []
+        self.occupancy = None  # set by the simulation, used to find free spots
+        self.statsTable = None  # the simulation's CatStatsTable while it's vectorized (see runWithStats)
+
+        # the simulation's TickScheduler (see scheduleEvents), runs and activities end through it
+        self.scheduler = None
+        self.runEvent = None
+        self.runChanceEvent = None
+        self.autonomousEvent = None
+
+    def moveTo(self, x, y):
+        # every position change goes through here so the trackers stay up to date
+        # (a jump like a drag or a wander isn't blended, updateRunning smooths its own steps)
+        self.x = x
+        self.y = y
+        self.prevX = x
+        self.prevY = y
+        self.notifyTrackers()
+
+    def getDrawPosition(self, alpha=1.0):
+        # where to draw between the last two ticks (alpha is how far into the next tick we are)
+        return (self.prevX + (self.x - self.prevX) * alpha,
+                self.prevY + (self.y - self.prevY) * alpha)
+
+    def notifyTrackers(self):
+        # tell the grids (and the journal) that this cat changed
+        for tracker in self.trackers:
+            tracker.updateCat(self)
 
     def feed(self):
         self.hunger = min(100, self.hunger + 15)
         self.happiness = min(100, self.happiness + 5)
         self.activity = "eating"
+        self.notifyTrackers()
         
     def play(self):
         if self.energy > 20:
             self.happiness = min(100, self.happiness + 12 * self.personality['playfulness'])
             self.energy = max(0, self.energy - 8)
             self.activity = "playing"
+            self.notifyTrackers()
         
     def clean(self):
         self.cleanliness = min(100, self.cleanliness + 20)
         self.happiness = min(100, self.happiness + 3)
         self.activity = "cleaning"
+        self.notifyTrackers()
 
     def startDrag(self, mouseX, mouseY):
         self.isBeingDragged = True
         self.dragOffsetX = mouseX - self.x
         self.dragOffsetY = mouseY - self.y
         self.happiness = max(0, self.happiness - 1)
+        self.notifyTrackers()
 
     def updateDragPosition(self, mouseX, mouseY):
         if self.isBeingDragged:
-            self.x = mouseX - self.dragOffsetX
-            self.y = mouseY - self.dragOffsetY
+            self.moveTo(mouseX - self.dragOffsetX, mouseY - self.dragOffsetY)
 
-    def updateRunning(self):
-        # need to handle "random" running
+    def getCurrentTick(self):
+        return self.scheduler.currentTick if self.scheduler else 0
+
+    def scheduleEvents(self, scheduler):
+        # (re)create this cat's timed events from its fields, e.g. after loading a save
+        self.scheduler = scheduler
+        if self.isRunning and self.runEndTick:
+            self.runEvent = scheduler.schedule(max(self.runEndTick, scheduler.currentTick + 1),
+                                               partial(self.runWithStats, self.stopRunning), CAT_EVENT_PRIORITY)
+        if self.autonomousEndTick:
+            self.autonomousEvent = scheduler.schedule(max(self.autonomousEndTick, scheduler.currentTick + 1),
+                                                      partial(self.runWithStats, self.endAutonomousActivity),
+                                                      CAT_EVENT_PRIORITY)
+        self.scheduleRunChance()
+
+    def runWithStats(self, callback):
+        # events and run stops read and change the stats, which a stats table (see cat_stats.py)
+        # holds between writeBacks, so this cat's row is copied over first and back afterwards
+        if not self.statsTable:
+            callback()
+            return
+        self.statsTable.writeBackCat(self)
+        callback()
+        self.statsTable.loadCat(self)
+
+    def getRunChance(self):
+        return getRunChance(self.personality['playfulness'])
+
+    def scheduleRunChance(self):
+        # instead of rolling every tick, wait for the tick the roll would first succeed on
+        # (the wait until the first success of a per-tick roll is geometric)
+        wait = geometricWait(self.getRunChance())
+        if self.scheduler and wait is not None:
+            self.runChanceEvent = self.scheduler.scheduleIn(wait, partial(self.runWithStats, self.tryRandomRun),
+                                                            CAT_EVENT_PRIORITY)
+
+    def tryRandomRun(self):
+        self.scheduleRunChance()
+        # only start running if cat is not sleeping and not already running
         if not self.isBeingDragged and not self.isSleeping and not self.isRunning:
-            # only start running if cat is not sleeping and not already running
-            # much lower chance 
-            chance = random.randint(1, 1000) 
-            threshold = 1 * self.personality['playfulness']
-            if chance < threshold:
-                self.startRunning()
-        
-        # if currently running
+            self.startRunning()
+
+    def updateRunning(self):
+        # called every tick while the cat is running (the simulation only does this for running cats)
         if self.isRunning:
-            self.runTimer += 1
-            
             # move towards target
-            dx = self.runTargetX - self.x
-            dy = self.runTargetY - self.y
-            distance = (dx**2 + dy**2)**0.5
-            
             # always face right when running
             self.facingLeft = False
-            
-            if distance > 2: 
-                # an attempt tp make a smooth movement towards the target
-                moveX = (dx / distance) * self.runSpeed
-                moveY = (dy / distance) * self.runSpeed
-                
-                # stronger easing when close to target for smoother approach
-                if distance < 80:
-                    easeFactor = distance / 80
-                    moveX *= easeFactor * 0.7  # extra smoothing factor
-                    moveY *= easeFactor * 0.7
-                
-                self.x += moveX
-                self.y += moveY
+            nextPosition = stepTowards(self.x, self.y, self.runTargetX, self.runTargetY, self.runSpeed)
+            if nextPosition:
+                # a plain step skips moveTo: the simulation tells the trackers about all of
+                # the tick's running cats at once (see CafeSimulation.step)
+                self.prevX, self.prevY = self.x, self.y
+                self.x, self.y = nextPosition
             else:
-                self.stopRunning()
-            
-            # stop running after duration
-            if self.runTimer > self.runDuration:
-                self.stopRunning()
+                self.runWithStats(self.stopRunning)
 
     def startRunning(self):
         self.isRunning = True
-        self.runTimer = 0
         self.runDuration = random.randint(90, 150)  # run for 3-5 seconds (30 fps = 90-150 frames)
+        # stop running after duration
+        self.runEndTick = self.getCurrentTick() + self.runDuration + 1
+        if self.scheduler:
+            self.scheduler.cancel(self.runEvent)
+            self.runEvent = self.scheduler.schedule(self.runEndTick, partial(self.runWithStats, self.stopRunning),
+                                                    CAT_EVENT_PRIORITY)
         # pick a random valid target position that's to the RIGHT of current position
-        attempts = 0
-        while attempts < 10:  # try to find valid position
-            minX = max(80, int(self.x + 50))
-            maxX = 1200
-            if minX < maxX:
-                targetX = random.randint(max(100, int(self.x + 50)), 1800)  # only targets to the right
-                targetY = random.randint(100, 900)
-                if isValidPosition(targetX, targetY):
-                    self.runTargetX = targetX
-                    self.runTargetY = targetY
-                    break
-                attempts += 1
-        
-        # if no valid position found to the right, pick any valid position
-        if attempts >= 10:
-            attempts = 0
-            while attempts < 10:
-                targetX = random.randint(100, 1800)
-                targetY = random.randint(100, 900)
-                if isValidPosition(targetX, targetY):
-                    self.runTargetX = targetX
-                    self.runTargetY = targetY
-                    break
-                attempts += 1
-        
+        # (or anywhere on the floor if there's no room to the right) - sampled straight from the floor mask
+        self.runTargetX, self.runTargetY = pickRunTarget(self.x)
         # boost happiness slightly when running
         if self.personality['playfulness'] > 1.0:
             self.happiness = min(100, self.happiness + 2)
         
         self.activity = "running"
+        self.notifyTrackers()
 
     def stopRunning(self):
+        if self.scheduler:
+            self.scheduler.cancel(self.runEvent)
+        self.runEvent = None
         self.isRunning = False
-        self.runTimer = 0
+        self.runEndTick = 0
         self.activity = "idle"
+        self.notifyTrackers()
 
     def stopDrag(self):
         # when stopping drag, check if position is valid:
@@ -207,10 +333,10 @@ class Cat:
             self.lastValidY = self.y
         else:
             # revert to last valid position
-            self.x = self.lastValidX
-            self.y = self.lastValidY
+            self.moveTo(self.lastValidX, self.lastValidY)
         self.isBeingDragged = False
         self.happiness = min(100, self.happiness + 2)
+        self.notifyTrackers()
 
     def getCurrentAnimationState(self):
         # check if being dragged first - use dangling animation
@@ -230,232 +356,183 @@ class Cat:
         else:
             return "idle_neutral"
 
-    def updateAnimation(self):
-        self.frameTimer += 1
+    def getAnimationFrame(self, tick=None):
+        # current frame worked out from the clock, so nothing has to be updated every step
+        # and cats that aren't drawn cost nothing
+        if tick is None:
+            tick = self.getCurrentTick()
         currentState = self.getCurrentAnimationState()
-        # initialize previous state tracking if it doesn't exist
-        # hasattr from: https://www.w3schools.com/python/ref_func_hasattr.asp (this is where i learnt of its use)
-        if not hasattr(self, 'previousAnimationState'):
-            self.previousAnimationState = currentState
-            self.currentFrame = 0
-        # ALWAYS reset frame when state changes
-        if currentState != self.previousAnimationState:
-            self.currentFrame = 0
-            self.frameTimer = 0
-            self.previousAnimationState = currentState
-        # get max frames and ensure current frame is valid
+        # ALWAYS restart the animation when state changes
+        if currentState != self.animationState:
+            self.animationState = currentState
+            self.stateEnterTick = tick
         maxFrames = self.spriteFrames.get(currentState, 1)
-        if self.currentFrame >= maxFrames:
-            self.currentFrame = 0
-        # set animation speeds
-        animationSpeeds = {
-            "dangling": 15,
-            "running": 5,
-            "sleeping": 20,
-            "idle_happy": 8,
-            "sad": 15,
-            "idle_neutral": 12
-        }
-        animationSpeed = animationSpeeds.get(currentState, self.animationSpeed)
-        # advance frame
-        if self.frameTimer >= animationSpeed:
-            self.frameTimer = 0
-            self.currentFrame = (self.currentFrame + 1) % maxFrames
+        animationSpeed = ANIMATION_SPEEDS.get(currentState, DEFAULT_ANIMATION_SPEED)
+        return ((tick - self.stateEnterTick) // animationSpeed) % maxFrames
 
     # initially was unsure how to handle getting sprites but was helped by students Josie Peller and Joshua Wang (fellow students)
-    def getSpritePath(self):
+    def getSpritePath(self, tick=None):
+        currentFrame = self.getAnimationFrame(tick)
         currentState = self.getCurrentAnimationState()
         maxFrames = self.spriteFrames.get(currentState, 1)
-        # clamp frame to valid range (prevents bug where frame counter was reset when switching animation states)
-        # idea to clamp came from Elwin Li (implementation was my own)
-        safeFrame = self.currentFrame % maxFrames
         # special handling for dangling - use happy frames 3-4 [?? have to double check number but it looks right]
         if currentState == "dangling":
             # map dangling frames 0-1 to happy frames 3-4 [??]
-            actualFrame = self.currentFrame + 3
+            actualFrame = currentFrame + 3
             spriteFilename = f"{self.name}_idle_happy_{actualFrame}.png"
         elif maxFrames > 1:
             # normal multi-frame animations
-            frameNum = self.currentFrame  # Keep 0-indexed
+            frameNum = currentFrame  # Keep 0-indexed
             spriteFilename = f"{self.name}_{currentState}_{frameNum}.png"
         else:
             # single frame animations
             spriteFilename = f"{self.name}_{currentState}.png"  
         return f"images/cats/{spriteFilename}"
 
+    def attachSprites(self, atlas):
+        # look up this cat's frames once so drawing only does integer math
+        self.spriteTable = atlas.getFrameTable(self.name)
+        self.spriteFrames = getFrameCounts().get(self.name, {})
+        # first frame of each state, what the cat is drawn as when it's far away in a crowded room (see lod.py)
+        self.impostorSprites = {state: first if frameCount else fallback
+                                for state, (first, frameCount, fallback) in self.spriteTable.items()}
+
+    def getSpriteIndex(self, tick=None):
+        # same frame choice as getSpritePath but as an index into the sprite atlas
+        # (frames that don't exist give the fallback resolved at startup, None = placeholder)
+        currentFrame = self.getAnimationFrame(tick)
+        # cats drawn before attachSprites (e.g. just loaded) get the placeholder until they have sprites
+        first, frameCount, fallback = self.spriteTable.get(self.animationState, NO_SPRITES)
+        if currentFrame < frameCount:
+            return first + currentFrame
+        return fallback
+
     def updateStats(self, timeMultiplier=1):
-        # check if cat should start sleeping
-        if self.energy < 30 and not self.isSleeping and not self.isRunning:
-            self.isSleeping = True
-            self.activity = "sleeping"
-        # check if cat should wake up (well rested or very hungry)
-        elif self.isSleeping and (self.energy >= 80 or self.hunger <= 15):
-            self.isSleeping = False
-            self.activity = "idle"
-        # update stats based on sleep state
-        if self.isSleeping:
-            # while sleeping: restore energy, slow hunger drain
-            self.energy = min(100, self.energy + (0.9 * timeMultiplier))  # restore energy
-            self.hunger = max(0, self.hunger - (0.05 * self.personality['hungerRate'] * timeMultiplier))  # slower hunger
-            self.cleanliness = max(0, self.cleanliness - (0.01 * self.personality['messyRate'] * timeMultiplier))  # very slow mess
-        else:
-            # while awake: normal stat drain
-            self.hunger = max(0, self.hunger - (0.1 * self.personality['hungerRate'] * timeMultiplier))
-            self.energy = max(0, self.energy - (0.05 * self.personality['energyRate'] * timeMultiplier))
-            self.cleanliness = max(0, self.cleanliness - (0.03 * self.personality['messyRate'] * timeMultiplier))
-        # happiness changes based on overall care
-        if self.hunger < 20 or self.energy < 20 or self.cleanliness < 20:
-            self.happiness = max(0, self.happiness - (0.15 * self.personality['socialNeed'] * timeMultiplier))
-        elif self.hunger > 80 and self.energy > 80 and self.cleanliness > 80:
-            self.happiness = min(100, self.happiness + (0.05 * timeMultiplier))
-        # update mood based on average stats
-        avgStat = (self.hunger + self.happiness + self.energy + self.cleanliness) / 4
-        if avgStat > 70:
-            self.mood = "happy"
-        elif avgStat > 40:
-            self.mood = "neutral"
-        else:
-            self.mood = "sad"
+        # the rules are in advanceStats (shared with sharded_sim.py)
+        personality = self.personality
+        (self.hunger, self.happiness, self.energy, self.cleanliness, self.isSleeping, activity, self.mood) = advanceStats(
+            self.hunger, self.happiness, self.energy, self.cleanliness, self.isSleeping, self.isRunning,
+            personality['hungerRate'], personality['energyRate'], personality['messyRate'], personality['socialNeed'],
+            timeMultiplier)
+        if activity:
+            self.activity = activity
 
     def startAutonomousActivity(self, activity):
         self.activity = activity
-        self.autonomousTimer = random.randint(60, 180)  # 2-6 seconds at 30fps
+        self.autonomousEndTick = self.getCurrentTick() + random.randint(60, 180)  # 2-6 seconds at 30fps
+        if self.scheduler:
+            self.scheduler.cancel(self.autonomousEvent)
+            self.autonomousEvent = self.scheduler.schedule(self.autonomousEndTick,
+                                                           partial(self.runWithStats, self.endAutonomousActivity),
+                                                           CAT_EVENT_PRIORITY)
         if activity == "wandering":
-            # move to a random valid location
-            attempts = 0
-            while attempts < 10:
-                targetX = random.randint(300, 900)
-                targetY = random.randint(500, 800)
-                if isValidPosition(targetX, targetY):
-                    self.x = targetX
-                    self.y = targetY
-                    break
-                attempts += 1   
-        elif activity == "foraging":
-            # slowly recover hunger
-            self.hunger = min(100, self.hunger + 10)
-        elif activity == "self-grooming":
-            # Iiprove cleanliness
-            self.cleanliness = min(100, self.cleanliness + 15)
-        elif activity == "playing":
-            # boost happiness but use energy
-            self.happiness = min(100, self.happiness + 8)
-            self.energy = max(0, self.energy - 5)
+            # move to a random valid location (the nearest free one if another cat is there)
+            targetX, targetY = getFloorMask().samplePoint()
+            if self.occupancy:
+                targetX, targetY = self.occupancy.findNearestFree(targetX, targetY, self) or (targetX, targetY)
+            self.moveTo(targetX, targetY)
+        self.hunger, self.happiness, self.energy, self.cleanliness = applyActivityStats(
+            activity, self.hunger, self.happiness, self.energy, self.cleanliness)
+        self.notifyTrackers()
     
-    def updateAutonomousBehavior(self):
-        if self.autonomousTimer > 0:
-            self.autonomousTimer -= 1
-            if self.autonomousTimer <= 0:
-                self.activity = "idle"
-
-    def draw(self, app):
-        from constants import PLACEHOLDER_COLORS
-        self.animationFrame += 1
-        self.updateAnimation()
-        self.updateRunning()  # add running behavior
-        self.updateAutonomousBehavior()  # update autonomous behaviors
-        spriteLoaded = False
-        # first we try the primary sprite system
-        if not spriteLoaded:
-            try:
-                spritePath = self.getSpritePath()
-                drawImage(spritePath, self.x, self.y, align='center', width=80, height=80)
-                spriteLoaded = True
-            # this code/idea from: https://stackoverflow.com/questions/18982610/difference-between-except-and-except-exception-as-e 
-            # and: https://rollbar.com/blog/what-is-except-exception-as-e-in-python/ 
-            except Exception as e:
-                pass
-        # there were initially bugs with loading sprites so i asked claude (AI) 
-        # "how can i trial a sprite path/show something else if my sprite has a bug"
-        # so that is why i have so many try/except loops
-        # first we try the primary sprite system
-        if not spriteLoaded:
-            try:
-                spritePath = self.getSpritePath()
-                drawImage(spritePath, self.x, self.y, align='center', width=80, height=80)
-                spriteLoaded = True
-            except:
-                pass
-        # then fallback to mood-based sprites
-        if not spriteLoaded:
-            try:
-                if self.isSleeping:
-                    spritePath = f"images/cats/{self.name}_sleeping.png"
-                else:
-                    spritePath = f"images/cats/{self.name}_{self.mood}.png"
-                drawImage(spritePath, self.x, self.y, align='center', width=80, height=80)
-                spriteLoaded = True
-            except:
-                pass
-        # final fallback to basic sprite
-        if not spriteLoaded:
-            try:
-                spritePath = f"images/cats/{self.name}.png"
-                drawImage(spritePath, self.x, self.y, align='center', width=80, height=80)
-                spriteLoaded = True
-            except:
-                pass
-        # if no sprite loaded, show placeholder
-        if not spriteLoaded:
+    def endAutonomousActivity(self):
+        self.autonomousEvent = None
+        self.autonomousEndTick = 0
+        self.activity = "idle"
+        self.notifyTrackers()
+
+    def draw(self, app, alpha=1.0, showBubble=True, showName=True, animationStep=1):
+        # only draws (the simulation updates the cat), alpha blends between the last two ticks
+        # graphics are only imported when actually drawing so the simulation can run headless
+        # crowded rooms turn off the bubble/name and slow the animation down (see lod.py),
+        # slow computers lose the drag shadow, the bubble swapping and some animation frames (see frame_budget.py)
+        from cmu_graphics import drawImage, drawRect, drawLabel, drawCircle, rgb
+        budget = app.frameBudget
+        x, y = self.getDrawPosition(alpha)
+        tick = self.getCurrentTick()
+        animationStep = max(animationStep, budget.animationStep)
+        # the sprite atlas already resolved missing frames to their fallback at startup,
+        # so this is one image draw (or the placeholder if the cat has no sprites at all)
+        spriteIndex = self.getSpriteIndex(tick - tick % animationStep)
+        if spriteIndex is not None:
+            drawImage(app.spriteAtlas.handles[spriteIndex], x, y, align='center', width=80, height=80)
+        else:
             color = rgb(*PLACEHOLDER_COLORS.get(self.name, (200, 200, 200)))
 
-            drawRect(self.x - 40, self.y - 40, 80, 80, fill=color, border='black', 
+            drawRect(x - 40, y - 40, 80, 80, fill=color, border='black', 
                      borderWidth=2)
-            drawLabel("SPRITE", self.x, self.y - 10, size=14, bold=True, font='monospace')
-            drawLabel(self.name, self.x, self.y + 8, size=12, font='monospace')
+            drawLabel("SPRITE", x, y - 10, size=14, bold=True, font='monospace')
+            drawLabel(self.name, x, y + 8, size=12, font='monospace')
             
             # show current animation state and frame for debugging
             currentState = self.getCurrentAnimationState()
             maxFrames = self.spriteFrames.get(currentState, 1)
             if maxFrames > 1:
-                frameInfo = f"{currentState}_f{self.currentFrame + 1}/{maxFrames}"
+                frameInfo = f"{currentState}_f{self.getAnimationFrame(tick) + 1}/{maxFrames}"
             else:
                 frameInfo = f"{currentState}"
-            drawLabel(frameInfo, self.x, self.y + 25, 
+            drawLabel(frameInfo, x, y + 25, 
                      size=9, font='monospace')
-        if self.isBeingDragged:
-            drawCircle(self.x, self.y + 5, 45, fill='black', opacity=20)
+        if self.isBeingDragged and budget.showOverlays:
+            drawCircle(x, y + 5, 45, fill='black', opacity=20)
+        if showBubble:
+            bubbleX = x + 25
+            bubbleY = y - 35
+            # missing bubbles were already swapped for the neutral one (or None) by the sprite atlas
+            bubble = app.spriteAtlas.emotionHandles.get(self.getEmotion(tick if budget.swapBubbles else 0))
+            if bubble is not None:
+                drawImage(bubble, bubbleX, bubbleY, align='center', width=50, height=50)
+        if showName:
+            drawLabel(self.name, x, y + 60, size=14, bold=True, fill='cadetBlue', font='monospace')
 
+    def getEmotion(self, tick):
         # emotion bubble logic
-        emotionPath = None
+        emotion = None
         if self.isBeingDragged:
-            emotionPath = "images/emotions/surprised.png"
+            emotion = "surprised"
         elif self.hunger < 25:
-            emotionPath = "images/emotions/confused.png"
+            emotion = "confused"
         elif self.cleanliness < 25:
-            emotionPath = "images/emotions/sad.png"
+            emotion = "sad"
         elif self.energy < 20:
-            emotionPath = "images/emotions/neutral.png"
+            emotion = "neutral"
         elif self.activity == "eating":
-            emotionPath = "images/emotions/content.png"
+            emotion = "content"
         elif self.activity == "playing":
-            emotionPath = "images/emotions/wow.png"
+            emotion = "wow"
         elif self.activity == "cleaning":
-            emotionPath = "images/emotions/neutral.png"
+            emotion = "neutral"
         elif self.isSleeping:
-            emotionPath = "images/emotions/content.png"
+            emotion = "content"
         elif self.mood == "happy":
-            if (self.animationFrame // 60) % 2 == 0:
-                emotionPath = "images/emotions/happy.png"
+            if (tick // BUBBLE_SWAP_STEPS) % 2 == 0:
+                emotion = "happy"
             else:
-                emotionPath = "images/emotions/happy2.png"
+                emotion = "happy2"
         elif self.mood == "sad":
-            emotionPath = "images/emotions/sad.png"
+            emotion = "sad"
         elif self.personality['socialNeed'] > 1.2 and self.happiness < 60:
-            emotionPath = "images/emotions/meow.png"
+            emotion = "meow"
         else:
-            emotionPath = "images/emotions/neutral.png"
+            emotion = "neutral"
+        return emotion
 
-        bubbleX = self.x + 25
-        bubbleY = self.y - 35
-
-        if emotionPath:
-            try:
-                drawImage(emotionPath, bubbleX, bubbleY, align='center', width=50, height=50)
-            except:
-                try:
-                    drawImage("images/emotions/neutral.png", bubbleX, bubbleY, align='center', width=50, height=50)
-                except:
-                    pass
+    def drawImpostor(self, app, alpha=1.0):
+        # a far away cat in a crowded room: one still sprite for what it's doing, nothing else
+        from cmu_graphics import drawImage, drawRect, rgb
+        x, y = self.getDrawPosition(alpha)
+        spriteIndex = self.impostorSprites.get(self.getCurrentAnimationState())
+        if spriteIndex is not None:
+            drawImage(app.spriteAtlas.handles[spriteIndex], x, y, align='center', width=80, height=80)
+        else:
+            drawRect(x - 40, y - 40, 80, 80, fill=rgb(*PLACEHOLDER_COLORS.get(self.name, (200, 200, 200))))
 
-        drawLabel(self.name, self.x, self.y + 60, size=14, bold=True, fill='cadetBlue', font='monospace')
\ No newline at end of file
+def createCats():
+    # the four starting cats and their personalities
+    cats = [
+        Cat("churrio", 600, 600, PERSONALITY_TYPES['energetic']),
+        Cat("beepaw", 300, 650, PERSONALITY_TYPES['independent']),
+        Cat("meeple", 700, 700, PERSONALITY_TYPES['clean']),
+        Cat("elwin", 1000, 700, PERSONALITY_TYPES['social']),
+    ]
+    return cats
@@ -0,0 +1,177 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import argparse
+import random
+import sys
+
+# struct-of-arrays version of Cat.updateStats for cafes with a LOT of cats
+# numpy is optional (same idea as the kaomoji import in constants.py)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# mood codes stored in the table (index into this tuple)
+MOOD_NAMES = ("happy", "neutral", "sad")
+MOOD_HAPPY = 0
+MOOD_NEUTRAL = 1
+MOOD_SAD = 2
+
+# what the last update did to a cat's activity (only the latest change matters)
+ACTIVITY_UNCHANGED = 0
+ACTIVITY_SLEEPING = 1
+ACTIVITY_IDLE = 2
+
+class CatStatsTable:
+    # while a table is in use it holds the real stats: call writeBack() before reading the
+    # cats and loadFromCats() after changing them directly (feeding, dragging, etc.)
+    # a single cat can be handed over with writeBackCat()/loadCat() (see Cat.runWithStats)
+    def __init__(self, cats):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("CatStatsTable needs numpy (pip install numpy)")
+        self.cats = list(cats)
+        self.rows = {cat: i for i, cat in enumerate(self.cats)}
+        self.loadFromCats()
+
+    def loadFromCats(self):
+        cats = self.cats
+        self.hunger = np.array([cat.hunger for cat in cats], dtype=np.float64)
+        self.happiness = np.array([cat.happiness for cat in cats], dtype=np.float64)
+        self.energy = np.array([cat.energy for cat in cats], dtype=np.float64)
+        self.cleanliness = np.array([cat.cleanliness for cat in cats], dtype=np.float64)
+        self.isSleeping = np.array([cat.isSleeping for cat in cats], dtype=bool)
+        self.isRunning = np.array([cat.isRunning for cat in cats], dtype=bool)
+        self.mood = np.array([MOOD_NAMES.index(cat.mood) for cat in cats], dtype=np.int8)
+        # personality rate columns
+        self.hungerRate = np.array([cat.personality['hungerRate'] for cat in cats], dtype=np.float64)
+        self.energyRate = np.array([cat.personality['energyRate'] for cat in cats], dtype=np.float64)
+        self.messyRate = np.array([cat.personality['messyRate'] for cat in cats], dtype=np.float64)
+        self.socialNeed = np.array([cat.personality['socialNeed'] for cat in cats], dtype=np.float64)
+        self.activityChange = np.zeros(len(cats), dtype=np.int8)
+
+    def update(self, timeMultiplier=1):
+        # exactly the rules (and float operation order) of Cat.updateStats, for every cat at once
+        hunger, energy, cleanliness = self.hunger, self.energy, self.cleanliness
+        # sleep/wake checks use the stats from before this update
+        fallAsleep = (energy < 30) & ~self.isSleeping & ~self.isRunning
+        wakeUp = self.isSleeping & ((energy >= 80) | (hunger <= 15))
+        sleeping = (self.isSleeping | fallAsleep) & ~wakeUp
+        self.isSleeping = sleeping
+        self.activityChange[fallAsleep] = ACTIVITY_SLEEPING
+        self.activityChange[wakeUp] = ACTIVITY_IDLE
+        # while sleeping: restore energy, slow hunger drain, very slow mess
+        # while awake: normal stat drain
+        self.energy = np.where(sleeping,
+                               np.minimum(100, energy + (0.9 * timeMultiplier)),
+                               np.maximum(0, energy - (0.05 * self.energyRate * timeMultiplier)))
+        self.hunger = np.where(sleeping,
+                               np.maximum(0, hunger - (0.05 * self.hungerRate * timeMultiplier)),
+                               np.maximum(0, hunger - (0.1 * self.hungerRate * timeMultiplier)))
+        self.cleanliness = np.where(sleeping,
+                                    np.maximum(0, cleanliness - (0.01 * self.messyRate * timeMultiplier)),
+                                    np.maximum(0, cleanliness - (0.03 * self.messyRate * timeMultiplier)))
+        hunger, energy, cleanliness = self.hunger, self.energy, self.cleanliness
+        # happiness changes based on overall care
+        neglected = (hunger < 20) | (energy < 20) | (cleanliness < 20)
+        cared = (hunger > 80) & (energy > 80) & (cleanliness > 80)
+        happiness = self.happiness
+        self.happiness = np.where(neglected,
+                                  np.maximum(0, happiness - (0.15 * self.socialNeed * timeMultiplier)),
+                                  np.where(cared, np.minimum(100, happiness + (0.05 * timeMultiplier)), happiness))
+        # update mood based on average stats
+        avgStat = (hunger + self.happiness + energy + cleanliness) / 4
+        self.mood = np.where(avgStat > 70, MOOD_HAPPY,
+                             np.where(avgStat > 40, MOOD_NEUTRAL, MOOD_SAD)).astype(np.int8)
+
+    def resetActivities(self):
+        # same as setting every cat's activity to "idle" after a stat update
+        self.activityChange[:] = ACTIVITY_IDLE
+
+    def writeBack(self):
+        # copy the table back onto the Cat objects (tolist gives plain python floats/bools)
+        hunger = self.hunger.tolist()
+        happiness = self.happiness.tolist()
+        energy = self.energy.tolist()
+        cleanliness = self.cleanliness.tolist()
+        isSleeping = self.isSleeping.tolist()
+        mood = self.mood.tolist()
+        activityChange = self.activityChange.tolist()
+        for i, cat in enumerate(self.cats):
+            cat.hunger = hunger[i]
+            cat.happiness = happiness[i]
+            cat.energy = energy[i]
+            cat.cleanliness = cleanliness[i]
+            cat.isSleeping = isSleeping[i]
+            cat.mood = MOOD_NAMES[mood[i]]
+            if activityChange[i] == ACTIVITY_SLEEPING:
+                cat.activity = "sleeping"
+            elif activityChange[i] == ACTIVITY_IDLE:
+                cat.activity = "idle"
+        self.activityChange[:] = ACTIVITY_UNCHANGED
+
+    def writeBackCat(self, cat):
+        # writeBack for one cat (item() gives plain python floats/bools like tolist)
+        i = self.rows[cat]
+        cat.hunger = self.hunger[i].item()
+        cat.happiness = self.happiness[i].item()
+        cat.energy = self.energy[i].item()
+        cat.cleanliness = self.cleanliness[i].item()
+        cat.isSleeping = self.isSleeping[i].item()
+        cat.mood = MOOD_NAMES[self.mood[i]]
+        if self.activityChange[i] == ACTIVITY_SLEEPING:
+            cat.activity = "sleeping"
+        elif self.activityChange[i] == ACTIVITY_IDLE:
+            cat.activity = "idle"
+        self.activityChange[i] = ACTIVITY_UNCHANGED
+
+    def loadCat(self, cat):
+        # loadFromCats for one cat (its personality columns don't change)
+        i = self.rows[cat]
+        self.hunger[i] = cat.hunger
+        self.happiness[i] = cat.happiness
+        self.energy[i] = cat.energy
+        self.cleanliness[i] = cat.cleanliness
+        self.isSleeping[i] = cat.isSleeping
+        self.isRunning[i] = cat.isRunning
+        self.mood[i] = MOOD_NAMES.index(cat.mood)
+        self.activityChange[i] = ACTIVITY_UNCHANGED
+
+def snapshotCats(cats):
+    return [(cat.hunger, cat.happiness, cat.energy, cat.cleanliness, cat.isSleeping, cat.isRunning,
+             cat.mood, cat.activity, cat.x, cat.y) for cat in cats]
+
+def runCafe(catCount, ticks, vectorized, seed):
+    # the same cafe (same seed, so the same runs and activities) with or without the table
+    from cat import Cat, createCats
+    from floor import getFloorMask
+    from simulation import CafeSimulation
+    random.seed(seed)
+    templates = createCats()
+    cats = []
+    for i in range(catCount):
+        template = templates[i % len(templates)]
+        cats.append(Cat(template.name, *getFloorMask().samplePoint(), template.personality))
+    sim = CafeSimulation(cats, trackAbsence=False, vectorized=vectorized)
+    sim.step(ticks)
+    sim.syncCats()
+    return snapshotCats(cats)
+
+def main(argv=None):
+    # python cat_stats.py checks the table against Cat.updateStats (exits with 1 if any cat differs)
+    parser = argparse.ArgumentParser(description="check the vectorized stats against the per-cat ones")
+    parser.add_argument("--cats", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    scalar = runCafe(args.cats, args.ticks, False, args.seed)
+    vectorized = runCafe(args.cats, args.ticks, True, args.seed)
+    different = sum(a != b for a, b in zip(scalar, vectorized))
+    print(f"{args.cats} cats, {args.ticks} ticks: {different} differ between the per-cat and vectorized stats")
+    return 1 if different else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
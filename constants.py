@@ -59,6 +59,85 @@ PERSONALITY_TYPES = {
     }
 }
 
+# simulation timing (in steps, the game runs at 30 steps per second)
+STEPS_PER_SECOND = 30
+STEP_SECONDS = 1 / STEPS_PER_SECOND
+
+# steps each frame of a cat animation stays up for
+ANIMATION_SPEEDS = {
+    "dangling": 15,
+    "running": 5,
+    "sleeping": 20,
+    "idle_happy": 8,
+    "sad": 15,
+    "idle_neutral": 12
+}
+DEFAULT_ANIMATION_SPEED = 12
+BUBBLE_SWAP_STEPS = 60  # happy cats alternate between their two bubbles this often
+MAX_SUBSTEPS = 5  # most steps one frame will run to catch up (any more backlog is dropped)
+STAT_UPDATE_INTERVAL = 30      # cat stats tick once a second
+ABSENCE_CHECK_INTERVAL = 90    # check for user absence every 3 seconds
+ACTIVITY_RESET_INTERVAL = 120  # activities go back to idle every 4 seconds
+
+# order of events that land on the same tick (see scheduler.py), lowest first
+STAT_EVENT_PRIORITY = 0
+RESET_EVENT_PRIORITY = 1
+ABSENCE_EVENT_PRIORITY = 2
+CAT_EVENT_PRIORITY = 3  # cats starting/stopping runs and autonomous activities
+ROOM_EVENT_PRIORITY = 4
+
+# rooms in the cafe as (name, background image), the game starts in the first one (see room.py)
+ROOMS = [
+    ("cafe", "images/basic_room2.png"),
+    ("lounge", "images/basic_room.png"),
+]
+# rooms that aren't on screen only get their stat ticks applied about every this many ticks (in one batch,
+# the rooms take turns so only one of them catches up on any tick)
+ROOM_CATCH_UP_INTERVAL = 900
+
+# how often (in seconds) queued saves are written to disk by the background writer
+ACTIVITY_FLUSH_INTERVAL = 5
+# when the player was last active, for working out how long they were away (see absence_tracker.py)
+ACTIVITY_FILE = "last_active.txt"
+
+# binary save of the whole cafe (see snapshot.py)
+SNAPSHOT_FILE = "cafe_state.bin"
+# changes since the snapshot are journaled to cafe_journal.<generation>.log (see journal.py) and
+# folded into a new snapshot once the journal is bigger than JOURNAL_COMPACT_SIZE bytes
+JOURNAL_FILE = "cafe_journal"
+JOURNAL_COMPACT_SIZE = 4 * 1024 * 1024
+
+# frame profiler (see profiler.py), turned on by setting this environment variable
+PROFILE_ENV = "CAFE_PROFILE"
+PROFILE_BUCKET_MS = 0.05     # histogram resolution
+PROFILE_BUCKET_COUNT = 2000  # so times up to 100ms get their own bucket
+PROFILE_MAX_DRAW_CALLS = 20000
+
+# adaptive frame budget (see frame_budget.py), 30 fps leaves 33ms a frame and cmu_graphics
+# still has to render what redrawAll drew after our callbacks are done
+FRAME_BUDGET_MS = 20          # onStep + redrawAll slower than this on average lowers the quality a level
+FRAME_BUDGET_HEADROOM = 0.6   # and under this fraction of the budget raises it back a level
+FRAME_BUDGET_SMOOTHING = 0.1  # weight of the newest frame in the average
+FRAME_BUDGET_COOLDOWN = 30    # frames to wait after a change before the next one
+FRAME_BUDGET_ANIMATION_STEP = 2   # animations change frame half as often
+FRAME_BUDGET_ABSENCE_FACTOR = 4   # absence checks this many times less often
+
+# level of detail for crowded rooms (see lod.py)
+LOD_CAT_THRESHOLDS = [40, 80, 150, 300]  # cats in the room where each cheaper level kicks in
+LOD_HOVER_RADIUS = 60         # names still show for cats this close to the mouse
+LOD_NEAR_RADIUS = 250         # cats this close to the mouse keep full animation and their sprite
+LOD_SLOW_ANIMATION_STEPS = 24 # far cats only change animation frame this often
+
+# cat sizes (in pixels) for clicking and collisions
+CAT_RADIUS = 40
+CAT_PICK_RADIUS = 50
+
+# isometric room floor (the diamond cats are allowed to stand on), see floor.py
+# this took lots of trial and error since i'm not great at math
+FLOOR_POLYGON = [(600, 410), (890, 700), (600, 990), (310, 700)]
+FLOOR_CELL_SIZE = 4  # floor mask resolution in pixels
+OCCUPANCY_CELL_SIZE = 8  # resolution of the grid used to find free spots for cats
+
 # placeholder colors for cats when sprites fail to load
 PLACEHOLDER_COLORS = {
     'churrio': (255, 165, 0),    # orange
@@ -0,0 +1,64 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+# recorded draw calls for the ui panels (cat popup, banners, controls box, music indicator)
+# cmu_graphics redraws everything every frame so the calls still have to be made each frame, but
+# working out what to draw (layout math, f-strings, picking kaomoji and colors) only happens when
+# something the panel shows changes. each panel has a cheap key (rounded stats, mood, whether a
+# drag is going on, ...) and its list is only re-recorded when the key is different from last frame
+# a DisplayList has the same draw functions as cmu_graphics so panel code can draw into either one
+
+class DisplayList:
+    def __init__(self):
+        self.commands = []  # (function, args, kwargs) in drawing order
+
+    def add(self, function, *args, **kwargs):
+        self.commands.append((function, args, kwargs))
+
+    def draw(self):
+        for function, args, kwargs in self.commands:
+            function(*args, **kwargs)
+
+    # the functions are looked up when recording, so the profiler's counted versions get used
+    def drawRect(self, *args, **kwargs):
+        import cmu_graphics
+        self.add(cmu_graphics.drawRect, *args, **kwargs)
+
+    def drawLabel(self, *args, **kwargs):
+        import cmu_graphics
+        self.add(cmu_graphics.drawLabel, *args, **kwargs)
+
+    def drawCircle(self, *args, **kwargs):
+        import cmu_graphics
+        self.add(cmu_graphics.drawCircle, *args, **kwargs)
+
+    def drawImage(self, *args, **kwargs):
+        import cmu_graphics
+        self.add(cmu_graphics.drawImage, *args, **kwargs)
+
+    def drawUnicodeLabel(self, *args, **kwargs):
+        import utils
+        self.add(utils.drawUnicodeLabel, *args, **kwargs)
+
+class DisplayListCache:
+    def __init__(self):
+        self.lists = {}  # panel name -> (key, DisplayList)
+        self.rebuildCount = 0
+
+    def draw(self, name, key, build, *args):
+        # replay the panel's list, re-recording it first with build(displayList, *args) if the key changed
+        entry = self.lists.get(name)
+        if entry is None or entry[0] != key:
+            displayList = DisplayList()
+            build(displayList, *args)
+            entry = self.lists[name] = (key, displayList)
+            self.rebuildCount += 1
+        entry[1].draw()
+
+    def invalidate(self, name=None):
+        if name is None:
+            self.lists.clear()
+        else:
+            self.lists.pop(name, None)
@@ -0,0 +1,170 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from constants import STEPS_PER_SECOND, STAT_UPDATE_INTERVAL
+
+# jumps a cat's stats forward by any number of updateStats ticks without running them one by one
+# between two sleep/wake transitions every stat moves by the same amount each tick (until it
+# hits 0 or 100), so a whole stretch of ticks can be applied at once. a new segment only starts
+# when the cat falls asleep/wakes up or when one of the happiness thresholds (20/80) is crossed
+# the result matches a tick-by-tick replay up to float rounding
+
+def clampStat(value):
+    return min(100, max(0, value))
+
+def isLowStat(value):
+    return value < 20
+
+def isHighStat(value):
+    return value > 80
+
+def statAfter(start, delta, ticks):
+    # value of a stat after some ticks of a constant change (clamped like updateStats does)
+    return clampStat(start + ticks * delta)
+
+def firstChangeTick(start, delta, test, limit):
+    # first tick in 2..limit where test(stat) gives a different answer than after tick 1
+    # (stats only ever move one way inside a segment so the answer flips at most once)
+    firstAnswer = test(statAfter(start, delta, 1))
+    if limit < 2 or test(statAfter(start, delta, limit)) == firstAnswer:
+        return None
+    lo, hi = 2, limit
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if test(statAfter(start, delta, mid)) == firstAnswer:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def firstTrueTick(test, limit):
+    # first tick in 1..limit where test(tick) is true (test has to stay true once it is)
+    if limit < 1 or not test(limit):
+        return None
+    lo, hi = 1, limit
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if test(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def starvingNapCycles(energy, awakeDrain, sleepGain, limit):
+    # how many (1 nap tick + awake ticks until energy < 30 again) cycles fit in `limit` ticks
+    # energy starts in [30 - awakeDrain, 30) and ends back in that range after every cycle
+    def awakeTicksFor(cycles):
+        return int((energy + cycles * sleepGain - 30) // awakeDrain) + 1
+    cycles = int(limit // (1 + sleepGain / awakeDrain))
+    while cycles > 0 and cycles + awakeTicksFor(cycles) > limit:
+        cycles -= 1
+    while cycles + 1 + awakeTicksFor(cycles + 1) <= limit:
+        cycles += 1
+    if cycles == 0:
+        return 0, 0
+    return cycles, awakeTicksFor(cycles)
+
+def fastForwardCat(cat, ticks, timeMultiplier=1):
+    # same result as calling cat.updateStats(timeMultiplier) `ticks` times
+    ticks = int(ticks)
+    if ticks <= 0:
+        return
+    personality = cat.personality
+    hunger, happiness = cat.hunger, cat.happiness
+    energy, cleanliness = cat.energy, cat.cleanliness
+    isSleeping = cat.isSleeping
+    activity = None
+    remaining = ticks
+    while remaining > 0:
+        # a starving cat just naps for a tick whenever energy drops under 30 and wakes straight back up
+        # (hunger <= 15), so whole nap cycles can be skipped at once instead of segment by segment
+        awakeDrain = 0.05 * personality['energyRate'] * timeMultiplier
+        if (not isSleeping and not cat.isRunning and hunger <= 15 and
+            30 - awakeDrain <= energy < 30):
+            cycles, awakeTicks = starvingNapCycles(energy, awakeDrain, 0.9 * timeMultiplier, remaining)
+            if cycles > 0:
+                cycleTicks = cycles + awakeTicks
+                energy = energy + cycles * (0.9 * timeMultiplier) - awakeTicks * awakeDrain
+                hunger = clampStat(hunger - cycles * (0.05 * personality['hungerRate'] * timeMultiplier)
+                                   - awakeTicks * (0.1 * personality['hungerRate'] * timeMultiplier))
+                cleanliness = clampStat(cleanliness - cycles * (0.01 * personality['messyRate'] * timeMultiplier)
+                                        - awakeTicks * (0.03 * personality['messyRate'] * timeMultiplier))
+                happiness = clampStat(happiness - cycleTicks * (0.15 * personality['socialNeed'] * timeMultiplier))
+                activity = "idle"
+                remaining -= cycleTicks
+                continue
+        # sleep/wake check at the start of the tick (same order as updateStats)
+        if energy < 30 and not isSleeping and not cat.isRunning:
+            isSleeping = True
+            activity = "sleeping"
+        elif isSleeping and (energy >= 80 or hunger <= 15):
+            isSleeping = False
+            activity = "idle"
+        if isSleeping:
+            hungerDelta = -(0.05 * personality['hungerRate'] * timeMultiplier)
+            energyDelta = 0.9 * timeMultiplier
+            cleanDelta = -(0.01 * personality['messyRate'] * timeMultiplier)
+        else:
+            hungerDelta = -(0.1 * personality['hungerRate'] * timeMultiplier)
+            energyDelta = -(0.05 * personality['energyRate'] * timeMultiplier)
+            cleanDelta = -(0.03 * personality['messyRate'] * timeMultiplier)
+
+        # the segment can't go past the tick where the next sleep/wake check would fire
+        segment = remaining
+        if isSleeping:
+            wakeTick = firstTrueTick(lambda j: statAfter(energy, energyDelta, j) >= 80 or
+                                               statAfter(hunger, hungerDelta, j) <= 15, remaining)
+        elif not cat.isRunning:
+            wakeTick = firstTrueTick(lambda j: statAfter(energy, energyDelta, j) < 30, remaining)
+        else:
+            wakeTick = None
+        if wakeTick is not None:
+            segment = min(segment, wakeTick)
+        # ...or past a tick where the happiness rule would change (stats only move one way in a
+        # segment, so a threshold is only searched for when the first and last tick disagree on it)
+        for start, delta in ((hunger, hungerDelta), (energy, energyDelta), (cleanliness, cleanDelta)):
+            firstValue = statAfter(start, delta, 1)
+            lastValue = statAfter(start, delta, segment)
+            for test in (isLowStat, isHighStat):
+                if segment >= 2 and test(firstValue) != test(lastValue):
+                    segment = firstChangeTick(start, delta, test, segment) - 1
+                    lastValue = statAfter(start, delta, segment)
+
+        # the happiness rule is the same for every tick of the segment, so check it after tick 1
+        hungerNext = statAfter(hunger, hungerDelta, 1)
+        energyNext = statAfter(energy, energyDelta, 1)
+        cleanNext = statAfter(cleanliness, cleanDelta, 1)
+        if hungerNext < 20 or energyNext < 20 or cleanNext < 20:
+            happiness = clampStat(happiness - segment * (0.15 * personality['socialNeed'] * timeMultiplier))
+        elif hungerNext > 80 and energyNext > 80 and cleanNext > 80:
+            happiness = clampStat(happiness + segment * (0.05 * timeMultiplier))
+        hunger = statAfter(hunger, hungerDelta, segment)
+        energy = statAfter(energy, energyDelta, segment)
+        cleanliness = statAfter(cleanliness, cleanDelta, segment)
+        remaining -= segment
+
+    cat.hunger, cat.happiness = hunger, happiness
+    cat.energy, cat.cleanliness = energy, cleanliness
+    cat.isSleeping = isSleeping
+    if activity:
+        cat.activity = activity
+    # mood only depends on the final stats
+    avgStat = (hunger + happiness + energy + cleanliness) / 4
+    if avgStat > 70:
+        cat.mood = "happy"
+    elif avgStat > 40:
+        cat.mood = "neutral"
+    else:
+        cat.mood = "sad"
+
+def secondsToStatTicks(seconds):
+    # how many updateStats calls the running game would have made in that time
+    return int(seconds * STEPS_PER_SECOND) // STAT_UPDATE_INTERVAL
+
+def fastForwardCats(cats, seconds):
+    ticks = secondsToStatTicks(seconds)
+    for cat in cats:
+        fastForwardCat(cat, ticks)
+    return ticks
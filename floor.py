@@ -0,0 +1,99 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import math
+import random
+from bisect import bisect_left
+from constants import FLOOR_POLYGON, FLOOR_CELL_SIZE
+
+# the walkable floor as a grid of small cells (rasterized once)
+# any polygon works for the floor, and furniture (or anything else) can be cut out of it
+# checking a point is one array lookup, and random spots are picked straight from the
+# list of walkable cells so there's no "try random spots until one works" loop
+
+def pointInPolygon(x, y, polygon):
+    # even-odd rule (ray casting to the right)
+    inside = False
+    for i in range(len(polygon)):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[i - 1]
+        if (y1 > y) != (y2 > y):
+            crossX = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            if x <= crossX:
+                inside = not inside
+    return inside
+
+def rectPolygon(x, y, width, height):
+    return [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+
+def furnitureCutout(furniture):
+    # the clickable area of a FurniturePiece as a polygon to cut out of the floor
+    return rectPolygon(furniture.x, furniture.y, furniture.width, furniture.height)
+
+class FloorMask:
+    def __init__(self, polygon=FLOOR_POLYGON, cutouts=(), cellSize=FLOOR_CELL_SIZE):
+        self.cellSize = cellSize
+        self.left = min(x for x, y in polygon)
+        self.top = min(y for x, y in polygon)
+        self.columns = int(math.ceil((max(x for x, y in polygon) - self.left) / cellSize)) + 1
+        self.rows = int(math.ceil((max(y for x, y in polygon) - self.top) / cellSize)) + 1
+        # a cell is walkable if its center is on the floor and not in a cutout
+        self.mask = bytearray(self.columns * self.rows)
+        for row in range(self.rows):
+            centerY = self.top + (row + 0.5) * cellSize
+            for column in range(self.columns):
+                centerX = self.left + (column + 0.5) * cellSize
+                if (pointInPolygon(centerX, centerY, polygon) and
+                    not any(pointInPolygon(centerX, centerY, cutout) for cutout in cutouts)):
+                    self.mask[row * self.columns + column] = 1
+        # walkable cells sorted left to right so "right of x" is just a suffix of this list
+        self.walkableCells = [(column, row) for column in range(self.columns)
+                              for row in range(self.rows) if self.mask[row * self.columns + column]]
+        self.walkableColumns = [column for column, row in self.walkableCells]
+
+    def getCell(self, x, y):
+        # (column, row) of the cell under a point, or None if it's off the grid
+        column = int((x - self.left) // self.cellSize)
+        row = int((y - self.top) // self.cellSize)
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return column, row
+        return None
+
+    def isCellWalkable(self, column, row):
+        return (0 <= column < self.columns and 0 <= row < self.rows and
+                self.mask[row * self.columns + column] == 1)
+
+    def isWalkable(self, x, y):
+        cell = self.getCell(x, y)
+        return cell is not None and self.mask[cell[1] * self.columns + cell[0]] == 1
+
+    def getCellCenter(self, column, row):
+        return (self.left + (column + 0.5) * self.cellSize, self.top + (row + 0.5) * self.cellSize)
+
+    def samplePoint(self, minX=None, rng=random):
+        # uniformly random walkable point (optionally only ones right of minX), None if there are none
+        start = 0
+        if minX is not None:
+            firstColumn = int(math.ceil((minX - self.left) / self.cellSize))
+            start = bisect_left(self.walkableColumns, firstColumn)
+        if start >= len(self.walkableCells):
+            return None
+        column, row = self.walkableCells[rng.randrange(start, len(self.walkableCells))]
+        # every cell is the same size so a random spot inside a random cell is uniform overall
+        return (self.left + (column + rng.random()) * self.cellSize,
+                self.top + (row + rng.random()) * self.cellSize)
+
+# the room's floor, built the first time anything needs it
+floorMask = None
+
+def getFloorMask():
+    global floorMask
+    if floorMask is None:
+        floorMask = FloorMask()
+    return floorMask
+
+def isValidPosition(x, y):
+    # allowed placement area for the isometric room floor
+    return getFloorMask().isWalkable(x, y)
@@ -0,0 +1,57 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from lod import LOD_IMPOSTORS
+from constants import *
+
+# keeps the game at 30 fps on slow computers without tuning anything by hand
+# onStep + redrawAll are timed every frame, and while the average is over FRAME_BUDGET_MS the
+# quality goes down one level at a time (with a cooldown in between so it settles). once frames
+# are comfortably under budget again it comes back up the same way
+# each level turns off one more optional thing, cheapest to lose first:
+BUDGET_OVERLAYS = 1   # no shadows, translucent panels and the selection ring are drawn solid
+BUDGET_BUBBLES = 2    # happy cats stop switching between their two bubbles
+BUDGET_ANIMATION = 3  # every cat animates at a lower rate
+BUDGET_ABSENCE = 4    # absence checks happen less often
+# every level after that is one more level of detail for the cats (see lod.py)
+BUDGET_MAX_LEVEL = BUDGET_ABSENCE + LOD_IMPOSTORS
+
+class FrameBudget:
+    def __init__(self):
+        self.averageMs = 0.0
+        self.stepMs = 0.0  # onStep time since the last redrawAll
+        self.cooldown = 0
+        self.setLevel(0)
+
+    def setLevel(self, level):
+        self.level = level
+        self.showOverlays = level < BUDGET_OVERLAYS
+        self.swapBubbles = level < BUDGET_BUBBLES
+        self.animationStep = FRAME_BUDGET_ANIMATION_STEP if level >= BUDGET_ANIMATION else 1
+        self.absenceCheckInterval = ABSENCE_CHECK_INTERVAL
+        if level >= BUDGET_ABSENCE:
+            self.absenceCheckInterval *= FRAME_BUDGET_ABSENCE_FACTOR
+        self.lodLevels = max(0, level - BUDGET_ABSENCE)
+
+    def getOpacity(self, opacity):
+        # translucent panels are drawn solid when overlays are off
+        return opacity if self.showOverlays else 100
+
+    def recordStep(self, milliseconds):
+        self.stepMs += milliseconds
+
+    def recordFrame(self, drawMilliseconds):
+        # redrawAll's time, the end of a frame
+        frameMs = self.stepMs + drawMilliseconds
+        self.stepMs = 0.0
+        self.averageMs += FRAME_BUDGET_SMOOTHING * (frameMs - self.averageMs)
+        if self.cooldown > 0:
+            self.cooldown -= 1
+        elif self.averageMs > FRAME_BUDGET_MS and self.level < BUDGET_MAX_LEVEL:
+            self.setLevel(self.level + 1)
+            self.cooldown = FRAME_BUDGET_COOLDOWN
+        elif self.averageMs < FRAME_BUDGET_MS * FRAME_BUDGET_HEADROOM and self.level > 0:
+            self.setLevel(self.level - 1)
+            self.cooldown = FRAME_BUDGET_COOLDOWN
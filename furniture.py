@@ -3,8 +3,6 @@
 ##   fundamentals of purr-ogramming cafe   ##
 #############################################
 
-from cmu_graphics import *
-
 class FurniturePiece:
     def __init__(self, name, x, y, width, height, variants):
         self.name = name
@@ -50,6 +48,7 @@ def createFurniturePieces():
     return furniture
 
 def drawFurnitureOverlays(app):
+    from cmu_graphics import drawImage
     for furniture in app.furniture:
         variantPath = furniture.getCurrentVariantPath()
         if variantPath:  # only draw if not using original
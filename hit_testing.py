@@ -0,0 +1,47 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from bisect import bisect_right
+
+# one lookup to find what a click landed on
+# the fixed rectangles (popup buttons, the popup itself, furniture) are split into vertical slabs
+# at every rectangle's left and right edge, and each slab lists the rectangles over it in priority
+# order, so a click finds its slab with a binary search and only checks the few rectangles in it
+# anything not covered by a rectangle goes to pickCat (the spatial grid, see spatial.py)
+# the slabs are only rebuilt when the rectangles change (the popup opening/closing, ...)
+
+class HitTester:
+    def __init__(self, pickCat=None):
+        self.pickCat = pickCat  # (x, y) -> cat or None
+        self.key = None
+        self.edges = []  # x where each slab starts, sorted
+        self.slabs = []  # rectangles over each slab as (left, top, right, bottom, kind, target)
+
+    def setRegions(self, key, regions):
+        # regions are (x, y, width, height, kind, target), earlier ones win where they overlap
+        if key == self.key:
+            return
+        self.key = key
+        rectangles = [(x, y, x + width, y + height, kind, target) for x, y, width, height, kind, target in regions]
+        self.edges = sorted({edge for rectangle in rectangles for edge in (rectangle[0], rectangle[2])})
+        self.slabs = [[] for edge in self.edges]
+        for rectangle in rectangles:
+            # edges are inclusive like FurniturePiece.isClicked, so the slab starting on the right edge counts too
+            first = bisect_right(self.edges, rectangle[0]) - 1
+            last = bisect_right(self.edges, rectangle[2]) - 1
+            for i in range(first, last + 1):
+                self.slabs[i].append(rectangle)
+
+    def hitTest(self, x, y):
+        # (kind, target) of the first thing under (x, y), ('cat', cat), or (None, None) for nothing
+        slab = bisect_right(self.edges, x) - 1
+        if slab >= 0:
+            for left, top, right, bottom, kind, target in self.slabs[slab]:
+                if left <= x <= right and top <= y <= bottom:
+                    return kind, target
+        cat = self.pickCat(x, y) if self.pickCat else None
+        if cat:
+            return 'cat', cat
+        return None, None
@@ -0,0 +1,285 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import glob
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from persistence import AppendWriter, writeFileAtomic
+from constants import SNAPSHOT_FILE, JOURNAL_FILE, JOURNAL_COMPACT_SIZE, ACTIVITY_FLUSH_INTERVAL, STEP_SECONDS
+
+# write-ahead journal on top of the snapshot (see snapshot.py)
+# instead of re-saving the whole cafe, every change is appended as a small record:
+#   - a cat that changed (fed, dragged, moved, ...) gets its changing fields written once per tick
+#   - a stat tick is one record for every cat (updateStats has no randomness so it replays exactly)
+#   - a furniture cycle is its new variant
+#   - switching rooms and catching up a background room (see room.py) are the room and the tick
+# cats and furniture are numbered across every room, in room order
+# records are grouped into one batch per tick (with a checksum so a half-written batch from a
+# crash is ignored, and the wall time so a restored cafe knows when it's from) and appended by a
+# background thread every flush interval
+# journals are numbered by generation: the snapshot says which generation to start replaying
+# from, and once a journal gets big a new one is started and the old ones are folded into a
+# new snapshot on a background thread
+
+JOURNAL_MAGIC = b"PCJL"
+JOURNAL_VERSION = 4
+JOURNAL_HEADER = struct.Struct("<4sHQ")  # magic, version, generation
+BATCH_HEADER = struct.Struct("<IIQd")    # payload length, crc32 of the payload, step counter, wall time
+BATCH_HEADER_V3 = struct.Struct("<IIQ")  # versions before 4 had no wall time
+
+OP_CAT = 1
+OP_STAT_TICK = 2
+OP_FURNITURE = 3
+OP_ACTIVITY_RESET = 4
+OP_ROOM_SWITCH = 5
+OP_ROOM_CATCH_UP = 6
+
+# cat index, x, y, lastValidX, lastValidY, hunger, happiness, energy, cleanliness,
+# runTargetX, runTargetY, runEndTick, runDuration, autonomousEndTick, flags
+# (followed by the activity and mood as short strings)
+CAT_OP = struct.Struct("<BI10dqiqB")
+CAT_OP_V1 = struct.Struct("<BI10d3iB")   # version 1 had tick countdowns (runTimer, autonomousTimer)
+STAT_TICK_OP = struct.Struct("<BB")      # resetActivity (only set by version 1 journals)
+ACTIVITY_RESET_OP = struct.Struct("<B")
+FURNITURE_OP = struct.Struct("<BHH")     # furniture index, variant
+ROOM_OP = struct.Struct("<BHQ")          # room index, step counter when it happened
+STRING_LENGTH = struct.Struct("<B")
+# drag and selection are left out on purpose, a restored cat is never held by the mouse
+CAT_FLAGS = ["isSleeping", "isRunning", "facingLeft", "beingPetted"]
+
+def journalPath(prefix, generation):
+    return f"{prefix}.{generation}.log"
+
+def listJournals(prefix):
+    # [(generation, path)] oldest first
+    journals = []
+    for path in glob.glob(f"{glob.escape(prefix)}.*.log"):
+        generation = path[len(prefix) + 1:-len(".log")]
+        if generation.isdigit():
+            journals.append((int(generation), path))
+    return sorted(journals)
+
+def packString(text):
+    data = text.encode()[:255]
+    return STRING_LENGTH.pack(len(data)) + data
+
+def unpackString(data, offset):
+    (length,) = STRING_LENGTH.unpack_from(data, offset)
+    offset += STRING_LENGTH.size
+    return bytes(data[offset:offset + length]).decode(), offset + length
+
+def packCatOp(index, cat):
+    flags = 0
+    for bit, field in enumerate(CAT_FLAGS):
+        if getattr(cat, field):
+            flags |= 1 << bit
+    return (CAT_OP.pack(OP_CAT, index, cat.x, cat.y, cat.lastValidX, cat.lastValidY,
+                        cat.hunger, cat.happiness, cat.energy, cat.cleanliness,
+                        cat.runTargetX, cat.runTargetY, cat.runEndTick, cat.runDuration,
+                        cat.autonomousEndTick, flags)
+            + packString(cat.activity) + packString(cat.mood))
+
+def applyBatch(sim, payload, stepCounter, version=JOURNAL_VERSION):
+    catOp = CAT_OP if version >= 2 else CAT_OP_V1
+    # journals before version 3 only had the one room, which is still first so the indexes match
+    cats = sim.getAllCats()
+    furniture = sim.getAllFurniture()
+    offset = 0
+    while offset < len(payload):
+        op = payload[offset]
+        if op == OP_CAT:
+            values = catOp.unpack_from(payload, offset)
+            offset += catOp.size
+            cat = cats[values[1]]
+            (cat.lastValidX, cat.lastValidY, cat.hunger, cat.happiness, cat.energy, cat.cleanliness,
+             cat.runTargetX, cat.runTargetY, cat.runEndTick, cat.runDuration, cat.autonomousEndTick) = values[4:15]
+            if version < 2:
+                # countdowns become end ticks (counted from the batch's tick)
+                runTimer, autonomousTimer = values[12], values[14]
+                cat.runEndTick = stepCounter + cat.runDuration - runTimer + 1
+                cat.autonomousEndTick = stepCounter + autonomousTimer if autonomousTimer > 0 else 0
+            for bit, field in enumerate(CAT_FLAGS):
+                setattr(cat, field, bool(values[15] & (1 << bit)))
+            cat.activity, offset = unpackString(payload, offset)
+            cat.mood, offset = unpackString(payload, offset)
+            cat.moveTo(values[2], values[3])
+        elif op == OP_STAT_TICK:
+            (op, resetActivity) = STAT_TICK_OP.unpack_from(payload, offset)
+            offset += STAT_TICK_OP.size
+            sim.runStatUpdate(bool(resetActivity))
+        elif op == OP_ACTIVITY_RESET:
+            offset += ACTIVITY_RESET_OP.size
+            sim.runActivityReset()
+        elif op == OP_FURNITURE:
+            (op, index, variant) = FURNITURE_OP.unpack_from(payload, offset)
+            offset += FURNITURE_OP.size
+            furniture[index].currentVariant = variant
+        elif op == OP_ROOM_SWITCH or op == OP_ROOM_CATCH_UP:
+            (op, index, tick) = ROOM_OP.unpack_from(payload, offset)
+            offset += ROOM_OP.size
+            # the batch's step counter is from the end of the step, these happened before it
+            sim.stepCounter = tick
+            if op == OP_ROOM_SWITCH:
+                sim.switchRoom(index)
+            else:
+                sim.rooms[index].catchUp(tick)
+        else:
+            raise ValueError(f"unknown journal record {op}")
+
+def replayJournal(sim, path):
+    # apply every complete batch in the file, stopping at the first torn or corrupt one
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < JOURNAL_HEADER.size:
+        return
+    magic, version, generation = JOURNAL_HEADER.unpack_from(data, 0)
+    if magic != JOURNAL_MAGIC or version > JOURNAL_VERSION:
+        raise ValueError(f"{path} is not a cafe journal this game can read")
+    offset = JOURNAL_HEADER.size
+    view = memoryview(data)
+    batchHeader = BATCH_HEADER if version >= 4 else BATCH_HEADER_V3
+    while offset + batchHeader.size <= len(data):
+        length, checksum, stepCounter, *savedAt = batchHeader.unpack_from(data, offset)
+        start = offset + batchHeader.size
+        payload = view[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            print(f"Ignoring incomplete journal entry at the end of {path}")
+            break
+        if savedAt:
+            sim.savedAt = savedAt[0]
+        elif sim.savedAt:
+            # older journals: the ticks since the last batch went by in (about) real time
+            sim.savedAt += (stepCounter - sim.stepCounter) * STEP_SECONDS
+        applyBatch(sim, payload, stepCounter, version)
+        sim.stepCounter = stepCounter
+        offset = start + length
+
+def recover(sim, snapshotPath=SNAPSHOT_FILE, journalPrefix=JOURNAL_FILE, stopGeneration=None):
+    # load the snapshot and replay the journals written after it (up to stopGeneration)
+    # returns the newest generation found (new journals should use a higher one)
+    generation = 0
+    if os.path.exists(snapshotPath):
+        generation = sim.loadSnapshot(snapshotPath).journalGeneration
+    newest = generation
+    for journalGeneration, path in listJournals(journalPrefix):
+        if stopGeneration is not None and journalGeneration >= stopGeneration:
+            break
+        if journalGeneration >= generation:
+            replayJournal(sim, path)
+            newest = journalGeneration
+    # replayed cats have new end ticks for their runs and activities
+    sim.resetSchedule()
+    return newest
+
+def compact(generation, snapshotPath, journalPrefix, snapshotData=None):
+    # write a snapshot that already contains every journal older than `generation`,
+    # then delete those journals (if anything fails here the old files still recover fine)
+    if snapshotData is None:
+        # rebuild the state on a separate headless simulation so the game never waits for this
+        from simulation import CafeSimulation
+        sim = CafeSimulation(trackAbsence=False)
+        recover(sim, snapshotPath, journalPrefix, stopGeneration=generation)
+        snapshotData = sim.packSnapshot(generation, sim.savedAt)
+    writeFileAtomic(snapshotPath, snapshotData)
+    for journalGeneration, path in listJournals(journalPrefix):
+        if journalGeneration < generation:
+            os.remove(path)
+
+class Journal:
+    def __init__(self, sim, generation, snapshotPath=SNAPSHOT_FILE, journalPrefix=JOURNAL_FILE,
+                 compactSize=JOURNAL_COMPACT_SIZE, flushInterval=ACTIVITY_FLUSH_INTERVAL):
+        self.sim = sim
+        self.snapshotPath = snapshotPath
+        self.journalPrefix = journalPrefix
+        self.compactSize = compactSize
+        self.flushInterval = flushInterval
+        self.catIndexes = {}
+        self.furnitureIndexes = {}
+        self.dirtyCats = {}  # insertion-ordered set of cats changed since the last batch
+        self.batch = []
+        self.compactions = queue.Queue()
+        self.compactor = threading.Thread(target=self.runCompactions, daemon=True)
+        self.compactor.start()
+        self.writer = None
+        self.generation = generation - 1
+        self.restart()
+
+    def restart(self):
+        # start over from a fresh snapshot of the current state (packed here, written in the background)
+        # used at startup and whenever the set of cats changes, since records refer to cats by index
+        self.catIndexes = {cat: i for i, cat in enumerate(self.sim.getAllCats())}
+        self.furnitureIndexes = {piece: i for i, piece in enumerate(self.sim.getAllFurniture())}
+        self.dirtyCats.clear()
+        self.batch = []
+        self.startGeneration(self.generation + 1, self.sim.packSnapshot(self.generation + 1))
+
+    def startGeneration(self, generation, snapshotData=None):
+        oldWriter = self.writer
+        self.generation = generation
+        self.size = 0
+        self.writer = AppendWriter(journalPath(self.journalPrefix, generation),
+                                   JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, generation),
+                                   self.flushInterval)
+        self.compactions.put((generation, oldWriter, snapshotData))
+
+    def runCompactions(self):
+        while True:
+            generation, oldWriter, snapshotData = self.compactions.get()
+            try:
+                if oldWriter:
+                    oldWriter.close()  # the old journal has to be on disk before it's folded in
+                compact(generation, self.snapshotPath, self.journalPrefix, snapshotData)
+            except (OSError, ValueError) as e:
+                print(f"Error compacting the cafe journal: {e}")
+            finally:
+                self.compactions.task_done()
+
+    # tracker hook (cats call this whenever they change, see Cat.notifyTrackers)
+    def updateCat(self, cat):
+        self.dirtyCats[cat] = None
+
+    def updateCats(self, cats):
+        # the running cats after a tick (see CafeSimulation.step)
+        self.dirtyCats.update(dict.fromkeys(cats))
+
+    def writeDirtyCats(self):
+        for cat in self.dirtyCats:
+            self.batch.append(packCatOp(self.catIndexes[cat], cat))
+        self.dirtyCats.clear()
+
+    def recordStatTick(self, resetActivity=False):
+        self.batch.append(STAT_TICK_OP.pack(OP_STAT_TICK, resetActivity))
+
+    def recordActivityReset(self):
+        self.batch.append(ACTIVITY_RESET_OP.pack(OP_ACTIVITY_RESET))
+
+    def recordFurniture(self, piece):
+        self.batch.append(FURNITURE_OP.pack(OP_FURNITURE, self.furnitureIndexes[piece], piece.currentVariant))
+
+    def recordRoomSwitch(self, index, stepCounter):
+        self.batch.append(ROOM_OP.pack(OP_ROOM_SWITCH, index, stepCounter))
+
+    def recordRoomCatchUp(self, index, stepCounter):
+        self.batch.append(ROOM_OP.pack(OP_ROOM_CATCH_UP, index, stepCounter))
+
+    def endTick(self, stepCounter):
+        # everything recorded since the last tick goes out as one batch
+        if not self.batch:
+            return
+        payload = b"".join(self.batch)
+        self.batch = []
+        self.writer.submit(BATCH_HEADER.pack(len(payload), zlib.crc32(payload), stepCounter, time.time()) + payload)
+        self.size += BATCH_HEADER.size + len(payload)
+        if self.size > self.compactSize:
+            self.startGeneration(self.generation + 1)
+
+    def close(self):
+        self.writer.close()
+        # wait for compactions still in flight (they write the snapshot and delete old journals)
+        self.compactions.join()
@@ -0,0 +1,49 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from bisect import bisect_right
+from constants import *
+
+# level of detail for the cats, so crowded rooms stay interactive
+# every level drops something more from the cats that aren't near the mouse:
+LOD_FULL = 0            # sprite, drag shadow, emotion bubble and name for every cat
+LOD_NO_BUBBLES = 1      # no emotion bubbles (the popup still shows how a cat feels)
+LOD_HOVER_NAMES = 2     # names only for the cat under the mouse and the selected one
+LOD_SLOW_ANIMATION = 3  # cats away from the mouse change animation frame less often
+LOD_IMPOSTORS = 4       # cats away from the mouse are one still sprite each
+# the level comes from the cat count (LOD_CAT_THRESHOLDS), plus more while frames are over budget
+# (the frame budget hands out the extra levels once its cheaper settings weren't enough, see frame_budget.py)
+
+class LodPolicy:
+    def __init__(self):
+        self.level = LOD_FULL
+
+    def getCountLevel(self, catCount):
+        return bisect_right(LOD_CAT_THRESHOLDS, catCount)
+
+    def update(self, catCount, extraLevels=0):
+        # level for this frame
+        self.level = min(LOD_IMPOSTORS, self.getCountLevel(catCount) + extraLevels)
+        return self.level
+
+    def drawCats(self, app, cats, alpha):
+        level = self.level
+        if level == LOD_FULL:
+            for cat in cats:
+                cat.draw(app, alpha)
+            return
+        # distances are compared squared (cats are only near or far, the exact distance doesn't matter)
+        hoverDistance = LOD_HOVER_RADIUS ** 2
+        nearDistance = LOD_NEAR_RADIUS ** 2
+        animationStep = LOD_SLOW_ANIMATION_STEPS if level >= LOD_SLOW_ANIMATION else 1
+        for cat in cats:
+            distance = (cat.x - app.mouseX) ** 2 + (cat.y - app.mouseY) ** 2
+            isNear = distance <= nearDistance
+            if level >= LOD_IMPOSTORS and not isNear:
+                cat.drawImpostor(app, alpha)
+                continue
+            showName = level < LOD_HOVER_NAMES or distance <= hoverDistance or cat is app.selectedCat
+            cat.draw(app, alpha, showBubble=False, showName=showName,
+                     animationStep=1 if isNear else animationStep)
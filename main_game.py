@@ -4,7 +4,16 @@
 #############################################
 
 from cmu_graphics import *
-from cat import Cat
+from simulation import CafeSimulation
+from sprites import SpriteAtlas
+from renderer import RoomLayer, drawPanelBox, getInstructionBox, getControlsBox
+from display_list import DisplayListCache
+from popup_layout import *
+from hit_testing import HitTester
+from lod import LodPolicy
+from frame_budget import FrameBudget
+from journal import Journal, recover
+from profiler import installProfiler, getProfiler
 from furniture import *
 from absence_tracker import *
 from utils import *
@@ -28,8 +37,40 @@ def onAppStart(app):
     app.mouseX = 0
     app.mouseY = 0
     
-    # absence tracker initialization
-    app.absenceTracker = AbsenceTracker(app)
+    # the simulation owns the cats, furniture and absence tracker (see simulation.py)
+    app.sim = CafeSimulation(arrangeCats=True, activityFile=ACTIVITY_FILE)
+    # pick up where the last session left off: the snapshot plus everything journaled after it
+    generation = 0
+    try:
+        generation = recover(app.sim, SNAPSHOT_FILE, JOURNAL_FILE)
+    except (OSError, ValueError) as e:
+        print(f"Error loading the saved cafe, starting a new one: {e}")
+    # then the time the game was closed, before anything can happen in this session
+    app.sim.applyOfflineTime()
+    # from here on every change is appended to the journal (written in the background)
+    app.sim.attachJournal(Journal(app.sim, generation + 1, SNAPSHOT_FILE, JOURNAL_FILE))
+    # app.cats and app.furniture are the room on screen (see room.py)
+    app.cats = app.sim.cats
+    app.furniture = app.sim.furniture
+    app.absenceTracker = app.sim.absenceTracker
+    # sprites are indexed once here instead of building file paths every frame
+    app.spriteAtlas = SpriteAtlas.load()
+    for cat in app.sim.getAllCats():
+        cat.attachSprites(app.spriteAtlas)
+    # background + furniture + static ui boxes, cached as one image (see renderer.py)
+    app.roomLayer = RoomLayer()
+    # recorded draw calls for the ui panels, replayed until what they show changes (see display_list.py)
+    app.displayLists = DisplayListCache()
+    # how much detail cats get drawn with, from the cat count and how long frames take (see lod.py)
+    app.lod = LodPolicy()
+    # turns optional work down while frames take too long and back up once they don't (see frame_budget.py)
+    app.frameBudget = FrameBudget()
+    # frame profiler, only there if the game was started with CAFE_PROFILE=1 (see profiler.py)
+    app.profiler = getProfiler()
+    # the simulation runs at a fixed STEPS_PER_SECOND whatever the frame rate (see onStep)
+    app.lastStepTime = time.perf_counter()
+    app.stepAccumulator = 0
+    app.renderAlpha = 1.0
     app.welcomeMessage = None
     app.welcomeMessageTimer = 0
 
@@ -58,76 +99,66 @@ def onAppStart(app):
         app.backgroundMusic.play(loop=True)
         app.musicPlaying = True
 
-    app.cats = [
-        Cat("churrio", 600, 600, PERSONALITY_TYPES['energetic']),
-        Cat("beepaw", 300, 650, PERSONALITY_TYPES['independent']),
-        Cat("meeple", 700, 700, PERSONALITY_TYPES['clean']),
-        Cat("elwin", 1000, 700, PERSONALITY_TYPES['social']),
-    ]
-    
-    # furniture inititalize 
-    app.furniture = createFurniturePieces()
-
     # popup menu settings
     app.popupWidth = 350
     app.popupHeight = 370
     app.popupX = 10
     app.popupY = 10
     
-    # initialize actionButtons to avoid AttributeError
-    app.actionButtons = {}
+    # finds what a click landed on (popup, furniture or a cat) in one lookup
+    app.hitTester = HitTester(app.sim.pickCat)
+
+def getAppPopupLayout(app):
+    # geometry of the cat popup, shared by drawing and clicking (see popup_layout.py)
+    return getPopupLayout(app.popupX, app.popupY, app.popupWidth, app.popupHeight)
 
-def updateActionButtons(app):
-    # all button logic is based on what Professor Mike Taylor discussed in lecture [07/29]
+def updateHitRegions(app):
+    # what a click can land on besides a cat, highest priority first (see hit_testing.py)
+    # popup buttons, then the rest of the popup (clicks there do nothing), then furniture
+    key = (app.selectedCat is not None, app.popupX, app.popupY, app.popupWidth, app.popupHeight, tuple(app.furniture))
+    if key == app.hitTester.key:
+        return
+    regions = []
     if app.selectedCat:
-        popupX, popupY = app.popupX, app.popupY
-        popupW, popupH = app.popupWidth, app.popupHeight
-        
-        # calculate button positions (same logic as in drawCatPopup)
-        headerHeight = 60
-        statsY = popupY + headerHeight + 20
-        statSpacing = 35
-        activityY = statsY + statSpacing * 4 + 20
-        buttonY = activityY + 60
-        buttonWidth = 80
-        buttonHeight = 40
-        buttonSpacing = 20
-        
-        totalButtonWidth = buttonWidth * 3 + buttonSpacing * 2
-        startX = popupX + (popupW - totalButtonWidth) // 2
-        
-        # close button position
-        closeX = popupX + popupW - 30
-        closeY = popupY + 30
-        
-        app.actionButtons = {
-            'feed': {'x': startX, 'y': buttonY, 'w': buttonWidth, 'h': buttonHeight},
-            'play': {'x': startX + buttonWidth + buttonSpacing, 'y': buttonY, 'w': buttonWidth, 'h': buttonHeight},
-            'clean': {'x': startX + (buttonWidth + buttonSpacing) * 2, 'y': buttonY, 'w': buttonWidth, 'h': buttonHeight},
-            'close': {'x': closeX - 15, 'y': closeY - 15, 'w': 30, 'h': 30}
-        }
-    else:
-        app.actionButtons = {}
+        layout = getAppPopupLayout(app)
+        for name, (x, y, width, height) in layout.clickAreas:
+            regions.append((x, y, width, height, 'button', name))
+        regions.append((layout.x, layout.y, layout.width, layout.height, 'popup', None))
+    for furniture in app.furniture:
+        regions.append((furniture.x, furniture.y, furniture.width, furniture.height, 'furniture', furniture))
+    app.hitTester.setRegions(key, regions)
+
+def getCatPopupKey(app, cat):
+    # everything the popup shows, rounded the way it's shown (the bars can lag by under a point)
+    return (cat, cat.name, cat.mood, cat.activity, cat.isSleeping,
+            int(cat.hunger), int(cat.happiness), int(cat.energy), int(cat.cleanliness),
+            app.draggingCat is not None, app.popupX, app.popupY, app.popupWidth, app.popupHeight,
+            app.frameBudget.showOverlays)
 
 def drawCatPopup(app, cat):
+    # only re-recorded when what it shows changes, otherwise last frame's draw calls are replayed
+    app.displayLists.draw("catPopup", getCatPopupKey(app, cat), buildCatPopup, app, cat)
+
+def buildCatPopup(canvas, app, cat):
+    # records the popup into canvas (a DisplayList, see drawCatPopup)
+    layout = getAppPopupLayout(app)
     # popup background with rounded corners effect
-    popupX, popupY = app.popupX, app.popupY
-    popupW, popupH = app.popupWidth, app.popupHeight
+    popupX, popupY = layout.x, layout.y
+    popupW, popupH = layout.width, layout.height
     # shadow effect (this is something i used often whilst designing in HTML)
-    drawRect(popupX + 3, popupY + 3, popupW, popupH, fill='black', opacity=30)
+    if app.frameBudget.showOverlays:
+        canvas.drawRect(popupX + 3, popupY + 3, popupW, popupH, fill='black', opacity=30)
     # main popup background
-    drawRect(popupX, popupY, popupW, popupH, fill='aliceBlue', border='cadetBlue', borderWidth=3)
+    canvas.drawRect(popupX, popupY, popupW, popupH, fill='aliceBlue', border='cadetBlue', borderWidth=3)
     # header section
-    headerHeight = 60
-    drawRect(popupX, popupY, popupW, headerHeight, fill='aliceBlue', border='cadetBlue', borderWidth=2)
+    canvas.drawRect(popupX, popupY, popupW, HEADER_HEIGHT, fill='aliceBlue', border='cadetBlue', borderWidth=2)
     # cat name
-    drawUnicodeLabel(f"{HAPPY_KAOMOJI} {cat.name.title()}", popupX + popupW//2, popupY + 20, 
+    canvas.drawUnicodeLabel(f"{HAPPY_KAOMOJI} {cat.name.title()}", layout.centerX, layout.nameY, 
                     size=24, bold=True, fill='cadetBlue', align='center')
     # close button (X)
-    closeX = popupX + popupW - 30
-    closeY = popupY + 30
-    drawCircle(closeX, closeY, 15, fill='red', border='darkRed', borderWidth=2)
-    drawLabel("×", closeX, closeY+1, size=20, bold=True, fill='white')
+    closeX, closeY = layout.closeX, layout.closeY
+    canvas.drawCircle(closeX, closeY, CLOSE_RADIUS, fill='red', border='darkRed', borderWidth=2)
+    canvas.drawLabel("×", closeX, closeY+1, size=20, bold=True, fill='white')
 
     # mood indicator 
     if cat.mood == "happy":
@@ -137,35 +168,21 @@ def drawCatPopup(app, cat):
     else:
         moodKaomoji = NEUTRAL_KAOMOJI
 
-    drawUnicodeLabel(f"Mood: {moodKaomoji} {cat.mood.title()}", popupX + popupW//2, popupY + 45, 
+    canvas.drawUnicodeLabel(f"Mood: {moodKaomoji} {cat.mood.title()}", layout.centerX, layout.moodY, 
                     size=14, bold=True, fill='cadetBlue', align='center')
-    # stats section
-    statsY = popupY + headerHeight + 20
-    statHeight = 25
-    statSpacing = 35
     # stat bars with colors
-    statColors = {
-        'hunger': 'lightSalmon',
-        'happiness': 'lightPink', 
-        'energy': 'darkSeaGreen',
-        'cleanliness': 'lightSteelBlue'
-    }
-    
-    drawStatBar(popupX + 20, statsY, popupW - 40, statHeight, 
-               cat.hunger, 100, statColors['hunger'], "Hunger")
-    
-    drawStatBar(popupX + 20, statsY + statSpacing, popupW - 40, statHeight,
-               cat.happiness, 100, statColors['happiness'], "Happiness")
-    
-    drawStatBar(popupX + 20, statsY + statSpacing * 2, popupW - 40, statHeight,
-               cat.energy, 100, statColors['energy'], "Energy")
-    
-    drawStatBar(popupX + 20, statsY + statSpacing * 3, popupW - 40, statHeight,
-               cat.cleanliness, 100, statColors['cleanliness'], "Cleanliness")
+    statBars = [
+        (cat.hunger, 'lightSalmon', "Hunger"),
+        (cat.happiness, 'lightPink', "Happiness"),
+        (cat.energy, 'darkSeaGreen', "Energy"),
+        (cat.cleanliness, 'lightSteelBlue', "Cleanliness"),
+    ]
+    for (value, color, label), rowY in zip(statBars, layout.statRows):
+        drawStatBar(layout.statX, rowY, layout.statWidth, STAT_HEIGHT, value, 100, color, label, canvas)
     
     # activity section
-    activityY = statsY + statSpacing * 4 + 20
-    drawRect(popupX + 10, activityY - 10, popupW - 20, 40, fill='lightYellow', 
+    boxX, boxY, boxWidth, boxHeight = layout.activityBox
+    canvas.drawRect(boxX, boxY, boxWidth, boxHeight, fill='lightYellow', 
              border='orange', borderWidth=2)
     if cat.isSleeping:
         activityText = f"Current Activity: Sleeping {SLEEPING_KAOMOJI}"
@@ -180,33 +197,26 @@ def drawCatPopup(app, cat):
     else:
         activityText = f"Current Activity: {cat.activity.title()}"
     
-    drawUnicodeLabel(activityText, popupX + popupW//2, activityY + 10, 
+    canvas.drawUnicodeLabel(activityText, layout.centerX, layout.activityY + 10, 
                     size=16, bold=True, fill='darkOrange')
     
     # action buttons
-    buttonY = activityY + 60
-    buttonWidth = 80
-    buttonHeight = 40
-    buttonSpacing = 20
-    # calculate button positions to center them
-    totalButtonWidth = buttonWidth * 3 + buttonSpacing * 2
-    startX = popupX + (popupW - totalButtonWidth) // 2
-    
-    buttons = [
-        {'name': 'feed', 'text': f'{EATING_KAOMOJI} Feed', 'color': 'lightGreen', 'x': startX},
-        {'name': 'play', 'text': f'{EXCITED_KAOMOJI} Play', 'color': 'lightCoral', 'x': startX + buttonWidth + buttonSpacing},
-        {'name': 'clean', 'text': f'{SPARKLES_KAOMOJI} Clean', 'color': 'lightBlue', 'x': startX + (buttonWidth + buttonSpacing) * 2}
-    ]
-    
-    for button in buttons:
+    buttonText = {
+        'feed': (f'{EATING_KAOMOJI} Feed', 'lightGreen'),
+        'play': (f'{EXCITED_KAOMOJI} Play', 'lightCoral'),
+        'clean': (f'{SPARKLES_KAOMOJI} Clean', 'lightBlue'),
+    }
+    for name, (buttonX, buttonY, buttonWidth, buttonHeight) in layout.buttons.items():
+        text, color = buttonText[name]
         # button shadow
-        drawRect(button['x'] + 2, buttonY + 2, buttonWidth, buttonHeight, fill='gray', opacity=50)
+        if app.frameBudget.showOverlays:
+            canvas.drawRect(buttonX + 2, buttonY + 2, buttonWidth, buttonHeight, fill='gray', opacity=50)
         # main button
-        buttonColor = 'lightGray' if app.draggingCat else button['color']
-        drawRect(button['x'], buttonY, buttonWidth, buttonHeight, 
+        buttonColor = 'lightGray' if app.draggingCat else color
+        canvas.drawRect(buttonX, buttonY, buttonWidth, buttonHeight, 
                 fill=buttonColor, border='black', borderWidth=2)
         # button text
-        drawLabel(button['text'], button['x'] + buttonWidth//2, buttonY + buttonHeight//2, 
+        canvas.drawLabel(text, buttonX + buttonWidth//2, buttonY + buttonHeight//2, 
                  size=10, bold=True, font='monospace')
 
 def onMousePress(app, mouseX, mouseY):
@@ -214,49 +224,37 @@ def onMousePress(app, mouseX, mouseY):
         app.absenceTracker.updateActivity()
     app.mouseX = mouseX
     app.mouseY = mouseY
-    # update button positions before checking clicks
-    updateActionButtons(app)
-    # check popup button clicks FIRST if popup is open
-    if app.selectedCat and hasattr(app, 'actionButtons'):
-        for name, b in app.actionButtons.items():
-            if b['x'] <= mouseX <= b['x'] + b['w'] and b['y'] <= mouseY <= b['y'] + b['h']:
-                if name == 'feed':
-                    app.selectedCat.feed()
-                    return  # don't process other clicks
-                elif name == 'play':
-                    app.selectedCat.play()
-                    return  # don't process other clicks
-                elif name == 'clean':
-                    app.selectedCat.clean()
-                    return  # don't process other clicks
-                elif name == 'close':
-                    # ONLY close menu when red X is clicked
-                    app.selectedCat = None
-                    app.draggingCat = None
-                    updateActionButtons(app)  # clear buttons when closing popup
-                    return  # don't process other clicks
-        # if popup is open and click is inside popup area, don't select other cats
-        popupX, popupY = app.popupX, app.popupY
-        popupW, popupH = app.popupWidth, app.popupHeight
-        if (popupX <= mouseX <= popupX + popupW and 
-            popupY <= mouseY <= popupY + popupH):
-            return  # click was inside popup but not on a button, ignore it
-    # check furniture clicks BEFORE cat clicks
-    for furniture in app.furniture:
-        if furniture.isClicked(mouseX, mouseY):
-            furniture.cycleVariant()
-            print(f"Clicked {furniture.name}, now showing variant {furniture.currentVariant}")
-            return  # don't process cat clicks if furniture was clicked
-    # check if user clicked on a cat (works even if popup is open)
-    for cat in app.cats:
-        dist = ((mouseX - cat.x) ** 2 + (mouseY - cat.y) ** 2) ** 0.5
-        if dist <= 50:
-            app.selectedCat = cat
-            app.draggingCat = cat
-            app.dragStartTime = app.stepCounter
-            cat.startDrag(mouseX, mouseY)
-            updateActionButtons(app)  # update buttons for new selection
-            return
+    # one lookup finds what was clicked: popup buttons first, then the popup, furniture and cats
+    updateHitRegions(app)
+    kind, target = app.hitTester.hitTest(mouseX, mouseY)
+    if kind == 'button':
+        if target == 'feed':
+            app.selectedCat.feed()
+        elif target == 'play':
+            app.selectedCat.play()
+        elif target == 'clean':
+            app.selectedCat.clean()
+        elif target == 'close':
+            # ONLY close menu when red X is clicked
+            app.selectedCat = None
+            app.draggingCat = None
+    elif kind == 'popup':
+        pass  # click was inside popup but not on a button, ignore it
+    elif kind == 'furniture':
+        app.sim.cycleFurniture(target)
+        print(f"Clicked {target.name}, now showing variant {target.currentVariant}")
+    elif kind == 'cat':
+        # check if user clicked on a cat (works even if popup is open)
+        # the spatial grid only looks at cats near the click (closest one wins)
+        app.selectedCat = target
+        app.draggingCat = target
+        app.dragStartTime = app.stepCounter
+        target.startDrag(mouseX, mouseY)
+
+def onMouseMove(app, mouseX, mouseY):
+    # crowded rooms only show names and full animation near the mouse (see lod.py)
+    app.mouseX = mouseX
+    app.mouseY = mouseY
 
 def onMouseDrag(app, mouseX, mouseY):
     app.mouseX = mouseX
@@ -280,60 +278,65 @@ def onMouseRelease(app, mouseX, mouseY):
                 print(f"{app.draggingCat.name} would collide with {collidingCat.name}!")
                 # find a safe position nearby
                 safeX, safeY = findSafePosition(app, app.draggingCat, newX, newY)
-                app.draggingCat.x = safeX
-                app.draggingCat.y = safeY
+                app.draggingCat.moveTo(safeX, safeY)
                 print(f"Moved {app.draggingCat.name} to safe position ({safeX:.0f}, {safeY:.0f})")
             else:
-                app.draggingCat.x = newX
-                app.draggingCat.y = newY
+                app.draggingCat.moveTo(newX, newY)
         app.draggingCat.stopDrag()
         app.draggingCat = None
 
+def changeRoom(app, direction):
+    # show the next/previous room, whatever was held or open belongs to the old one
+    if app.draggingCat:
+        app.draggingCat.stopDrag()
+        app.draggingCat = None
+    app.selectedCat = None
+    rooms = app.sim.rooms
+    index = (rooms.index(app.sim.activeRoom) + direction) % len(rooms)
+    room = app.sim.switchRoom(index)
+    app.cats = app.sim.cats
+    app.furniture = app.sim.furniture
+    print(f"Now in the {room.name} ({len(room.cats)} cats)")
+
 def checkCatCollisions(app, draggedCat, newX, newY):
-    # check if a cat would collide with others at a new position
-    for otherCat in app.cats:
-        if otherCat == draggedCat:
-            continue
-        distance = ((newX - otherCat.x) ** 2 + (newY - otherCat.y) ** 2) ** 0.5
-        catRadius = 40
-        if distance < catRadius * 2:
-            return True, otherCat
-    return False, None
+    # check if a cat would collide with others at a new position (only nearby cats are checked)
+    otherCat = app.sim.findCollision(draggedCat, newX, newY)
+    return otherCat is not None, otherCat
 
 def findSafePosition(app, cat, preferredX, preferredY):
-    # find a safe position near the preferred location
-    catRadius = 40
-    # try positions in a spiral pattern around preferred location
-    for radius in range(0, 200, 20):
-        for angle in range(0, 360, 30):
-            import math
-            testX = preferredX + radius * math.cos(math.radians(angle))
-            testY = preferredY + radius * math.sin(math.radians(angle))
-            # check if position is valid and doesn't collide
-            if isValidPosition(testX, testY):
-                isColliding, _ = checkCatCollisions(app, cat, testX, testY)
-                if not isColliding:
-                    return testX, testY
+    # nearest collision-free spot on the floor (see occupancy.py)
+    spot = app.sim.findFreeSpot(cat, preferredX, preferredY)
+    if spot:
+        return spot
     # fallback to last valid position
     return cat.lastValidX, cat.lastValidY
 
 def onStep(app):
-    app.stepCounter += 1
-    app.gameTime += 1
+    # all the game rules live in the simulation, this just advances it and handles ui timers
+    # the simulation moves in fixed steps: a late frame runs a few steps to catch up and an
+    # early one might run none, so game speed doesn't depend on how fast frames are drawn
+    now = time.perf_counter()
+    app.stepAccumulator += now - app.lastStepTime
+    app.lastStepTime = now
+    steps = min(MAX_SUBSTEPS, int(app.stepAccumulator / STEP_SECONDS))
+    app.stepAccumulator -= steps * STEP_SECONDS
+    if steps == MAX_SUBSTEPS:
+        # way behind (e.g. the window was dragged), skip ahead instead of trying to catch up
+        app.stepAccumulator = min(app.stepAccumulator, STEP_SECONDS)
+    if steps:
+        # absence checks are spread out when frames are over budget (nothing happens if it's unchanged)
+        app.sim.setAbsenceCheckInterval(app.frameBudget.absenceCheckInterval)
+        app.sim.step(steps)
+    # how far we are between the last step and the next one, for drawing in between
+    app.renderAlpha = min(1.0, app.stepAccumulator / STEP_SECONDS)
+    app.stepCounter = app.sim.stepCounter
+    app.gameTime += steps
     # handle away time popup timer
     if app.showAwayTime and app.awayTimeTimer > 0:
-        app.awayTimeTimer -= 1
+        app.awayTimeTimer -= steps
         if app.awayTimeTimer <= 0:
             app.showAwayTime = False
-    # regular game updates
-    if app.stepCounter % 30 == 0:
-        for cat in app.cats:
-            cat.updateStats()
-            if app.stepCounter % 120 == 0:
-                cat.activity = "idle"
-    # check for absence periodically (but don't update activity)
-    if app.stepCounter % 90 == 0:  # every 3 seconds
-        app.absenceTracker.checkForAbsence()
+    app.frameBudget.recordStep((time.perf_counter() - now) * 1000)
 
 def onKeyPress(app, key):
     app.absenceTracker.updateActivity()
@@ -351,11 +354,7 @@ def onKeyPress(app, key):
         else:
             print("Music not available")
     elif key == 'r':  # press 'R' to make Elwin run
-        elwin = None
-        for cat in app.cats:
-            if cat.name == "elwin":
-                elwin = cat
-                break
+        elwin = app.sim.findCat("elwin")
         if elwin:
             if not elwin.isRunning:
                 print("Forcing Elwin to run!")
@@ -364,6 +363,10 @@ def onKeyPress(app, key):
                 print("Elwin is already running!")
         else:
             print("Could not find Elwin!")
+    elif key == 'left':  # arrow keys walk through the rooms
+        changeRoom(app, -1)
+    elif key == 'right':
+        changeRoom(app, 1)
     elif key == 'f':  # press 'F' to show furniture info in console
         # print-statement format inspired by the 112 gradebook
         print("=== FURNITURE STATUS ===")
@@ -393,8 +396,8 @@ def onKeyPress(app, key):
         print(f"Difference: {difference:.1f} seconds")
         # check file contents
         # i got this from: https://stackoverflow.com/questions/28737292/how-to-check-text-file-exists-and-is-not-empty-in-python
-        if os.path.exists("last_active.txt"):
-            with open("last_active.txt", 'r') as f:
+        if os.path.exists(ACTIVITY_FILE):
+            with open(ACTIVITY_FILE, 'r') as f:
                 content = f.read().strip()
             print(f"File contains: '{content}'")
             if content:
@@ -411,11 +414,9 @@ def onKeyPress(app, key):
         print("=== MANUAL ABSENCE TEST ===")
         # set timestamp to 2 minutes ago
         fake_time = time.time() - 120  # 2 minutes ago
-        # write directly to file
-        # asked Claude how to write directly into a file because i was unsure
-        # prompt: "what are ways to directly replace something in a python text file"
-        with open("last_active.txt", 'w') as f:
-            f.write(str(fake_time))
+        # write it to the file (through the tracker so a queued save can't overwrite it later)
+        app.absenceTracker.lastActiveTime = fake_time
+        app.absenceTracker.saveActivityData()
         # reload the absence tracker
         app.absenceTracker.loadActivityData()
         # check absence time
@@ -431,6 +432,17 @@ def onKeyPress(app, key):
             print(f"Timer set to: {app.awayTimeTimer}")
         else:
             print("Absence time too short for popup")
+    elif key == 'o':  # press 'O' to show/hide the frame profiler
+        if app.profiler:
+            app.profiler.showOverlay = not app.profiler.showOverlay
+        else:
+            print(f"Profiler is off (start the game with {PROFILE_ENV}=1)")
+    elif key == 'e':  # press 'E' to save the profiler data
+        if app.profiler:
+            path = app.profiler.export(f"profile_{int(time.time())}.json")
+            print(f"Saved profile to {path}")
+        else:
+            print(f"Profiler is off (start the game with {PROFILE_ENV}=1)")
     # force popup test key:
     elif key == 'p':  # press 'P' to force show popup
         print("=== FORCE POPUP TEST ===")
@@ -446,83 +458,117 @@ def onKeyPress(app, key):
         print(f"  awayTimeTimer: {app.awayTimeTimer}")
         print("Popup should be visible now!")
 
-def redrawAll(app):
-    drawRect(0, 0, app.width, app.height, fill=rgb(245, 245, 220))
-    try:
-        drawImage("images/basic_room2.png", 0, 0, width=app.width, height=app.height)
-    except:
-        drawLabel("Background image missing: images/basic_room2.png", app.width//2, 50, size=16, fill='red', font='monospace')
+def buildAwayPopup(canvas, app):
+    boxWidth = 400
+    boxHeight = 40
+    x = app.width//2 - boxWidth//2
+    y = 120
+    # draw popup background
+    canvas.drawRect(x, y, boxWidth, boxHeight, fill='lightYellow', 
+            border='orange', borderWidth=3, opacity=app.frameBudget.getOpacity(85))
+    level_text = app.absenceLevelText.capitalize()
+    if level_text == "Active":
+        level_text = "Just Arrived"
+    # draw message
+    message = f"You were away for {app.awayTimeText} ({level_text} Absence)"
+    canvas.drawLabel(message, app.width//2, y + boxHeight//2, 
+             size=12, bold=True, fill='darkOrange', font='monospace')
+
+def buildInstructions(canvas, app):
+    # instruction text with nice styling - using kaomoji
+    instructionY = 100
+    if not app.roomLayer.panelsBaked:
+        drawPanelBox(getInstructionBox(app), canvas, app.frameBudget.showOverlays)
+    canvas.drawLabel(f"{HAPPY_KAOMOJI} Click on a cat to interact! {HAPPY_KAOMOJI}", app.width//2, instructionY-30, 
+             size=20, bold=True, fill='cadetBlue', font='monospace')
+    canvas.drawLabel("Drag the cats around the room • Click the bed and cat post to recolor!", app.width//2, instructionY -5, 
+             size=16, fill='gray', font='monospace', bold=True)
 
-    # draw furniture overlays after background but before cats
-    drawFurnitureOverlays(app)
-    # draw cats that aren't being dragged first
+def buildDragBanner(canvas, app):
+    # drag instruction with nice styling - using kaomoji
+    dragY = app.height - 100
+    canvas.drawRect(app.width//2 - 250, dragY - 20, 500, 60, 
+            fill='lightYellow', border='orange', borderWidth=2, opacity=app.frameBudget.getOpacity(90))
+    canvas.drawLabel(f"{EXCITED_KAOMOJI} Moving {app.draggingCat.name}! Release to place.", 
+             app.width//2, dragY, size=20, bold=True, fill='darkOrange', font='monospace')
+    canvas.drawLabel("Place them on the floor area", app.width//2, dragY + 25, 
+             size=16, fill='gray', font='monospace')
+
+def buildControls(canvas, app):
+    controlsX = app.width - 40
+    controlsY = app.height - 90
+    if not app.roomLayer.panelsBaked:
+        drawPanelBox(getControlsBox(app), canvas, app.frameBudget.showOverlays)
+    canvas.drawLabel("Extra Controls", controlsX - 90, controlsY - 40, size=18, bold=True, fill='white', font='monospace', align='center')
+    canvas.drawLabel("R = Make Elwin Run", controlsX - 90, controlsY-5, size=14, fill='black', font='monospace', align='center')
+    canvas.drawLabel("F = Furniture Info", controlsX - 90, controlsY + 15, size=14, fill='black', font='monospace', align='center')
+    canvas.drawLabel("M = Pause/Resume Music", controlsX - 90, controlsY + 35, size=14, fill='black', font='monospace', align='center')
+    canvas.drawLabel("T = Test Absence System", controlsX - 90, controlsY + 55, size=14, fill='black', font='monospace', align='center')
+
+def buildMusicIndicator(canvas, app):
+    musicStatus = "♪♫ ON" if app.musicPlaying else "♪♫ OFF"
+    musicColor = 'lightGreen' if app.musicPlaying else 'lightCoral'
+    canvas.drawRect(app.width - 80, 20, 60, 25, fill=musicColor, border='black', borderWidth=2,
+                    opacity=app.frameBudget.getOpacity(30))
+    canvas.drawLabel(musicStatus, app.width - 50, 32, size=12, bold=True, fill='black', font='monospace')
+
+def buildRoomLabel(canvas, app, index):
+    # which room is on screen, next to the music indicator
+    roomCount = len(app.sim.rooms)
+    canvas.drawLabel(f"← {app.sim.activeRoom.name} ({index + 1}/{roomCount}) →", app.width - 95, 32,
+                     size=14, bold=True, fill='black', font='monospace', align='right')
+
+def redrawAll(app):
+    frameStart = time.perf_counter()
+    # static layer: background, furniture overlays and the ui boxes (only rebuilt when they change)
+    app.roomLayer.draw(app)
+    # draw cats that aren't being dragged first (with less detail in crowded rooms)
     catsToDraw = [cat for cat in app.cats if not cat.isBeingDragged]
-    for cat in catsToDraw:
-        cat.draw(app)
+    app.lod.update(len(app.cats), app.frameBudget.lodLevels)
+    app.lod.drawCats(app, catsToDraw, app.renderAlpha)
     # draw dragged cat on top
     if app.draggingCat:
-        app.draggingCat.draw(app)
+        app.draggingCat.draw(app, app.renderAlpha)
     # selection indicator
     if app.selectedCat and not app.selectedCat.isBeingDragged:
-        drawCircle(app.selectedCat.x, app.selectedCat.y, 55, fill=None, border='cadetBlue', borderWidth=4, opacity=30)
+        selectedX, selectedY = app.selectedCat.getDrawPosition(app.renderAlpha)
+        if app.frameBudget.showOverlays:
+            drawCircle(selectedX, selectedY, 55, fill=None, border='cadetBlue', borderWidth=4, opacity=30)
+        else:
+            drawCircle(selectedX, selectedY, 55, fill=None, border='cadetBlue', borderWidth=2)
+    # the ui panels below are recorded once and replayed until what they show changes (see display_list.py)
+    overlays = app.frameBudget.showOverlays
     # draw away time popup
     if app.showAwayTime:
-        boxWidth = 400
-        boxHeight = 40
-        x = app.width//2 - boxWidth//2
-        y = 120
-        # draw popup background
-        drawRect(x, y, boxWidth, boxHeight, fill='lightYellow', 
-                border='orange', borderWidth=3, opacity=85)
-        level_text = app.absenceLevelText.capitalize()
-        if level_text == "Active":
-            level_text = "Just Arrived"
-        # draw message
-        message = f"You were away for {app.awayTimeText} ({level_text} Absence)"
-        drawLabel(message, app.width//2, y + boxHeight//2, 
-                 size=12, bold=True, fill='darkOrange', font='monospace')
+        app.displayLists.draw("awayPopup", (app.width, app.awayTimeText, app.absenceLevelText, overlays),
+                              buildAwayPopup, app)
     
     # draw the popup menu if a cat is selected
     if app.selectedCat:
         drawCatPopup(app, app.selectedCat)
     else:
-        # instruction text with nice styling - using kaomoji
-        instructionY = 100
-        boxWidth = 680 
-        drawRect(app.width//2 - boxWidth//2, instructionY - 50, boxWidth, 60, 
-                fill='aliceBlue', border='cadetBlue', borderWidth=2, opacity=90)
-        drawLabel(f"{HAPPY_KAOMOJI} Click on a cat to interact! {HAPPY_KAOMOJI}", app.width//2, instructionY-30, 
-                 size=20, bold=True, fill='cadetBlue', font='monospace')
-        drawLabel("Drag the cats around the room • Click the bed and cat post to recolor!", app.width//2, instructionY -5, 
-                 size=16, fill='gray', font='monospace', bold=True)
+        app.displayLists.draw("instructions", (app.width, app.roomLayer.panelsBaked, overlays), buildInstructions, app)
     
     if app.draggingCat:
-        # drag instruction with nice styling - using kaomoji
-        dragY = app.height - 100
-        drawRect(app.width//2 - 250, dragY - 20, 500, 60, 
-                fill='lightYellow', border='orange', borderWidth=2, opacity=90)
-        drawLabel(f"{EXCITED_KAOMOJI} Moving {app.draggingCat.name}! Release to place.", 
-                 app.width//2, dragY, size=20, bold=True, fill='darkOrange', font='monospace')
-        drawLabel("Place them on the floor area", app.width//2, dragY + 25, 
-                 size=16, fill='gray', font='monospace')
+        app.displayLists.draw("dragBanner", (app.width, app.height, app.draggingCat.name, overlays),
+                              buildDragBanner, app)
     
-    controlsX = app.width - 40
-    controlsY = app.height - 90
-    drawRect(controlsX - 200, controlsY - 55, 220, 135, fill='steelBlue', border='darkBlue', opacity=30)
-    drawLabel("Extra Controls", controlsX - 90, controlsY - 40, size=18, bold=True, fill='white', font='monospace', align='center')
-    drawLabel("R = Make Elwin Run", controlsX - 90, controlsY-5, size=14, fill='black', font='monospace', align='center')
-    drawLabel("F = Furniture Info", controlsX - 90, controlsY + 15, size=14, fill='black', font='monospace', align='center')
-    drawLabel("M = Pause/Resume Music", controlsX - 90, controlsY + 35, size=14, fill='black', font='monospace', align='center')
-    drawLabel("T = Test Absence System", controlsX - 90, controlsY + 55, size=14, fill='black', font='monospace', align='center')
+    app.displayLists.draw("controls", (app.width, app.height, app.roomLayer.panelsBaked, overlays), buildControls, app)
 
     # music status indicator
     if app.musicEnabled:
-        musicStatus = "♪♫ ON" if app.musicPlaying else "♪♫ OFF"
-        musicColor = 'lightGreen' if app.musicPlaying else 'lightCoral'
-        drawRect(app.width - 80, 20, 60, 25, fill=musicColor, border='black', borderWidth=2, opacity=30)
-        drawLabel(musicStatus, app.width - 50, 32, size=12, bold=True, fill='black', font='monospace')
+        app.displayLists.draw("music", (app.width, app.musicPlaying, overlays), buildMusicIndicator, app)
+    if len(app.sim.rooms) > 1:
+        index = app.sim.rooms.index(app.sim.activeRoom)
+        app.displayLists.draw("roomLabel", (app.width, index, len(app.sim.rooms)), buildRoomLabel, app, index)
+
+    if app.profiler and app.profiler.showOverlay:
+        app.profiler.drawOverlay(app)
+    app.frameBudget.recordFrame((time.perf_counter() - frameStart) * 1000)
     
 def main():
+    if os.environ.get(PROFILE_ENV):
+        installProfiler(globals())
     runApp()
 
 if __name__ == "__main__":
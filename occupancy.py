@@ -0,0 +1,106 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import heapq
+import math
+from functools import lru_cache
+from constants import CAT_RADIUS, OCCUPANCY_CELL_SIZE
+
+# grid over the floor's walkable cells for finding the nearest spot a cat can stand on
+# finding a spot for a dropped cat is a search outward from the drop point that visits cells in
+# order of real distance, and the first walkable cell with no cat too close (checked through the
+# spatial grid, which already follows every cat) is the truly nearest free one
+# nothing is stored per cat, so moving cats cost this grid nothing (it only works when a spot is asked for)
+
+class OccupancyGrid:
+    def __init__(self, floor, spatialGrid=None, cellSize=OCCUPANCY_CELL_SIZE, blockRadius=CAT_RADIUS * 2):
+        self.floor = floor
+        self.spatialGrid = spatialGrid  # where the cats are
+        self.cellSize = cellSize
+        self.blockRadius = blockRadius
+        self.left, self.top = floor.left, floor.top
+        self.columns = int(math.ceil(floor.columns * floor.cellSize / cellSize))
+        self.rows = int(math.ceil(floor.rows * floor.cellSize / cellSize))
+        # every room has the same floor, so the walkable cells are only worked out once
+        self.walkable = getWalkableCells(floor, cellSize, self.columns, self.rows)
+
+    def getCellCenter(self, column, row):
+        return (self.left + (column + 0.5) * self.cellSize, self.top + (row + 0.5) * self.cellSize)
+
+    def getCell(self, x, y):
+        # closest cell on the grid (points off the grid are clamped onto its edge)
+        column = min(self.columns - 1, max(0, int((x - self.left) // self.cellSize)))
+        row = min(self.rows - 1, max(0, int((y - self.top) // self.cellSize)))
+        return column, row
+
+    def isSpotFree(self, x, y, ignoreCat=None):
+        if self.spatialGrid is None:
+            return True
+        return self.spatialGrid.findOverlap(x, y, self.blockRadius, ignoreCat) is None
+
+    def findNearestFree(self, x, y, ignoreCat=None):
+        # nearest walkable cell center that no other cat blocks, or None if the floor is full
+        columns, rows, cellSize = self.columns, self.rows, self.cellSize
+        left, top = self.left + 0.5 * cellSize, self.top + 0.5 * cellSize  # center of cell (0, 0)
+        walkable = self.walkable
+        startColumn, startRow = self.getCell(x, y)
+        visited = bytearray(columns * rows)
+        visited[startRow * columns + startColumn] = 1
+        heap = [(0, startColumn, startRow)]
+        # the last cat found in the way, the next few cells are usually too close to it as well
+        # so it's checked first (much cheaper than asking the spatial grid again)
+        blocker = None
+        blockRadiusSquared = self.blockRadius ** 2
+        while heap:
+            distance, column, row = heapq.heappop(heap)
+            if walkable[row * columns + column]:
+                cellX, cellY = left + column * cellSize, top + row * cellSize
+                if blocker is None or (cellX - blocker.x) ** 2 + (cellY - blocker.y) ** 2 >= blockRadiusSquared:
+                    if self.spatialGrid is None:
+                        return cellX, cellY
+                    blocker = self.spatialGrid.findOverlap(cellX, cellY, self.blockRadius, ignoreCat)
+                    if blocker is None:
+                        return cellX, cellY
+            # every cell has a neighbour that is closer to (x, y), so popping by distance
+            # visits cells in the right order
+            for nextRow in (row - 1, row, row + 1):
+                if 0 <= nextRow < rows:
+                    dy = top + nextRow * cellSize - y
+                    rowStart = nextRow * columns
+                    for nextColumn in (column - 1, column, column + 1):
+                        if 0 <= nextColumn < columns and not visited[rowStart + nextColumn]:
+                            visited[rowStart + nextColumn] = 1
+                            dx = left + nextColumn * cellSize - x
+                            heapq.heappush(heap, (dx * dx + dy * dy, nextColumn, nextRow))
+        return None
+
+    def placeCats(self, cats, positions=None):
+        # batch placement: each cat goes to the free spot nearest its preferred position
+        # (its current one by default). only cats placed earlier in the batch block later ones
+        if self.spatialGrid:
+            for cat in cats:
+                self.spatialGrid.removeCat(cat)
+        placed = []
+        for i, cat in enumerate(cats):
+            preferredX, preferredY = positions[i] if positions else (cat.x, cat.y)
+            spot = self.findNearestFree(preferredX, preferredY)
+            if spot is not None:
+                cat.moveTo(*spot)
+                cat.lastValidX, cat.lastValidY = spot
+            # moveTo re-adds tracked cats, this covers cats that aren't tracked (or didn't fit)
+            if self.spatialGrid and cat not in self.spatialGrid.catCells:
+                self.spatialGrid.addCat(cat)
+            placed.append(spot)
+        return placed
+
+@lru_cache(maxsize=8)
+def getWalkableCells(floor, cellSize, columns, rows):
+    # 1 for every cell whose center is on the floor (shared between grids, only read)
+    walkable = bytearray(columns * rows)
+    for row in range(rows):
+        for column in range(columns):
+            if floor.isWalkable(floor.left + (column + 0.5) * cellSize, floor.top + (row + 0.5) * cellSize):
+                walkable[row * columns + column] = 1
+    return walkable
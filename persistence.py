@@ -0,0 +1,110 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import os
+import atexit
+import threading
+from constants import ACTIVITY_FLUSH_INTERVAL
+
+# saving files without blocking the game
+# writes go to a temp file first and are then renamed over the real one, so a crash
+# mid-write leaves the old file instead of an empty one
+
+def writeFileAtomic(path, data):
+    if isinstance(data, str):
+        data = data.encode()
+    tempPath = f"{path}.tmp"
+    with open(tempPath, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tempPath, path)  # rename is atomic, readers see the old or the new file
+
+class BackgroundWriter:
+    # keeps only the newest data for a file and writes it from a background thread every
+    # flushInterval seconds (and once more when the game exits), so callers never touch the disk
+    def __init__(self, path, flushInterval=ACTIVITY_FLUSH_INTERVAL):
+        self.path = path
+        self.flushInterval = flushInterval
+        self.pending = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.writeLock = threading.Lock()  # one write at a time (thread flush vs flush())
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, data):
+        # newer data replaces anything that hasn't been written yet
+        with self.condition:
+            self.pending = data
+
+    def takePending(self):
+        with self.condition:
+            data = self.pending
+            self.pending = None
+        return data
+
+    def flush(self):
+        # write whatever is pending right now (on the calling thread)
+        # the data is taken under the write lock too, otherwise the thread and a flush() could each
+        # take some and the older data could be written last
+        with self.writeLock:
+            data = self.takePending()
+            if data is None:
+                return True
+            try:
+                self.write(data)
+                return True
+            except OSError as e:
+                print(f"Error saving {self.path}: {e}")
+                return False
+
+    def write(self, data):
+        writeFileAtomic(self.path, data)
+
+    def run(self):
+        while True:
+            with self.condition:
+                if not self.closed:
+                    self.condition.wait(self.flushInterval)
+                closed = self.closed
+            self.flush()
+            if closed:
+                return
+
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.flush()
+
+class AppendWriter(BackgroundWriter):
+    # same background thread, but for files that only grow (the journal): every submitted
+    # chunk is kept and they're appended in order, then fsynced
+    def __init__(self, path, header=b"", flushInterval=ACTIVITY_FLUSH_INTERVAL):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            writeFileAtomic(path, header)
+        self.chunks = []
+        super().__init__(path, flushInterval)
+
+    def submit(self, data):
+        with self.condition:
+            self.chunks.append(data)
+
+    def takePending(self):
+        with self.condition:
+            chunks = self.chunks
+            self.chunks = []
+        return b"".join(chunks) if chunks else None
+
+    def write(self, data):
+        with open(self.path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,52 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from functools import lru_cache
+
+# where everything in the cat popup goes, worked out once for a popup position and size
+# drawing (buildCatPopup) and clicking (the hit tester) both read it, so they can't disagree
+
+HEADER_HEIGHT = 60
+CLOSE_RADIUS = 15
+STAT_HEIGHT = 25
+STAT_SPACING = 35
+BUTTON_WIDTH = 80
+BUTTON_HEIGHT = 40
+BUTTON_SPACING = 20
+BUTTON_NAMES = ['feed', 'play', 'clean']
+
+class PopupLayout:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.centerX = x + width//2
+        # header: name, mood and the close button (X)
+        self.nameY = y + 20
+        self.moodY = y + 45
+        self.closeX = x + width - 30
+        self.closeY = y + 30
+        # stat bars, one row each for hunger, happiness, energy and cleanliness
+        statsY = y + HEADER_HEIGHT + 20
+        self.statX = x + 20
+        self.statWidth = width - 40
+        self.statRows = [statsY + STAT_SPACING * i for i in range(4)]
+        # activity box
+        self.activityY = statsY + STAT_SPACING * 4 + 20
+        self.activityBox = (x + 10, self.activityY - 10, width - 20, 40)
+        # action buttons, centered under the activity box
+        self.buttonY = self.activityY + 60
+        totalButtonWidth = BUTTON_WIDTH * 3 + BUTTON_SPACING * 2
+        startX = x + (width - totalButtonWidth) // 2
+        self.buttons = {name: (startX + (BUTTON_WIDTH + BUTTON_SPACING) * i, self.buttonY, BUTTON_WIDTH, BUTTON_HEIGHT)
+                        for i, name in enumerate(BUTTON_NAMES)}
+        self.closeButton = (self.closeX - CLOSE_RADIUS, self.closeY - CLOSE_RADIUS, CLOSE_RADIUS * 2, CLOSE_RADIUS * 2)
+        # everything clickable as (name, (x, y, width, height)), in the order clicks check them
+        self.clickAreas = list(self.buttons.items()) + [('close', self.closeButton)]
+
+@lru_cache(maxsize=8)
+def getPopupLayout(x, y, width, height):
+    return PopupLayout(x, y, width, height)
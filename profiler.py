@@ -0,0 +1,191 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import csv
+import json
+import time
+from constants import PROFILE_BUCKET_MS, PROFILE_BUCKET_COUNT, PROFILE_MAX_DRAW_CALLS
+
+# opt-in frame profiler (run the game with CAFE_PROFILE=1 to turn it on)
+# it wraps the main callbacks and the cmu_graphics draw functions once at startup, and
+# keeps every timing in a fixed-size histogram so memory stays the same however long it runs
+# O shows p50/p95/p99 in game, E writes everything to a json file for comparing builds
+
+DRAW_FUNCTIONS = ["drawImage", "drawRect", "drawLabel", "drawCircle", "drawLine", "drawPolygon",
+                  "drawOval", "drawArc", "drawRegularPolygon", "drawStar"]
+
+class Histogram:
+    def __init__(self, bucketWidth=PROFILE_BUCKET_MS, bucketCount=PROFILE_BUCKET_COUNT, wholeNumbers=False):
+        self.bucketWidth = bucketWidth
+        self.wholeNumbers = wholeNumbers  # counts (like draw calls) land exactly on a bucket
+        self.counts = [0] * bucketCount  # the last bucket also holds everything bigger
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        index = min(int(value / self.bucketWidth), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        # middle of the bucket the percentile falls in (so it's accurate to a bucket width)
+        if self.count == 0:
+            return 0
+        target = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                if self.wholeNumbers:
+                    return min(index * self.bucketWidth, self.max)
+                return min((index + 0.5) * self.bucketWidth, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+class FrameProfiler:
+    def __init__(self):
+        self.phases = {}  # phase name -> Histogram of milliseconds
+        self.frameTimes = Histogram()
+        self.drawCalls = Histogram(1, PROFILE_MAX_DRAW_CALLS, wholeNumbers=True)  # draw calls per frame
+        self.frameDrawCalls = 0
+        self.frameStart = None
+        self.counting = True
+        self.showOverlay = False
+
+    def record(self, name, milliseconds):
+        if name not in self.phases:
+            self.phases[name] = Histogram()
+        self.phases[name].add(milliseconds)
+
+    def timed(self, name, function):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+
+    def counted(self, function):
+        def wrapper(*args, **kwargs):
+            if self.counting:
+                self.frameDrawCalls += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    def beginFrame(self):
+        # a frame starts at the first onStep (or redrawAll) after the last frame was drawn
+        if self.frameStart is None:
+            self.frameStart = time.perf_counter()
+
+    def endFrame(self):
+        if self.frameStart is not None:
+            self.frameTimes.add((time.perf_counter() - self.frameStart) * 1000)
+        self.drawCalls.add(self.frameDrawCalls)
+        self.frameDrawCalls = 0
+        self.frameStart = None
+
+    def install(self, namespace):
+        # namespace is main_game's globals (the callbacks cmu_graphics calls live there)
+        import cmu_graphics
+        import utils
+        from cat import Cat
+        for name in DRAW_FUNCTIONS:
+            # modules that import cmu_graphics inside their draw functions see the module's version
+            if hasattr(cmu_graphics, name):
+                setattr(cmu_graphics, name, self.counted(getattr(cmu_graphics, name)))
+            # main_game imported the originals with `from cmu_graphics import *`
+            if name in namespace:
+                namespace[name] = self.counted(namespace[name])
+        Cat.draw = self.timed("Cat.draw", Cat.draw)
+        Cat.drawImpostor = self.timed("Cat.drawImpostor", Cat.drawImpostor)
+        utils.drawUnicodeLabel = namespace["drawUnicodeLabel"] = self.timed("drawUnicodeLabel", utils.drawUnicodeLabel)
+        namespace["drawCatPopup"] = self.timed("drawCatPopup", namespace["drawCatPopup"])
+        onStep = self.timed("onStep", namespace["onStep"])
+        redrawAll = self.timed("redrawAll", namespace["redrawAll"])
+        def profiledOnStep(app):
+            self.beginFrame()
+            onStep(app)
+        def profiledRedrawAll(app):
+            self.beginFrame()
+            redrawAll(app)
+            self.endFrame()
+        namespace["onStep"] = profiledOnStep
+        namespace["redrawAll"] = profiledRedrawAll
+
+    def getSummary(self):
+        return {
+            "frame": self.frameTimes.summary(),
+            "drawCalls": self.drawCalls.summary(),
+            "phases": {name: histogram.summary() for name, histogram in sorted(self.phases.items())},
+        }
+
+    def export(self, path):
+        # .csv gives one summary row per phase, anything else is json with the raw histograms too
+        summary = self.getSummary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "count", "mean", "p50", "p95", "p99", "max"])
+                rows = [("frame", summary["frame"]), ("drawCalls", summary["drawCalls"])]
+                rows += list(summary["phases"].items())
+                for name, stats in rows:
+                    writer.writerow([name] + [stats[key] for key in ("count", "mean", "p50", "p95", "p99", "max")])
+        else:
+            histograms = {"frame": self.frameTimes, "drawCalls": self.drawCalls}
+            histograms.update(self.phases)
+            summary["histograms"] = {
+                name: {"bucketWidth": histogram.bucketWidth,
+                       "counts": {index: count for index, count in enumerate(histogram.counts) if count}}
+                for name, histogram in histograms.items()
+            }
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
+        return path
+
+    def drawOverlay(self, app):
+        from cmu_graphics import drawRect, drawLabel
+        # the overlay's own draw calls aren't counted
+        self.counting = False
+        lines = []
+        frame = self.frameTimes.summary()
+        lines.append(f"{'frame':<16} p50 {frame['p50']:6.2f} p95 {frame['p95']:6.2f} p99 {frame['p99']:6.2f} ms")
+        calls = self.drawCalls.summary()
+        lines.append(f"{'draw calls':<16} p50 {calls['p50']:6.0f} p95 {calls['p95']:6.0f} max {calls['max']:6.0f}")
+        for name, histogram in sorted(self.phases.items()):
+            stats = histogram.summary()
+            lines.append(f"{name:<16} p50 {stats['p50']:6.2f} p95 {stats['p95']:6.2f} p99 {stats['p99']:6.2f} ms")
+        boxWidth = 480
+        boxHeight = 20 + 16 * len(lines)
+        x = app.width - boxWidth - 20
+        y = 60
+        drawRect(x, y, boxWidth, boxHeight, fill='black', opacity=70)
+        for i, line in enumerate(lines):
+            drawLabel(line, x + 10, y + 18 + 16 * i, size=12, fill='white', font='monospace', align='left')
+        self.counting = True
+
+# the profiler in use (None unless the game was started with profiling on)
+activeProfiler = None
+
+def installProfiler(namespace):
+    global activeProfiler
+    activeProfiler = FrameProfiler()
+    activeProfiler.install(namespace)
+    return activeProfiler
+
+def getProfiler():
+    return activeProfiler
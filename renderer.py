@@ -0,0 +1,108 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from furniture import drawFurnitureOverlays
+
+# the room background, furniture variants and the static ui boxes almost never change,
+# so they get composited once into a single image and drawn with one drawImage per frame
+# (needs Pillow, otherwise everything is drawn the old way every frame)
+try:
+    from PIL import Image, ImageDraw, ImageColor
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+BACKGROUND_COLOR = (245, 245, 220)
+MAX_CACHED_LAYERS = 4  # e.g. with and without the instruction box
+
+def getInstructionBox(app):
+    # (x, y, width, height, fill, border, borderWidth, opacity) of the "click on a cat" banner
+    boxWidth = 680
+    instructionY = 100
+    return (app.width//2 - boxWidth//2, instructionY - 50, boxWidth, 60, 'aliceBlue', 'cadetBlue', 2, 90)
+
+def getControlsBox(app):
+    # same for the "Extra Controls" panel in the bottom right
+    controlsX = app.width - 40
+    controlsY = app.height - 90
+    return (controlsX - 200, controlsY - 55, 220, 135, 'steelBlue', 'darkBlue', 2, 30)
+
+def drawPanelBox(box, canvas=None, translucent=True):
+    if canvas is None:
+        import cmu_graphics as canvas
+    x, y, width, height, fill, border, borderWidth, opacity = box
+    if not translucent:
+        opacity = 100  # solid is cheaper when frames are over budget (see frame_budget.py)
+    canvas.drawRect(x, y, width, height, fill=fill, border=border, borderWidth=borderWidth, opacity=opacity)
+
+class RoomLayer:
+    def __init__(self):
+        self.layers = {}  # layer key -> ready-to-draw image
+        self.panelsBaked = PIL_AVAILABLE  # if True the ui boxes are already in the layer
+        self.rebuildCount = 0
+
+    def getKey(self, app):
+        # everything the cached image depends on, a different key means it's out of date
+        showInstructions = app.selectedCat is None
+        variants = tuple(furniture.currentVariant for furniture in app.furniture)
+        return (app.width, app.height, app.sim.activeRoom.background, variants, showInstructions)
+
+    def invalidate(self):
+        self.layers.clear()
+
+    def draw(self, app):
+        from cmu_graphics import drawImage
+        if not PIL_AVAILABLE:
+            self.drawUncached(app)
+            return
+        key = self.getKey(app)
+        layer = self.layers.get(key)
+        if layer is None:
+            if len(self.layers) >= MAX_CACHED_LAYERS:
+                self.invalidate()
+            layer = self.buildLayer(app, key)
+            self.layers[key] = layer
+        drawImage(layer, 0, 0)
+
+    def drawUncached(self, app):
+        from cmu_graphics import drawRect, drawImage, drawLabel, rgb
+        drawRect(0, 0, app.width, app.height, fill=rgb(*BACKGROUND_COLOR))
+        background = app.sim.activeRoom.background
+        try:
+            drawImage(background, 0, 0, width=app.width, height=app.height)
+        except:
+            drawLabel(f"Background image missing: {background}", app.width//2, 50, size=16, fill='red', font='monospace')
+        # draw furniture overlays after background but before cats
+        drawFurnitureOverlays(app)
+
+    def buildLayer(self, app, key):
+        from cmu_graphics import CMUImage
+        width, height, backgroundPath, variants, showInstructions = key
+        self.rebuildCount += 1
+        layer = Image.new("RGBA", (width, height), BACKGROUND_COLOR + (255,))
+        try:
+            background = Image.open(backgroundPath).convert("RGBA").resize((width, height))
+            layer.alpha_composite(background)
+        except OSError:
+            print(f"Background image missing: {backgroundPath}")
+        for furniture in app.furniture:
+            variantPath = furniture.getCurrentVariantPath()
+            if variantPath:  # only draw if not using original
+                overlay = Image.open(variantPath).convert("RGBA").resize((furniture.width, furniture.height))
+                layer.alpha_composite(overlay, (furniture.x, furniture.y))
+        self.bakePanel(layer, getControlsBox(app))
+        if showInstructions:
+            self.bakePanel(layer, getInstructionBox(app))
+        return CMUImage(layer)
+
+    def bakePanel(self, layer, box):
+        # translucent box like drawRect(..., opacity=...) but painted into the layer
+        x, y, width, height, fill, border, borderWidth, opacity = box
+        alpha = int(255 * opacity / 100)
+        panel = Image.new("RGBA", layer.size, (0, 0, 0, 0))
+        ImageDraw.Draw(panel).rectangle([x, y, x + width, y + height],
+                                        fill=ImageColor.getrgb(fill) + (alpha,),
+                                        outline=ImageColor.getrgb(border) + (alpha,), width=borderWidth)
+        layer.alpha_composite(panel)
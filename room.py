@@ -0,0 +1,78 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from cat import createCats
+from furniture import createFurniturePieces
+from spatial import SpatialGrid
+from occupancy import OccupancyGrid
+from floor import getFloorMask
+from fast_forward import fastForwardCat
+from constants import ROOMS, STAT_UPDATE_INTERVAL, ACTIVITY_RESET_INTERVAL
+
+# one room of the cafe: its cats, furniture, background and the grids for finding cats in it
+# only the room on screen is fully simulated (runs, activities, every event on the scheduler)
+# the others are on a cheaper tier: just the stat ticks and activity resets, which have no
+# randomness, so nothing has to happen for them every tick. a background room remembers the
+# tick it's caught up to and applies everything since then in one go when it's looked at
+# (switched to, or its turn in the staggered catch-ups, see CafeSimulation.catchUpNextRoom),
+# with the same results as ticking live up to float rounding
+
+class Room:
+    def __init__(self, name, background, cats=None, furniture=None):
+        self.name = name
+        self.background = background
+        self.cats = cats if cats is not None else []
+        self.furniture = furniture if furniture is not None else []
+        # cat positions for picking and collision checks, kept current through Cat.moveTo
+        self.spatialGrid = SpatialGrid()
+        # the walkable floor cells, for finding the nearest free spot a cat can go (asks spatialGrid who's where)
+        self.occupancy = OccupancyGrid(getFloorMask(), self.spatialGrid)
+        self.caughtUpTick = 0  # stat ticks up to this one have been applied (background rooms)
+
+    def catchUp(self, tick):
+        # apply the background tier from caughtUpTick up to tick, returns how many stat ticks that was
+        if tick <= self.caughtUpTick:
+            return 0
+        statTicks = catchUpStats(self.cats, self.caughtUpTick, tick)
+        self.caughtUpTick = tick
+        return statTicks
+
+def countStatTicks(fromTick, toTick):
+    # stat ticks due in (fromTick, toTick]
+    return toTick // STAT_UPDATE_INTERVAL - fromTick // STAT_UPDATE_INTERVAL
+
+def catchUpStats(cats, fromTick, toTick):
+    # cats don't affect each other here, so each cat can do all of its ticks at once through
+    # fastForwardCat. only the last activity reset matters (stat ticks only change the activity when
+    # a cat falls asleep/wakes up), so it's applied once between the ticks before and after it
+    # (a stat tick on the same tick runs first, it has the lower priority)
+    lastReset = toTick // ACTIVITY_RESET_INTERVAL * ACTIVITY_RESET_INTERVAL
+    if lastReset <= fromTick:
+        lastReset = None
+    ticksBefore = countStatTicks(fromTick, lastReset) if lastReset is not None else 0
+    ticksAfter = countStatTicks(fromTick, toTick) - ticksBefore
+    for cat in cats:
+        fastForwardCat(cat, ticksBefore)
+        if lastReset is not None:
+            cat.activity = "idle"
+        fastForwardCat(cat, ticksAfter)
+    return ticksBefore + ticksAfter
+
+def createRooms():
+    # the rooms in ROOMS, the four starting cats and the recolorable furniture live in the first one
+    rooms = []
+    for i, (name, background) in enumerate(ROOMS):
+        if i == 0:
+            rooms.append(Room(name, background, createCats(), createFurniturePieces()))
+        else:
+            rooms.append(Room(name, background))
+    return rooms
+
+def getRoomBackground(name):
+    # background for a room name (rooms from a save that aren't in ROOMS get the first room's)
+    for roomName, background in ROOMS:
+        if roomName == name:
+            return background
+    return ROOMS[0][1]
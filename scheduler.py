@@ -0,0 +1,78 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import heapq
+import itertools
+import math
+import random
+
+# timed events for the simulation, kept in a heap ordered by (tick, priority, order added)
+# instead of checking `step % 30` and counting down timers on every cat every frame, things say
+# when they're next due and the simulation only wakes up for those ticks
+# (events at the same tick run lowest priority number first, then in the order they were added)
+
+class ScheduledEvent:
+    def __init__(self, tick, priority, callback, interval=None):
+        self.tick = tick
+        self.priority = priority
+        self.callback = callback
+        self.interval = interval  # repeating events are put back `interval` ticks later
+        self.cancelled = False
+
+class TickScheduler:
+    def __init__(self, currentTick=0):
+        self.currentTick = currentTick
+        self.heap = []
+        self.order = itertools.count()
+
+    def schedule(self, tick, callback, priority=0, interval=None):
+        event = ScheduledEvent(tick, priority, callback, interval)
+        heapq.heappush(self.heap, (tick, priority, next(self.order), event))
+        return event
+
+    def scheduleIn(self, ticks, callback, priority=0):
+        return self.schedule(self.currentTick + ticks, callback, priority)
+
+    def scheduleEvery(self, interval, callback, priority=0):
+        # first run on the next multiple of interval, like `step % interval == 0` used to
+        firstTick = (self.currentTick // interval + 1) * interval
+        return self.schedule(firstTick, callback, priority, interval)
+
+    def cancel(self, event):
+        # cancelled events stay in the heap and are skipped when they come up
+        if event is not None:
+            event.cancelled = True
+
+    def nextTick(self):
+        # tick of the next live event, or None if nothing is scheduled
+        while self.heap and self.heap[0][3].cancelled:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def runDue(self, tick):
+        # run everything due at or before tick (events scheduled while running are included)
+        self.currentTick = tick
+        while self.heap and self.heap[0][0] <= tick:
+            eventTick, priority, order, event = heapq.heappop(self.heap)
+            if event.cancelled:
+                continue
+            if event.interval:
+                event.tick = eventTick + event.interval
+                heapq.heappush(self.heap, (event.tick, priority, next(self.order), event))
+            event.callback()
+
+    def clear(self, currentTick):
+        for entry in self.heap:
+            entry[3].cancelled = True
+        self.heap = []
+        self.currentTick = currentTick
+
+def geometricWait(chance, rng=random):
+    # ticks until the first success of a `chance` per tick roll (None if it can never happen)
+    if chance <= 0:
+        return None
+    if chance >= 1:
+        return 1
+    return int(math.log(1 - rng.random()) / math.log(1 - chance)) + 1
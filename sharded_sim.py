@@ -0,0 +1,359 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import argparse
+import multiprocessing
+import os
+import random
+import threading
+import time
+from functools import partial
+from multiprocessing import shared_memory
+from cat import (advanceStats, stepTowards, getRunChance, pickRunTarget, chooseAutonomousActivity,
+                 applyActivityStats)
+from cat_stats import MOOD_NAMES
+from floor import getFloorMask
+from scheduler import TickScheduler, geometricWait
+from constants import *
+
+# headless simulation for very big cafes, split across worker processes
+# every cat field the simulation changes lives in one shared memory block as a column per field
+# (struct-of-arrays like cat_stats.py), and each worker process owns a slice of the cats (a shard).
+# the workers step tick by tick behind a barrier so no shard ever gets ahead of the others, and
+# anything that wants to look at the cats (metrics, a renderer) reads the columns in place
+# without copying. the stat ticks, runs and autonomous activities call the same functions
+# Cat uses (see the top of cat.py) so the numbers come out exactly like CafeSimulation's
+# (runs and activities still use random numbers, each shard has its own seeded generator)
+# shards don't see each other's cats, so wandering cats don't look for a free spot
+
+ACTIVITY_NAMES = ("idle", "sleeping", "running", "foraging", "self-grooming", "wandering",
+                  "eating", "playing", "cleaning")
+ACTIVITY_CODES = {name: code for code, name in enumerate(ACTIVITY_NAMES)}
+MOOD_CODES = {name: code for code, name in enumerate(MOOD_NAMES)}
+IDLE = ACTIVITY_CODES["idle"]
+RUNNING = ACTIVITY_CODES["running"]
+
+# (column, memoryview format) in the order they're laid out in the block
+CONTROL_FIELDS = ["targetTick", "command", "tick"]  # written by the main process (tick by the workers)
+FLOAT_COLUMNS = ["x", "y", "prevX", "prevY", "hunger", "happiness", "energy", "cleanliness",
+                 "runTargetX", "runTargetY", "runSpeed",
+                 "hungerRate", "energyRate", "messyRate", "socialNeed", "playfulness"]
+INT_COLUMNS = ["runEndTick", "autonomousEndTick"]
+BYTE_COLUMNS = ["isSleeping", "isRunning", "facingLeft", "mood", "activity"]
+PERSONALITY_COLUMNS = ["hungerRate", "energyRate", "messyRate", "socialNeed", "playfulness"]
+
+COMMAND_STEP = 0
+COMMAND_AUTONOMOUS = 1  # start autonomous activities (like coming back from an absence), then step
+COMMAND_STOP = 2
+
+class SharedCatTable:
+    # the shared memory block, made by the main process (name=None) and attached to by name elsewhere
+    def __init__(self, count, name=None):
+        self.count = count
+        size = 8 * len(CONTROL_FIELDS) + count * (8 * len(FLOAT_COLUMNS) + 8 * len(INT_COLUMNS) + len(BYTE_COLUMNS))
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.name = self.memory.name
+        self.views = []  # every view has to be released before the block can be closed
+        self.control = self.addView(0, len(CONTROL_FIELDS), "q")
+        self.columns = {}
+        offset = 8 * len(CONTROL_FIELDS)
+        for names, code, itemSize in [(FLOAT_COLUMNS, "d", 8), (INT_COLUMNS, "q", 8), (BYTE_COLUMNS, "B", 1)]:
+            for column in names:
+                self.columns[column] = self.addView(offset, count, code)
+                offset += count * itemSize
+
+    def addView(self, offset, length, code):
+        itemSize = 1 if code == "B" else 8
+        view = self.memory.buf[offset:offset + length * itemSize].cast(code)
+        self.views.append(view)
+        return view
+
+    def loadFromCats(self, cats):
+        columns = self.columns
+        for i, cat in enumerate(cats):
+            for column in FLOAT_COLUMNS:
+                if column in PERSONALITY_COLUMNS:
+                    columns[column][i] = cat.personality[column]
+                else:
+                    columns[column][i] = getattr(cat, column)
+            columns["runEndTick"][i] = cat.runEndTick
+            columns["autonomousEndTick"][i] = cat.autonomousEndTick
+            columns["isSleeping"][i] = cat.isSleeping
+            columns["isRunning"][i] = cat.isRunning
+            columns["facingLeft"][i] = cat.facingLeft
+            columns["mood"][i] = MOOD_CODES[cat.mood]
+            columns["activity"][i] = ACTIVITY_CODES.get(cat.activity, IDLE)
+
+    def writeBack(self, cats):
+        # copy the table onto Cat objects (e.g. to save them or draw them with Cat.draw)
+        columns = self.columns
+        for i, cat in enumerate(cats):
+            for column in FLOAT_COLUMNS:
+                if column not in PERSONALITY_COLUMNS:
+                    setattr(cat, column, columns[column][i])
+            cat.runEndTick = columns["runEndTick"][i]
+            cat.autonomousEndTick = columns["autonomousEndTick"][i]
+            cat.isSleeping = bool(columns["isSleeping"][i])
+            cat.isRunning = bool(columns["isRunning"][i])
+            cat.facingLeft = bool(columns["facingLeft"][i])
+            cat.mood = MOOD_NAMES[columns["mood"][i]]
+            cat.activity = ACTIVITY_NAMES[columns["activity"][i]]
+
+    def close(self):
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.memory.close()
+
+class Shard:
+    # one worker's cats (indexes start..end-1 of the table), with its own scheduler like CafeSimulation
+    def __init__(self, table, start, end, seed, startTick):
+        self.table = table
+        self.start = start
+        self.end = end
+        self.rng = random.Random(seed)
+        self.floor = getFloorMask()
+        self.scheduler = TickScheduler(startTick)
+        self.runningCats = {}  # insertion-ordered set of the running cats' indexes
+        self.movedCats = []
+        self.runEvents = {}
+        self.autonomousEvents = {}
+        self.scheduler.scheduleEvery(STAT_UPDATE_INTERVAL, self.runStatUpdate, STAT_EVENT_PRIORITY)
+        self.scheduler.scheduleEvery(ACTIVITY_RESET_INTERVAL, self.runActivityReset, RESET_EVENT_PRIORITY)
+        columns = table.columns
+        for i in range(start, end):
+            if columns["isRunning"][i]:
+                self.runningCats[i] = None
+                if columns["runEndTick"][i]:
+                    self.runEvents[i] = self.scheduler.schedule(max(columns["runEndTick"][i], startTick + 1),
+                                                                partial(self.stopRunning, i), CAT_EVENT_PRIORITY)
+            if columns["autonomousEndTick"][i]:
+                self.autonomousEvents[i] = self.scheduler.schedule(max(columns["autonomousEndTick"][i], startTick + 1),
+                                                                   partial(self.endAutonomousActivity, i),
+                                                                   CAT_EVENT_PRIORITY)
+            self.scheduleRunChance(i)
+
+    def runTick(self, tick):
+        # same order as CafeSimulation.step: last tick's movers settle, events run, running cats move
+        columns = self.table.columns
+        x, y, prevX, prevY = columns["x"], columns["y"], columns["prevX"], columns["prevY"]
+        for i in self.movedCats:
+            prevX[i], prevY[i] = x[i], y[i]
+        self.scheduler.runDue(tick)
+        self.movedCats = list(self.runningCats)
+        runTargetX, runTargetY, runSpeed = columns["runTargetX"], columns["runTargetY"], columns["runSpeed"]
+        facingLeft = columns["facingLeft"]
+        for i in self.movedCats:
+            # always face right when running
+            facingLeft[i] = False
+            nextPosition = stepTowards(x[i], y[i], runTargetX[i], runTargetY[i], runSpeed[i])
+            if nextPosition:
+                oldX, oldY = x[i], y[i]
+                x[i], y[i] = nextPosition
+                prevX[i], prevY[i] = oldX, oldY
+            else:
+                self.stopRunning(i)
+
+    def runStatUpdate(self):
+        columns = self.table.columns
+        hunger, happiness, energy, cleanliness = (columns["hunger"], columns["happiness"],
+                                                  columns["energy"], columns["cleanliness"])
+        hungerRate, energyRate, messyRate, socialNeed = (columns["hungerRate"], columns["energyRate"],
+                                                         columns["messyRate"], columns["socialNeed"])
+        isSleeping, isRunning, mood, activity = (columns["isSleeping"], columns["isRunning"],
+                                                 columns["mood"], columns["activity"])
+        for i in range(self.start, self.end):
+            (hunger[i], happiness[i], energy[i], cleanliness[i], sleeping, newActivity, newMood) = advanceStats(
+                hunger[i], happiness[i], energy[i], cleanliness[i], isSleeping[i], isRunning[i],
+                hungerRate[i], energyRate[i], messyRate[i], socialNeed[i])
+            isSleeping[i] = sleeping
+            mood[i] = MOOD_CODES[newMood]
+            if newActivity:
+                activity[i] = ACTIVITY_CODES[newActivity]
+
+    def runActivityReset(self):
+        self.table.columns["activity"][self.start:self.end] = bytes([IDLE]) * (self.end - self.start)
+
+    def scheduleRunChance(self, i):
+        wait = geometricWait(getRunChance(self.table.columns["playfulness"][i]), self.rng)
+        if wait is not None:
+            self.scheduler.scheduleIn(wait, partial(self.tryRandomRun, i), CAT_EVENT_PRIORITY)
+
+    def tryRandomRun(self, i):
+        self.scheduleRunChance(i)
+        columns = self.table.columns
+        if not columns["isSleeping"][i] and not columns["isRunning"][i]:
+            self.startRunning(i)
+
+    def startRunning(self, i):
+        columns = self.table.columns
+        columns["isRunning"][i] = True
+        runDuration = self.rng.randint(90, 150)
+        columns["runEndTick"][i] = self.scheduler.currentTick + runDuration + 1
+        self.scheduler.cancel(self.runEvents.get(i))
+        self.runEvents[i] = self.scheduler.schedule(columns["runEndTick"][i], partial(self.stopRunning, i),
+                                                    CAT_EVENT_PRIORITY)
+        columns["runTargetX"][i], columns["runTargetY"][i] = pickRunTarget(columns["x"][i], self.rng)
+        if columns["playfulness"][i] > 1.0:
+            columns["happiness"][i] = min(100, columns["happiness"][i] + 2)
+        columns["activity"][i] = RUNNING
+        self.runningCats[i] = None
+
+    def stopRunning(self, i):
+        columns = self.table.columns
+        self.scheduler.cancel(self.runEvents.pop(i, None))
+        columns["isRunning"][i] = False
+        columns["runEndTick"][i] = 0
+        columns["activity"][i] = IDLE
+        self.runningCats.pop(i, None)
+
+    def startAutonomousActivities(self):
+        # what AbsenceTracker.applyAbsenceEffects does for the cats on screen
+        columns = self.table.columns
+        for i in range(self.start, self.end):
+            if columns["activity"][i] == IDLE and not columns["isRunning"][i]:
+                activity = chooseAutonomousActivity(columns["hunger"][i], columns["cleanliness"][i], self.rng)
+                if activity:
+                    self.startAutonomousActivity(i, activity)
+
+    def startAutonomousActivity(self, i, activity):
+        columns = self.table.columns
+        columns["activity"][i] = ACTIVITY_CODES[activity]
+        columns["autonomousEndTick"][i] = self.scheduler.currentTick + self.rng.randint(60, 180)
+        self.scheduler.cancel(self.autonomousEvents.get(i))
+        self.autonomousEvents[i] = self.scheduler.schedule(columns["autonomousEndTick"][i],
+                                                           partial(self.endAutonomousActivity, i), CAT_EVENT_PRIORITY)
+        if activity == "wandering":
+            columns["x"][i], columns["y"][i] = self.floor.samplePoint(rng=self.rng)
+            columns["prevX"][i], columns["prevY"][i] = columns["x"][i], columns["y"][i]
+        (columns["hunger"][i], columns["happiness"][i], columns["energy"][i],
+         columns["cleanliness"][i]) = applyActivityStats(activity, columns["hunger"][i], columns["happiness"][i],
+                                                         columns["energy"][i], columns["cleanliness"][i])
+
+    def endAutonomousActivity(self, i):
+        self.autonomousEvents.pop(i, None)
+        self.table.columns["autonomousEndTick"][i] = 0
+        self.table.columns["activity"][i] = IDLE
+
+def runShard(tableName, count, start, end, seed, startTick, controlBarrier, tickBarrier):
+    # worker process: wait for step() to hand out ticks, run them in lockstep with the other shards
+    table = SharedCatTable(count, tableName)
+    try:
+        shard = Shard(table, start, end, seed, startTick)
+        while True:
+            controlBarrier.wait()
+            command = table.control[1]
+            if command == COMMAND_STOP:
+                break
+            if command == COMMAND_AUTONOMOUS:
+                shard.startAutonomousActivities()
+            for tick in range(shard.scheduler.currentTick + 1, table.control[0] + 1):
+                shard.runTick(tick)
+                # nobody starts the next tick until every shard has finished this one
+                if tickBarrier.wait() == 0:
+                    table.control[2] = tick
+            controlBarrier.wait()
+    except BaseException:
+        # wake everyone up with a BrokenBarrierError instead of leaving them waiting forever
+        controlBarrier.abort()
+        tickBarrier.abort()
+        raise
+    finally:
+        table.close()
+
+class ShardedSimulation:
+    def __init__(self, cats, workerCount=None, seed=0, stepCounter=0):
+        self.cats = cats
+        self.stepCounter = stepCounter
+        workerCount = max(1, min(workerCount or os.cpu_count() or 1, len(cats) or 1))
+        self.workerCount = workerCount
+        self.table = SharedCatTable(len(cats))
+        self.table.loadFromCats(cats)
+        self.table.control[2] = stepCounter
+        # the main process is in the control barrier too (to hand out ticks and wait for them)
+        self.controlBarrier = multiprocessing.Barrier(workerCount + 1)
+        self.tickBarrier = multiprocessing.Barrier(workerCount)
+        self.workers = []
+        for shard in range(workerCount):
+            start = len(cats) * shard // workerCount
+            end = len(cats) * (shard + 1) // workerCount
+            worker = multiprocessing.Process(target=runShard, daemon=True,
+                                             args=(self.table.name, len(cats), start, end, seed + shard,
+                                                   stepCounter, self.controlBarrier, self.tickBarrier))
+            worker.start()
+            self.workers.append(worker)
+
+    def step(self, n=1, startActivities=False):
+        self.table.control[0] = self.stepCounter + n
+        self.table.control[1] = COMMAND_AUTONOMOUS if startActivities else COMMAND_STEP
+        try:
+            self.controlBarrier.wait()  # go
+            self.controlBarrier.wait()  # every shard is done
+        except threading.BrokenBarrierError:
+            raise RuntimeError("a simulation shard stopped (see its error above)")
+        self.stepCounter += n
+
+    def getColumn(self, name):
+        # zero-copy read access: a memoryview straight onto the shared block (only read it between steps)
+        return self.table.columns[name]
+
+    def getTick(self):
+        # last tick every shard has finished (safe to poll from another thread while step() runs)
+        return self.table.control[2]
+
+    def writeBack(self):
+        self.table.writeBack(self.cats)
+
+    def close(self):
+        if self.workers:
+            self.table.control[1] = COMMAND_STOP
+            try:
+                self.controlBarrier.wait()
+            except threading.BrokenBarrierError:
+                pass
+            for worker in self.workers:
+                worker.join()
+            self.workers = []
+        self.table.close()
+        self.table.memory.unlink()
+
+def makeCats(count, seed=0):
+    # copies of the starting cats spread over the floor
+    from cat import Cat, createCats
+    rng = random.Random(seed)
+    templates = createCats()
+    cats = []
+    for i in range(count):
+        template = templates[i % len(templates)]
+        x, y = getFloorMask().samplePoint(rng=rng)
+        cats.append(Cat(template.name, x, y, template.personality))
+    return cats
+
+def main(argv=None):
+    # python sharded_sim.py --cats 20000 --ticks 900 compares one process against the shards
+    from simulation import CafeSimulation
+    parser = argparse.ArgumentParser(description="time a big headless cafe on one process and on shards")
+    parser.add_argument("--cats", type=int, default=20000)
+    parser.add_argument("--ticks", type=int, default=900)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    random.seed(0)
+    sim = CafeSimulation(makeCats(args.cats), trackAbsence=False)
+    start = time.perf_counter()
+    sim.step(args.ticks)
+    singleSeconds = time.perf_counter() - start
+    sharded = ShardedSimulation(makeCats(args.cats), args.workers)
+    try:
+        start = time.perf_counter()
+        sharded.step(args.ticks)
+        shardedSeconds = time.perf_counter() - start
+    finally:
+        sharded.close()
+    print(f"{args.cats} cats, {args.ticks} ticks")
+    print(f"  one process        {singleSeconds:8.2f}s")
+    print(f"  {sharded.workerCount:<3} shards         {shardedSeconds:8.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from absence_tracker import AbsenceTracker
+from cat_stats import CatStatsTable
+from room import Room, createRooms, getRoomBackground
+from persistence import writeFileAtomic
+from scheduler import TickScheduler
+import snapshot
+import time
+from constants import *
+
+# the cafe simulation without any graphics so it can run on a server with no display
+# main_game.py only adapts the cmu_graphics callbacks to this class
+# (nothing in here or in the modules it imports should pull in cmu_graphics)
+# the cafe is split into rooms (see room.py), only the active one is fully simulated and
+# self.cats / self.furniture / the grids below always belong to it
+
+class CafeSimulation:
+    def __init__(self, cats=None, furniture=None, trackAbsence=True, vectorized=False, arrangeCats=False,
+                 activityFile=ACTIVITY_FILE, rooms=None):
+        self.stepCounter = 0
+        # wall time the state was saved at when it's restored from a save (see loadSnapshot and journal.py)
+        self.savedAt = None
+        # cats/furniture given here go in the first room (the one the game starts in)
+        self.rooms = rooms if rooms is not None else createRooms()
+        if cats is not None:
+            self.rooms[0].cats = cats
+        if furniture is not None:
+            self.rooms[0].furniture = furniture
+        # the tracker reads/writes last_active.txt so soak tests can turn it off
+        self.absenceTracker = AbsenceTracker(self, activityFile) if trackAbsence else None
+        self.absenceCheckInterval = ABSENCE_CHECK_INTERVAL  # longer on slow computers (see frame_budget.py)
+        self.absenceEvent = None
+        # optional numpy stat table for huge populations (needs numpy, see cat_stats.py)
+        self.vectorized = vectorized
+        # write-ahead journal of every change, attached by the game after recovery (see journal.py)
+        self.journal = None
+        # everything periodic or timed (stats, absence checks, runs, activities) is an event here
+        self.scheduler = TickScheduler()
+        self.runningCats = {}  # insertion-ordered set of the cats that move every tick
+        self.movedCats = []    # cats that moved last tick (drawing blends their last step)
+        self.catchUpTurn = 0   # which background room catches up next (see catchUpNextRoom)
+        for room in self.rooms:
+            for cat in room.cats:
+                self.trackCat(cat, room)
+            if arrangeCats:
+                # spread the starting cats onto free floor spots (nobody overlapping or off the floor)
+                room.occupancy.placeCats(room.cats)
+        self.setActiveRoom(self.rooms[0])
+        self.resetSchedule()
+
+    def setActiveRoom(self, room):
+        self.activeRoom = room
+        self.cats = room.cats
+        self.furniture = room.furniture
+        # cat positions for picking and collision checks (see spatial.py and occupancy.py)
+        self.spatialGrid = room.spatialGrid
+        self.occupancy = room.occupancy
+        self.buildStatsTable()
+
+    def buildStatsTable(self):
+        # only the room on screen is in the table (background rooms catch up with Cat.updateStats)
+        self.statsTable = CatStatsTable(self.cats) if self.vectorized else None
+        if self.vectorized:
+            for room in self.rooms:
+                for cat in room.cats:
+                    cat.statsTable = self.statsTable if room is self.activeRoom else None
+
+    def getAllCats(self):
+        # every cat in every room, in room order (the journal refers to cats by their index in this)
+        return [cat for room in self.rooms for cat in room.cats]
+
+    def getAllFurniture(self):
+        return [piece for room in self.rooms for piece in room.furniture]
+
+    def trackCat(self, cat, room=None):
+        room = room or self.activeRoom
+        room.spatialGrid.addCat(cat)
+        self.attachTrackers(cat, room)
+
+    def attachTrackers(self, cat, room):
+        cat.trackers.append(room.spatialGrid)
+        cat.trackers.append(self)
+        cat.occupancy = room.occupancy
+        if self.journal:
+            cat.trackers.append(self.journal)
+        self.updateCat(cat)
+
+    def updateCat(self, cat):
+        # tracker hook: keep the set of running cats current
+        if cat.isRunning:
+            self.runningCats[cat] = None
+        else:
+            self.runningCats.pop(cat, None)
+
+    def untrackCat(self, cat, room=None):
+        room = room or self.activeRoom
+        room.spatialGrid.removeCat(cat)
+        self.detachTrackers(cat, room)
+
+    def detachTrackers(self, cat, room):
+        self.runningCats.pop(cat, None)
+        cat.trackers = [tracker for tracker in cat.trackers
+                        if tracker not in (room.spatialGrid, self, self.journal)]
+        cat.occupancy = None
+        cat.statsTable = None
+
+    def setRoomCats(self, room, cats):
+        # the list is changed in place so app.cats stays the same list
+        # the spatial grid is emptied and refilled in one go (loading a save can be thousands of cats)
+        for cat in room.cats:
+            self.detachTrackers(cat, room)
+        room.spatialGrid.clear()
+        room.cats[:] = cats
+        room.spatialGrid.addCats(room.cats)
+        for cat in room.cats:
+            self.attachTrackers(cat, room)
+
+    def replaceCats(self, cats, room=None):
+        # swap in a new set of cats for a room (the active one by default)
+        self.setRoomCats(room or self.activeRoom, cats)
+        if self.statsTable:
+            self.buildStatsTable()
+        self.resetSchedule()
+        if self.journal:
+            self.journal.restart()
+
+    def addRoom(self, room):
+        # a new room joins the background tier from now on
+        room.caughtUpTick = self.stepCounter
+        self.rooms.append(room)
+        for cat in room.cats:
+            self.trackCat(cat, room)
+        self.resetSchedule()  # the catch-up turns are spread over one more room now
+        if self.journal:
+            self.journal.restart()
+        return room
+
+    def switchRoom(self, index):
+        # put another room on screen: the old one drops to the background tier and the new one
+        # catches up on the stat ticks it missed before it's fully simulated again
+        room = self.rooms[index]
+        if room is self.activeRoom:
+            return room
+        oldRoom = self.activeRoom
+        self.syncCats()
+        for cat in oldRoom.cats:
+            # background rooms don't run or do activities
+            if cat.isRunning:
+                cat.stopRunning()
+            if cat.autonomousEndTick:
+                cat.endAutonomousActivity()
+        oldRoom.caughtUpTick = self.stepCounter
+        room.catchUp(self.stepCounter)
+        self.setActiveRoom(room)
+        self.movedCats = []
+        self.resetSchedule()
+        if self.journal:
+            self.journal.recordRoomSwitch(index, self.stepCounter)
+        return room
+
+    def catchUpRooms(self):
+        # apply everything the background rooms are owed up to now (one batch per room)
+        for index, room in enumerate(self.rooms):
+            if room is not self.activeRoom:
+                self.catchUpRoom(index)
+
+    def catchUpRoom(self, index):
+        room = self.rooms[index]
+        if room.caughtUpTick < self.stepCounter:
+            room.catchUp(self.stepCounter)
+            if self.journal:
+                self.journal.recordRoomCatchUp(index, self.stepCounter)
+
+    def catchUpNextRoom(self):
+        # the background rooms take turns catching up, one per event, so they don't all land
+        # on the same tick (each one still gets its turn about every ROOM_CATCH_UP_INTERVAL ticks)
+        background = [i for i, room in enumerate(self.rooms) if room is not self.activeRoom]
+        if background:
+            self.catchUpRoom(background[self.catchUpTurn % len(background)])
+            self.catchUpTurn += 1
+
+    def attachJournal(self, journal):
+        self.journal = journal
+        for cat in self.getAllCats():
+            cat.trackers.append(journal)
+
+    def cycleFurniture(self, piece):
+        piece.cycleVariant()
+        if self.journal:
+            self.journal.recordFurniture(piece)
+
+    def packSnapshot(self, journalGeneration=0, savedAt=None):
+        # savedAt is when the state is from (now, unless it was rebuilt from older files)
+        self.syncCats()
+        lastActiveTime = self.absenceTracker.lastActiveTime if self.absenceTracker else 0.0
+        # background rooms are saved as they are, with the tick they're caught up to
+        rooms = [(room.name, room.cats, room.furniture,
+                  self.stepCounter if room is self.activeRoom else room.caughtUpTick, room is self.activeRoom)
+                 for room in self.rooms]
+        return snapshot.packSnapshot(rooms, self.stepCounter, lastActiveTime, savedAt or time.time(),
+                                     journalGeneration)
+
+    def saveSnapshot(self, path=SNAPSHOT_FILE):
+        writeFileAtomic(path, self.packSnapshot())
+
+    def loadSnapshot(self, path=SNAPSHOT_FILE):
+        saved = snapshot.loadSnapshot(path)
+        # the step counter comes first so the cats' timed events line up with it
+        self.stepCounter = saved.stepCounter
+        self.savedAt = saved.savedAt
+        for room in self.rooms:
+            room.caughtUpTick = self.stepCounter  # rooms the save doesn't have start fresh
+        activeRoom = self.rooms[0]
+        # rooms go in the saved order (journal records number cats and furniture in that order),
+        # then any rooms the save doesn't have. names can repeat so each room is only matched once
+        rooms = []
+        for savedRoom in saved.rooms:
+            room = next((room for room in self.rooms if room.name == savedRoom.name and room not in rooms), None)
+            if room is None:
+                room = Room(savedRoom.name, getRoomBackground(savedRoom.name))
+            rooms.append(room)
+            cats = savedRoom.createCats()
+            for cat in cats:
+                # nobody is holding or looking at a cat in a fresh session
+                cat.isBeingDragged = False
+                cat.isSelected = False
+            self.setRoomCats(room, cats)
+            variants = savedRoom.getFurnitureVariants()
+            for piece in room.furniture:
+                if variants.get(piece.name, 0) < len(piece.variants):
+                    piece.currentVariant = variants.get(piece.name, 0)
+            room.caughtUpTick = savedRoom.caughtUpTick
+            if savedRoom.isActive:
+                activeRoom = room
+        self.rooms = rooms + [room for room in self.rooms if room not in rooms]
+        self.setActiveRoom(activeRoom)
+        self.resetSchedule()
+        if self.journal:
+            self.journal.restart()
+        # last_active.txt is written more often, only trust the snapshot if it's newer
+        if self.absenceTracker and saved.lastActiveTime > self.absenceTracker.lastActiveTime:
+            self.absenceTracker.lastActiveTime = saved.lastActiveTime
+        saved.close()
+        return saved
+
+    def resetSchedule(self):
+        # rebuild every timed event from the current state (at startup and after loading)
+        self.scheduler.clear(self.stepCounter)
+        self.scheduler.scheduleEvery(STAT_UPDATE_INTERVAL, self.runStatUpdate, STAT_EVENT_PRIORITY)
+        self.scheduler.scheduleEvery(ACTIVITY_RESET_INTERVAL, self.runActivityReset, RESET_EVENT_PRIORITY)
+        if self.absenceTracker:
+            self.absenceEvent = self.scheduler.scheduleEvery(self.absenceCheckInterval, self.runAbsenceCheck,
+                                                             ABSENCE_EVENT_PRIORITY)
+        if len(self.rooms) > 1:
+            catchUpSpacing = max(1, ROOM_CATCH_UP_INTERVAL // (len(self.rooms) - 1))
+            self.scheduler.scheduleEvery(catchUpSpacing, self.catchUpNextRoom, ROOM_EVENT_PRIORITY)
+        for cat in self.cats:
+            cat.scheduleEvents(self.scheduler)
+
+    def step(self, n=1):
+        # advance n steps, jumping straight to the next due event
+        # (only while a cat is running does every single step need to run)
+        targetStep = self.stepCounter + n
+        if self.journal and self.journal.dirtyCats:
+            # cats changed since the last step are journaled before the stat ticks that follow
+            self.syncCats()
+            self.journal.writeDirtyCats()
+        while self.stepCounter < targetStep:
+            nextStep = targetStep
+            if self.runningCats:
+                nextStep = self.stepCounter + 1
+            else:
+                dueStep = self.scheduler.nextTick()
+                if dueStep is not None:
+                    nextStep = max(self.stepCounter + 1, min(dueStep, targetStep))
+            self.stepCounter = nextStep
+            for cat in self.movedCats:
+                cat.prevX, cat.prevY = cat.x, cat.y
+            self.scheduler.runDue(self.stepCounter)
+            self.movedCats = list(self.runningCats)
+            for cat in self.movedCats:
+                cat.updateRunning()
+            if self.movedCats:
+                # one batch per tracker for the whole tick instead of every tracker for every step
+                self.spatialGrid.updateCats(self.movedCats)
+                if self.journal:
+                    self.journal.updateCats(self.movedCats)
+        if self.journal:
+            self.journal.endTick(self.stepCounter)
+
+    def runStatUpdate(self, resetActivity=False):
+        if self.statsTable:
+            self.statsTable.update()
+        else:
+            for cat in self.cats:
+                cat.updateStats()
+        if self.journal:
+            self.journal.recordStatTick()
+        if resetActivity:
+            # journals written before resets were their own event had both in one record
+            self.runActivityReset()
+
+    def runActivityReset(self):
+        if self.statsTable:
+            self.statsTable.resetActivities()
+        else:
+            for cat in self.cats:
+                cat.activity = "idle"
+        if self.journal:
+            self.journal.recordActivityReset()
+
+    def setAbsenceCheckInterval(self, interval):
+        if interval == self.absenceCheckInterval:
+            return
+        self.absenceCheckInterval = interval
+        if self.absenceEvent:
+            self.scheduler.cancel(self.absenceEvent)
+            self.absenceEvent = self.scheduler.scheduleEvery(interval, self.runAbsenceCheck, ABSENCE_EVENT_PRIORITY)
+
+    def applyOfflineTime(self):
+        # catch the cats up on the time the game was closed (once, after the save is restored)
+        if self.absenceTracker:
+            self.absenceTracker.applyOfflineTime()
+
+    def runAbsenceCheck(self):
+        # check for absence periodically (absence effects read and change the cats directly)
+        self.syncCats()
+        self.absenceTracker.checkForAbsence()
+        self.reloadStats()
+
+    def syncCats(self):
+        # make the Cat objects up to date before reading them (only needed with a stats table)
+        if self.statsTable:
+            self.statsTable.writeBack()
+
+    def reloadStats(self):
+        # pick up stat changes made directly on the Cat objects
+        if self.statsTable:
+            self.statsTable.loadFromCats()
+
+    def pickCat(self, x, y):
+        return self.spatialGrid.pickCat(x, y, CAT_PICK_RADIUS)
+
+    def findCollision(self, cat, x, y):
+        # another cat that would overlap `cat` if it stood at (x, y)
+        return self.spatialGrid.findOverlap(x, y, CAT_RADIUS * 2, cat)
+
+    def findFreeSpot(self, cat, x, y):
+        # nearest spot to (x, y) where `cat` fits, or None if the floor is full
+        return self.occupancy.findNearestFree(x, y, cat)
+
+    def findCat(self, name):
+        for cat in self.cats:
+            if cat.name == name:
+                return cat
+        return None
@@ -0,0 +1,259 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import mmap
+import struct
+from cat import Cat
+from constants import PERSONALITY_TYPES
+
+# binary save file for the whole cafe (every cat field, furniture variants, tracker times)
+# layout:   header | string table | room table | cat records | furniture records
+# every cat is a fixed-size record, so a room's cats are one slice of the file that
+# struct.iter_unpack can walk straight out of a memory map without copying the file
+
+SNAPSHOT_MAGIC = b"PCAF"
+SNAPSHOT_VERSION = 5
+
+# magic, version, room count, step counter, last active time, time saved, string count,
+# first journal generation that still has to be replayed on top of this snapshot (see journal.py)
+HEADER = struct.Struct("<4sHHQddIQ")
+HEADER_V1 = struct.Struct("<4sHHQddI")  # version 1 saves had no journal
+# room name, cat count, furniture count, offset of first cat record, offset of first furniture record,
+# tick the room's stats are caught up to (see room.py), flags
+ROOM_RECORD = struct.Struct("<IIIQQQB")
+ROOM_RECORD_V4 = struct.Struct("<IIIQQ")  # saves before version 5 only had the one room
+ROOM_ACTIVE = 1  # room flag: the room that was on screen
+STRING_LENGTH = struct.Struct("<H")
+FURNITURE_RECORD = struct.Struct("<IH")  # name, current variant
+NO_STRING = 0xFFFFFFFF
+
+STRING_FIELDS = ["name", "mood", "activity"]
+PERSONALITY_FIELDS = ["hungerRate", "energyRate", "messyRate", "socialNeed", "playfulness", "sleepiness"]
+FLAG_FIELDS = ["isSleeping", "beingPetted", "isBeingDragged", "isSelected", "isRunning", "facingLeft"]
+
+class CatRecordLayout:
+    # a list of (field, struct code) for every Cat field that gets saved, in record order
+    # strings are stored as indexes into the string table, bools are packed into one flags byte
+    def __init__(self, fields):
+        self.fields = fields
+        self.record = struct.Struct("<" + "".join(code for field, code in fields))
+        # record positions worked out once for the loader
+        self.names = [field for field, code in fields]
+        self.personalityStart = self.names.index(PERSONALITY_FIELDS[0])
+        self.stringIndexes = [(self.names.index(field), field) for field in STRING_FIELDS]
+        self.plainIndexes = [(index, field) for index, field in enumerate(self.names)
+                             if field not in STRING_FIELDS and field not in PERSONALITY_FIELDS
+                             and field != "flags" and field not in OLD_FIELDS]
+
+# fields older versions saved that cats don't have anymore (converted or dropped when loading)
+OLD_FIELDS = ["runTimer", "autonomousTimer", "animationFrame", "currentFrame", "animationSpeed",
+              "frameTimer", "previousAnimationState"]
+
+# animation isn't saved, it's worked out from the clock (see Cat.getAnimationFrame)
+CAT_FIELDS = [
+    ("name", "I"), ("x", "d"), ("y", "d"), ("lastValidX", "d"), ("lastValidY", "d"),
+    ("hunger", "d"), ("happiness", "d"), ("energy", "d"), ("cleanliness", "d"),
+    ("mood", "I"), ("lastActionTime", "d"), ("activity", "I"),
+    ("customerSatisfaction", "d"), ("dragOffsetX", "d"), ("dragOffsetY", "d"),
+    ("hungerRate", "d"), ("energyRate", "d"), ("messyRate", "d"),
+    ("socialNeed", "d"), ("playfulness", "d"), ("sleepiness", "d"),
+    ("runEndTick", "q"), ("runDuration", "i"), ("runTargetX", "d"), ("runTargetY", "d"),
+    ("runSpeed", "d"), ("autonomousEndTick", "q"), ("flags", "B"),
+]
+# version 3 also saved the per-frame animation counters
+CAT_FIELDS_V3 = (CAT_FIELDS[:10] + [("animationFrame", "q")] + CAT_FIELDS[10:15] +
+                 [("currentFrame", "i"), ("animationSpeed", "i"), ("frameTimer", "i"),
+                  ("previousAnimationState", "I")] + CAT_FIELDS[15:])
+# versions 1 and 2 saved tick countdowns instead of end ticks
+CAT_FIELDS_V2 = [("runTimer", "i") if field == "runEndTick" else
+                 ("autonomousTimer", "i") if field == "autonomousEndTick" else (field, code)
+                 for field, code in CAT_FIELDS_V3]
+CAT_LAYOUT = CatRecordLayout(CAT_FIELDS)
+CAT_LAYOUT_V3 = CatRecordLayout(CAT_FIELDS_V3)
+CAT_LAYOUT_V2 = CatRecordLayout(CAT_FIELDS_V2)
+CAT_RECORD = CAT_LAYOUT.record
+
+class StringTable:
+    def __init__(self):
+        self.strings = []
+        self.indexes = {}
+
+    def add(self, text):
+        if text is None:
+            return NO_STRING
+        if text not in self.indexes:
+            self.indexes[text] = len(self.strings)
+            self.strings.append(text)
+        return self.indexes[text]
+
+    def pack(self):
+        parts = []
+        for text in self.strings:
+            data = text.encode()
+            parts.append(STRING_LENGTH.pack(len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+def packCat(cat, strings):
+    values = []
+    for field, code in CAT_FIELDS:
+        if field in STRING_FIELDS:
+            values.append(strings.add(getattr(cat, field, None)))
+        elif field in PERSONALITY_FIELDS:
+            values.append(cat.personality[field])
+        elif field == "flags":
+            flags = 0
+            for bit, flagField in enumerate(FLAG_FIELDS):
+                if getattr(cat, flagField):
+                    flags |= 1 << bit
+            values.append(flags)
+        else:
+            values.append(getattr(cat, field))
+    return CAT_RECORD.pack(*values)
+
+def packSnapshot(rooms, stepCounter=0, lastActiveTime=0.0, savedAt=0.0, journalGeneration=0):
+    # rooms is a list of (room name, cats, furniture pieces, caught up tick, is the active room)
+    strings = StringTable()
+    catData = []
+    furnitureData = []
+    roomEntries = []
+    for roomName, cats, furniture, caughtUpTick, isActive in rooms:
+        roomEntries.append((strings.add(roomName), len(cats), len(furniture), caughtUpTick,
+                            ROOM_ACTIVE if isActive else 0))
+        catData.extend(packCat(cat, strings) for cat in cats)
+        furnitureData.extend(FURNITURE_RECORD.pack(strings.add(piece.name), piece.currentVariant)
+                             for piece in furniture)
+    stringData = strings.pack()
+    # offsets are only known once the string table size is
+    offset = HEADER.size + len(stringData) + ROOM_RECORD.size * len(rooms)
+    catOffset = offset
+    furnitureOffset = offset + CAT_RECORD.size * len(catData)
+    roomData = []
+    for nameIndex, catCount, furnitureCount, caughtUpTick, flags in roomEntries:
+        roomData.append(ROOM_RECORD.pack(nameIndex, catCount, furnitureCount, catOffset, furnitureOffset,
+                                         caughtUpTick, flags))
+        catOffset += CAT_RECORD.size * catCount
+        furnitureOffset += FURNITURE_RECORD.size * furnitureCount
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(rooms), stepCounter,
+                         lastActiveTime, savedAt, len(strings.strings), journalGeneration)
+    return b"".join([header, stringData] + roomData + catData + furnitureData)
+
+def sharedPersonality(values):
+    # reuse the PERSONALITY_TYPES dict when the numbers match one (like freshly made cats do)
+    personality = dict(zip(PERSONALITY_FIELDS, values))
+    for preset in PERSONALITY_TYPES.values():
+        if preset == personality:
+            return preset
+    return personality
+
+class SnapshotRoom:
+    def __init__(self, snapshot, name, catCount, furnitureCount, catOffset, furnitureOffset,
+                 caughtUpTick, isActive):
+        self.snapshot = snapshot
+        self.name = name
+        self.catCount = catCount
+        self.furnitureCount = furnitureCount
+        self.catOffset = catOffset
+        self.furnitureOffset = furnitureOffset
+        self.caughtUpTick = caughtUpTick
+        self.isActive = isActive
+
+    def iterCatRecords(self):
+        # raw tuples in CAT_FIELDS order, read straight out of the mapped file
+        record = self.snapshot.catLayout.record
+        end = self.catOffset + record.size * self.catCount
+        return record.iter_unpack(self.snapshot.data[self.catOffset:end])
+
+    def createCats(self):
+        strings = self.snapshot.strings
+        layout = self.snapshot.catLayout
+        personalityEnd = layout.personalityStart + len(PERSONALITY_FIELDS)
+        cats = []
+        for record in self.iterCatRecords():
+            personality = sharedPersonality(record[layout.personalityStart:personalityEnd])
+            cat = Cat(strings[record[0]], record[1], record[2], personality)
+            for index, field in layout.plainIndexes:
+                setattr(cat, field, record[index])
+            for index, field in layout.stringIndexes:
+                if record[index] != NO_STRING:
+                    setattr(cat, field, strings[record[index]])
+            flags = record[-1]
+            for bit, flagField in enumerate(FLAG_FIELDS):
+                setattr(cat, flagField, bool(flags & (1 << bit)))
+            if layout is CAT_LAYOUT_V2:
+                # countdowns become end ticks (counted from the saved step)
+                values = dict(zip(layout.names, record))
+                stepCounter = self.snapshot.stepCounter
+                cat.runEndTick = stepCounter + cat.runDuration - values["runTimer"] + 1 if cat.isRunning else 0
+                timer = values["autonomousTimer"]
+                cat.autonomousEndTick = stepCounter + timer if timer > 0 else 0
+            cats.append(cat)
+        return cats
+
+    def getFurnitureVariants(self):
+        # {furniture name: current variant}
+        variants = {}
+        end = self.furnitureOffset + FURNITURE_RECORD.size * self.furnitureCount
+        for nameIndex, variant in FURNITURE_RECORD.iter_unpack(self.snapshot.data[self.furnitureOffset:end]):
+            variants[self.snapshot.strings[nameIndex]] = variant
+        return variants
+
+class Snapshot:
+    # a loaded save file, memory-mapped so big multi-room saves aren't read all at once
+    def __init__(self, data):
+        self.source = data
+        self.data = memoryview(data)
+        magic, version = struct.unpack_from("<4sH", self.data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a cafe snapshot")
+        if version > SNAPSHOT_VERSION:
+            raise ValueError(f"snapshot version {version} is newer than this game ({SNAPSHOT_VERSION})")
+        header = HEADER if version >= 2 else HEADER_V1
+        fields = header.unpack_from(self.data, 0)
+        roomCount, stepCounter, lastActiveTime, savedAt, stringCount = fields[2:7]
+        self.version = version
+        self.stepCounter = stepCounter
+        self.lastActiveTime = lastActiveTime
+        self.savedAt = savedAt
+        self.journalGeneration = fields[7] if version >= 2 else 0
+        self.catLayout = {3: CAT_LAYOUT_V3, 2: CAT_LAYOUT_V2, 1: CAT_LAYOUT_V2}.get(version, CAT_LAYOUT)
+        offset = header.size
+        self.strings = []
+        for i in range(stringCount):
+            (length,) = STRING_LENGTH.unpack_from(self.data, offset)
+            offset += STRING_LENGTH.size
+            self.strings.append(bytes(self.data[offset:offset + length]).decode())
+            offset += length
+        self.rooms = []
+        roomRecord = ROOM_RECORD if version >= 5 else ROOM_RECORD_V4
+        for i in range(roomCount):
+            fields = roomRecord.unpack_from(self.data, offset)
+            offset += roomRecord.size
+            nameIndex, catCount, furnitureCount, catOffset, furnitureOffset = fields[:5]
+            if version >= 5:
+                caughtUpTick, isActive = fields[5], bool(fields[6] & ROOM_ACTIVE)
+            else:
+                # older saves were all fully simulated, with the first room on screen
+                caughtUpTick, isActive = stepCounter, i == 0
+            self.rooms.append(SnapshotRoom(self, self.strings[nameIndex], catCount, furnitureCount,
+                                           catOffset, furnitureOffset, caughtUpTick, isActive))
+
+    def getRoom(self, name):
+        for room in self.rooms:
+            if room.name == name:
+                return room
+        return None
+
+    def close(self):
+        # let go of the file (so it can be replaced) once the rooms have been read
+        self.data.release()
+        if hasattr(self.source, "close"):
+            self.source.close()
+
+def loadSnapshot(path):
+    with open(path, "rb") as f:
+        # the map stays valid after the file is closed
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return Snapshot(data)
@@ -0,0 +1,103 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+from constants import CAT_RADIUS
+
+# uniform grid over cat positions so clicks and collision checks only look at the
+# cats in the few cells around a point instead of every cat in the room
+# cats tell the grid when they move through Cat.moveTo (the grid is one of cat.trackers),
+# running cats are handed over once per tick by the simulation (updateCats)
+
+class SpatialGrid:
+    def __init__(self, cellSize=CAT_RADIUS * 2):
+        self.cellSize = cellSize
+        self.cells = {}     # (column, row) -> set of cats
+        self.catCells = {}  # cat -> (column, row)
+
+    def getCell(self, x, y):
+        return (int(x // self.cellSize), int(y // self.cellSize))
+
+    def addCat(self, cat):
+        cell = self.getCell(cat.x, cat.y)
+        self.catCells[cat] = cell
+        self.cells.setdefault(cell, set()).add(cat)
+
+    def addCats(self, cats):
+        # addCat for a whole room at once
+        catCells, cells, size = self.catCells, self.cells, self.cellSize
+        for cat in cats:
+            cell = (int(cat.x // size), int(cat.y // size))
+            catCells[cat] = cell
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = {cat}
+            else:
+                bucket.add(cat)
+
+    def clear(self):
+        self.cells = {}
+        self.catCells = {}
+
+    def removeCat(self, cat):
+        cell = self.catCells.pop(cat, None)
+        if cell is not None:
+            bucket = self.cells[cell]
+            bucket.discard(cat)
+            if not bucket:
+                del self.cells[cell]
+
+    def updateCat(self, cat):
+        # called every time a cat moves, only does real work when it changes cell
+        cell = self.getCell(cat.x, cat.y)
+        oldCell = self.catCells.get(cat)
+        if cell != oldCell:
+            self.removeCat(cat)
+            self.catCells[cat] = cell
+            self.cells.setdefault(cell, set()).add(cat)
+
+    def updateCats(self, cats):
+        # updateCat for a batch of moved cats (the running cats after a tick), skipping cats from other rooms
+        catCells, cells, size = self.catCells, self.cells, self.cellSize
+        for cat in cats:
+            oldCell = catCells.get(cat)
+            if oldCell is None:
+                continue
+            cell = (int(cat.x // size), int(cat.y // size))
+            if cell != oldCell:
+                bucket = cells[oldCell]
+                bucket.discard(cat)
+                if not bucket:
+                    del cells[oldCell]
+                catCells[cat] = cell
+                cells.setdefault(cell, set()).add(cat)
+
+    def catsNear(self, x, y, radius):
+        # every cat in the cells that a circle around (x, y) touches (may include cats a bit further away)
+        size = self.cellSize
+        minColumn, maxColumn = int((x - radius) // size), int((x + radius) // size)
+        minRow, maxRow = int((y - radius) // size), int((y + radius) // size)
+        for column in range(minColumn, maxColumn + 1):
+            for row in range(minRow, maxRow + 1):
+                bucket = self.cells.get((column, row))
+                if bucket:
+                    yield from bucket
+
+    def pickCat(self, x, y, radius):
+        # closest cat whose center is within radius of (x, y), or None
+        bestCat = None
+        bestDistance = radius ** 2
+        for cat in self.catsNear(x, y, radius):
+            distance = (x - cat.x) ** 2 + (y - cat.y) ** 2
+            if distance <= bestDistance:
+                bestCat = cat
+                bestDistance = distance
+        return bestCat
+
+    def findOverlap(self, x, y, radius, ignoreCat=None):
+        # any cat (other than ignoreCat) closer than radius to (x, y), or None
+        for cat in self.catsNear(x, y, radius):
+            if cat is not ignoreCat and (x - cat.x) ** 2 + (y - cat.y) ** 2 < radius ** 2:
+                return cat
+        return None
@@ -0,0 +1,229 @@
+#############################################
+##           arshia dabas 2025             ##
+##   fundamentals of purr-ogramming cafe   ##
+#############################################
+
+import os
+import json
+
+# Pillow is only needed to build/slice the atlas, without it we fall back to the
+# individual sprite files (same optional import idea as kaomoji in constants.py)
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# every image folder is found next to this file rather than in the current folder,
+# so the game and the headless tools (simulation.py, sharded_sim.py, ...) can run from anywhere
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+SPRITE_DIR = os.path.join(IMAGE_DIR, "cats")
+ATLAS_DIR = os.path.join(IMAGE_DIR, "atlas")
+ATLAS_MANIFEST = os.path.join(ATLAS_DIR, "manifest.json")
+EMOTION_DIR = os.path.join(IMAGE_DIR, "emotions")
+# cached frame counts (rebuilt when images/cats changes)
+FRAME_INDEX = os.path.join(IMAGE_DIR, "sprite_index.json")
+SPRITE_SIZE = 80  # cats are drawn 80x80
+BUBBLE_SIZE = 50  # emotion bubbles are drawn 50x50
+
+# every animation state Cat.getCurrentAnimationState can return, and the mood sprite
+# that used to be tried when a frame was missing ({cat}_{mood}.png)
+STATE_MOOD_FALLBACKS = {
+    "idle_neutral": "neutral",
+    "idle_happy": "happy",
+    "sad": "sad",
+    "sleeping": "sleeping",
+    "running": "neutral",
+    "dangling": "neutral",
+}
+DANGLING_FIRST_FRAME = 3  # dangling reuses idle_happy frames starting here
+EMOTION_NAMES = ["surprised", "confused", "sad", "neutral", "content", "wow", "happy", "happy2", "meow"]
+
+def parseSpriteFilename(filename):
+    # "beepaw_idle_happy_3.png" -> ("beepaw", "idle_happy", 3), anything else -> None
+    if not filename.endswith(".png"):
+        return None
+    parts = filename[:-4].split("_")
+    if len(parts) < 3 or not parts[-1].isdigit():
+        return None
+    return parts[0], "_".join(parts[1:-1]), int(parts[-1])
+
+def scanSpriteFiles(directory=SPRITE_DIR):
+    # {cat: {state: [filenames in frame order]}} for every numbered sprite in the folder
+    sprites = {}
+    for filename in os.listdir(directory):
+        parsed = parseSpriteFilename(filename)
+        if parsed is None:
+            continue
+        catName, state, frame = parsed
+        sprites.setdefault(catName, {}).setdefault(state, []).append((frame, filename))
+    for states in sprites.values():
+        for state, frames in states.items():
+            states[state] = [filename for frame, filename in sorted(frames)]
+    return sprites
+
+def scanFrameCounts(directory=SPRITE_DIR):
+    # {cat: {state: number of frames}} straight from the files on disk
+    counts = {}
+    for catName, states in scanSpriteFiles(directory).items():
+        counts[catName] = {state: len(filenames) for state, filenames in states.items()}
+    return counts
+
+def loadFrameIndex(directory=SPRITE_DIR, indexPath=FRAME_INDEX):
+    # the directory's modified time tells us if the cached index is still good,
+    # so normal launches only stat one folder instead of listing every sprite
+    dirTime = os.stat(directory).st_mtime
+    try:
+        with open(indexPath) as f:
+            index = json.load(f)
+        if index.get("directory") == directory and index.get("mtime") == dirTime:
+            return index["frames"]
+    except (OSError, ValueError, KeyError):
+        pass
+    frames = scanFrameCounts(directory)
+    try:
+        with open(indexPath, "w") as f:
+            json.dump({"directory": directory, "mtime": dirTime, "frames": frames}, f, indent=1)
+    except OSError as e:
+        print(f"Could not write sprite index: {e}")
+    return frames
+
+# one frame table shared by every cat (loaded the first time it's needed)
+frameCounts = None
+
+def getFrameCounts():
+    global frameCounts
+    if frameCounts is None:
+        frameCounts = loadFrameIndex()
+    return frameCounts
+
+def buildAtlas(spriteDir=SPRITE_DIR, atlasDir=ATLAS_DIR):
+    # build step: packs every cat's frames into one png (one row per state) plus a manifest
+    # mapping (cat, state, frame) to its rectangle in that png. run `python build_atlas.py`
+    if not PIL_AVAILABLE:
+        raise ImportError("building the sprite atlas needs Pillow (pip install pillow)")
+    os.makedirs(atlasDir, exist_ok=True)
+    manifest = {"cats": {}}
+    for catName, states in sorted(scanSpriteFiles(spriteDir).items()):
+        rows = []
+        for state, filenames in sorted(states.items()):
+            rows.append((state, [Image.open(f"{spriteDir}/{name}").convert("RGBA") for name in filenames]))
+        atlasWidth = max(sum(frame.width for frame in frames) for state, frames in rows)
+        atlasHeight = sum(max(frame.height for frame in frames) for state, frames in rows)
+        atlas = Image.new("RGBA", (atlasWidth, atlasHeight))
+        stateRects = {}
+        y = 0
+        for state, frames in rows:
+            x = 0
+            rects = []
+            for frame in frames:
+                atlas.paste(frame, (x, y))
+                rects.append([x, y, frame.width, frame.height])
+                x += frame.width
+            stateRects[state] = rects
+            y += max(frame.height for frame in frames)
+        # the manifest names the png relative to itself so the atlas can be moved or checked in
+        imageName = f"{catName}.png"
+        atlas.save(os.path.join(atlasDir, imageName))
+        manifest["cats"][catName] = {"image": imageName, "states": stateRects}
+    with open(os.path.join(atlasDir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+class SpriteAtlas:
+    # loaded once at startup: every frame gets an integer index into self.handles
+    # handles are ready-to-draw images (CMUImage) when the atlas is built, otherwise
+    # prebuilt path strings so nothing is formatted while drawing
+    # missing frames are resolved to their final fallback here (mood sprite -> basic sprite)
+    # so drawing never has to try a file and catch the error
+    def __init__(self, spriteDir=SPRITE_DIR, emotionDir=EMOTION_DIR):
+        self.spriteDir = spriteDir
+        self.emotionDir = emotionDir
+        self.useImages = False
+        self.handles = []
+        self.frameRanges = {}  # cat -> {state: (first index, frame count)}
+        self.frameTables = {}  # cat -> {state: (first index, frame count, fallback index or None)}
+        self.emotionHandles = {}
+
+    @staticmethod
+    def load(manifestPath=ATLAS_MANIFEST, spriteDir=SPRITE_DIR, emotionDir=EMOTION_DIR):
+        atlas = SpriteAtlas(spriteDir, emotionDir)
+        if PIL_AVAILABLE and os.path.exists(manifestPath):
+            atlas.useImages = True
+            atlas.loadManifest(manifestPath)
+        else:
+            atlas.loadFiles(spriteDir)
+        atlas.loadEmotions()
+        return atlas
+
+    def addState(self, catName, state, handles):
+        self.frameRanges.setdefault(catName, {})[state] = (len(self.handles), len(handles))
+        self.handles.extend(handles)
+
+    def addFile(self, path, size):
+        # index of a single image file, or None if it doesn't exist
+        if not os.path.exists(path):
+            return None
+        if self.useImages:
+            from cmu_graphics import CMUImage
+            handle = CMUImage(Image.open(path).convert("RGBA").resize((size, size), Image.NEAREST))
+        else:
+            handle = path
+        self.handles.append(handle)
+        return len(self.handles) - 1
+
+    def loadManifest(self, manifestPath):
+        from cmu_graphics import CMUImage
+        with open(manifestPath) as f:
+            manifest = json.load(f)
+        atlasDir = os.path.dirname(manifestPath)
+        for catName, entry in sorted(manifest["cats"].items()):
+            # older manifests have "images/atlas/<cat>.png", only the file name is needed
+            sheet = Image.open(os.path.join(atlasDir, os.path.basename(entry["image"]))).convert("RGBA")
+            for state, rects in sorted(entry["states"].items()):
+                handles = []
+                for x, y, w, h in rects:
+                    # slice and pre-scale once so drawing never has to resize
+                    frame = sheet.crop((x, y, x + w, y + h)).resize((SPRITE_SIZE, SPRITE_SIZE), Image.NEAREST)
+                    handles.append(CMUImage(frame))
+                self.addState(catName, state, handles)
+
+    def loadFiles(self, spriteDir):
+        # frames are numbered from 0 so the cached counts are enough to rebuild every path
+        counts = getFrameCounts() if spriteDir == SPRITE_DIR else scanFrameCounts(spriteDir)
+        for catName, states in sorted(counts.items()):
+            for state, frameCount in sorted(states.items()):
+                self.addState(catName, state, [f"{spriteDir}/{catName}_{state}_{frame}.png"
+                                               for frame in range(frameCount)])
+
+    def loadEmotions(self):
+        # each bubble resolves to itself, else the neutral bubble, else nothing
+        found = {}
+        for name in EMOTION_NAMES:
+            found[name] = self.addFile(f"{self.emotionDir}/{name}.png", BUBBLE_SIZE)
+        for name in EMOTION_NAMES:
+            index = found[name] if found[name] is not None else found["neutral"]
+            self.emotionHandles[name] = self.handles[index] if index is not None else None
+
+    def getFrameTable(self, catName):
+        # resolved once per cat name (cats without any sprites still get their fallbacks)
+        if catName not in self.frameTables:
+            self.frameTables[catName] = self.resolveFrameTable(catName)
+        return self.frameTables[catName]
+
+    def resolveFrameTable(self, catName):
+        ranges = self.frameRanges.get(catName, {})
+        basicIndex = self.addFile(f"{self.spriteDir}/{catName}.png", SPRITE_SIZE)
+        moodIndexes = {}
+        table = {}
+        for state, mood in STATE_MOOD_FALLBACKS.items():
+            if mood not in moodIndexes:
+                moodIndexes[mood] = self.addFile(f"{self.spriteDir}/{catName}_{mood}.png", SPRITE_SIZE)
+            fallback = moodIndexes[mood] if moodIndexes[mood] is not None else basicIndex
+            if state == "dangling":
+                first, count = ranges.get("idle_happy", (0, 0))
+                first, count = first + DANGLING_FIRST_FRAME, max(0, count - DANGLING_FIRST_FRAME)
+            else:
+                first, count = ranges.get(state, (0, 0))
+            table[state] = (first, count, fallback)
+        return table
@@ -3,60 +3,76 @@
 ##   fundamentals of purr-ogramming cafe   ##
 #############################################
 
-from cmu_graphics import *
+import re
+from functools import lru_cache
 from constants import *
+from floor import isValidPosition
+
+# ascii stand-ins for the kaomoji, used when no font can draw the unicode ones
+KAOMOJI_FALLBACKS = {
+    HAPPY_KAOMOJI: HAPPY_KAOMOJI_SIMPLE,
+    SAD_KAOMOJI: SAD_KAOMOJI_SIMPLE,
+    NEUTRAL_KAOMOJI: NEUTRAL_KAOMOJI_SIMPLE,
+    EATING_KAOMOJI: EATING_KAOMOJI_SIMPLE,
+    EXCITED_KAOMOJI: EXCITED_KAOMOJI_SIMPLE,
+    SLEEPING_KAOMOJI: SLEEPING_KAOMOJI_SIMPLE,
+    SPARKLES_KAOMOJI: SPARKLES_KAOMOJI_SIMPLE,
+}
+# all of them in one pattern (longest first, so a kaomoji is never matched inside a longer one)
+KAOMOJI_PATTERN = re.compile("|".join(re.escape(kaomoji) for kaomoji in
+                                      sorted(KAOMOJI_FALLBACKS, key=len, reverse=True)))
+PROBE_FONTS = UNICODE_FONTS + [DEFAULT_FONT]
+
+# the font that worked for each kind of text ("ascii" or "unicode"), found by the first label of
+# that kind so every label after it is a single drawLabel (None = nothing worked, use ascii)
+workingFonts = {}
+
+@lru_cache(maxsize=256)
+def toAsciiKaomoji(text):
+    # the labels repeat every frame, so each one is only translated once
+    return KAOMOJI_PATTERN.sub(lambda match: KAOMOJI_FALLBACKS[match.group()], text)
 
 def drawUnicodeLabel(text, x, y, size=16, bold=False, fill='black', align='center'):
+    from cmu_graphics import drawLabel
+    characterClass = "ascii" if text.isascii() else "unicode"
+    font = workingFonts.get(characterClass)
+    if font:
+        try:
+            drawLabel(text, x, y, size=size, bold=bold, fill=fill, align=align, font=font)
+            return True
+        except Exception:
+            pass  # this label needs something that font can't do, look again below
+    elif characterClass in workingFonts:
+        drawLabel(toAsciiKaomoji(text), x, y, size=size, bold=bold, fill=fill, align=align, font=DEFAULT_FONT)
+        return False
     # i try to draw text with Unicode support by testing different font but it'll fall back to simple ASCII if Unicode fails
-    # first try with different fonts that might support Unicode better
+    # first try with different fonts that might support Unicode better (and the default font last)
     # again this try/except format was from Claude (AI) but i did my own reserach on it after using it in "draw" [begining line 330]
     # the original prompt was "what format can i use to have a safety option for fonts in my python file"
     # i later learnt more about it from: https://www.w3schools.com/python/python_try_except.asp
-    for font in UNICODE_FONTS:
+    for font in PROBE_FONTS:
         try:
             drawLabel(text, x, y, size=size, bold=bold, fill=fill, align=align, font=font)
+            workingFonts[characterClass] = font
             return True
-        except:
+        except Exception:
             continue
-    # if all Unicode fonts fail, try with default font
-    try:
-        drawLabel(text, x, y, size=size, bold=bold, fill=fill, align=align, font=DEFAULT_FONT)
-        return True
-    except:
-        # if even that fails, strip Unicode and use ASCII fallback
-        simple_text = text.replace(HAPPY_KAOMOJI, HAPPY_KAOMOJI_SIMPLE)
-        simple_text = simple_text.replace(SAD_KAOMOJI, SAD_KAOMOJI_SIMPLE)
-        simple_text = simple_text.replace(NEUTRAL_KAOMOJI, NEUTRAL_KAOMOJI_SIMPLE)
-        simple_text = simple_text.replace(EATING_KAOMOJI, EATING_KAOMOJI_SIMPLE)
-        simple_text = simple_text.replace(EXCITED_KAOMOJI, EXCITED_KAOMOJI_SIMPLE)
-        simple_text = simple_text.replace(SLEEPING_KAOMOJI, SLEEPING_KAOMOJI_SIMPLE)
-        simple_text = simple_text.replace(SPARKLES_KAOMOJI, SPARKLES_KAOMOJI_SIMPLE)
-        drawLabel(simple_text, x, y, size=size, bold=bold, fill=fill, align=align, font=DEFAULT_FONT)
-        return False
-
-# define allowed placement area for isometric room floor
-# this took lots of trial and error since i'm not great at math
-def isValidPosition(x, y):
-    # isometric room boundaries based on the floor area
-    centerX = 600  
-    centerY = 700      
-    width = 580   
-    height = 580      
-    
-    dx = x - centerX
-    dy = y - centerY
-    
-    # diamond shape condition for the floor area
-    return abs(dx) / (width / 2) + abs(dy) / (height / 2) <= 1
+    # if all fonts fail, strip Unicode and use ASCII fallback (from now on for this kind of text)
+    workingFonts[characterClass] = None
+    drawLabel(toAsciiKaomoji(text), x, y, size=size, bold=bold, fill=fill, align=align, font=DEFAULT_FONT)
+    return False
 
-def drawStatBar(x, y, width, height, value, maxValue, color, label):
+def drawStatBar(x, y, width, height, value, maxValue, color, label, canvas=None):
+    # canvas is cmu_graphics unless the bar is being recorded into a DisplayList (see display_list.py)
+    if canvas is None:
+        import cmu_graphics as canvas
     # background bar
-    drawRect(x, y, width, height, fill='lightGray', border='darkGray', borderWidth=1)
+    canvas.drawRect(x, y, width, height, fill='lightGray', border='darkGray', borderWidth=1)
     # filled portion - add comprehensive safety checks
     if maxValue > 0 and value > 0:
         fillWidth = (value / maxValue) * width
         fillWidth = max(1, min(fillWidth, width))  # ensure minimum width of 1 (did this because it was bugging out without this check)
-        drawRect(x, y, fillWidth, height, fill=color, border=None)
+        canvas.drawRect(x, y, fillWidth, height, fill=color, border=None)
     # text overlay
-    drawLabel(f"{label}: {int(value)}", x + width//2, y + height//2, 
+    canvas.drawLabel(f"{label}: {int(value)}", x + width//2, y + height//2, 
              size=12, bold=True, fill='darkOliveGreen' if value > 50 else 'fireBrick', font='monospace')
\ No newline at end of file